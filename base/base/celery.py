@@ -1,5 +1,7 @@
+import importlib
 import os
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
 from celery.schedules import crontab
 import logging
 
@@ -16,6 +18,33 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Auto-discover tasks
 app.autodiscover_tasks()
 
+# Task modules import their heavy dependencies on first use. Importing
+# them here, in the main process before the pool forks, means every child
+# (including each one replaced after CELERY_WORKER_MAX_TASKS_PER_CHILD
+# tasks) starts with them already loaded. run_worker sets the list from
+# the profile's 'preload'; metrics make every task need Redis.
+@worker_init.connect
+def preload_modules(**kwargs):
+    names = ['redis', *filter(None, os.environ.get('CELERY_WORKER_PRELOAD', '').split(','))]
+    for name in names:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning(f"Could not preload {name}: {str(e)}")
+
+# Celery's Django fixup already calls close_if_unusable_or_obsolete() on
+# every connection before and after each task, which honours CONN_MAX_AGE
+# and CONN_HEALTH_CHECKS and hands pooled connections back to the pool,
+# and it drops connections inherited from the parent in each new child.
+# What it does not do is close the child's own pool on the way out.
+@worker_process_shutdown.connect
+def close_connection_pools(**kwargs):
+    from django.db import connections
+
+    for conn in connections.all(initialized_only=True):
+        if conn.vendor == 'postgresql':
+            conn.close_pool()
+
 @app.task(bind=True)
 def debug_task(self):
     logger.info(f'Request: {self.request!r}') 
\ No newline at end of file
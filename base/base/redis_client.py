@@ -0,0 +1,16 @@
+from functools import lru_cache
+from django.conf import settings
+
+
+@lru_cache(maxsize=None)
+def get_redis(url: str = None) -> 'redis.Redis':
+    """Process-wide Redis client (and connection pool) per URL"""
+    # Imported on first use: management commands that never touch Redis
+    # skip it, and workers preload it before forking (see base/celery.py)
+    import redis
+
+    return redis.Redis.from_url(
+        url or settings.REDIS_URL,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    )
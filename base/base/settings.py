@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 from pathlib import Path
+import os
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -65,6 +66,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'monitor.profiling.RequestProfileMiddleware',
 ]
 
 ROOT_URLCONF = 'base.urls'
@@ -102,6 +104,32 @@ DATABASES = {
     }
 }
 
+# Connection handling, chosen per process with DB_CONNECTION_MODE:
+#   persistent - keep one connection per thread for DB_CONN_MAX_AGE seconds,
+#                checked before reuse; for WSGI servers (gunicorn)
+#   pool       - psycopg 3 connection pool per process; for Celery workers
+#                and ASGI servers, whose threads come and go
+#   none       - connect per request/task
+DB_CONNECTION_MODE = os.environ.get('DB_CONNECTION_MODE', 'persistent')
+DB_CONN_MAX_AGE = 60
+DB_POOL_MIN_SIZE = 2
+DB_POOL_MAX_SIZE = 10  # Must cover the worker's concurrency (threads pool included)
+DB_POOL_TIMEOUT = 10  # Seconds to wait for a free connection
+
+if DB_CONNECTION_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_CONNECTION_MODE == 'pool':
+    # Health checks make the pool test a connection before handing it out
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+        },
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -144,6 +172,21 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Redis
+REDIS_URL = 'redis://localhost:6379/0'
+REDIS_SOCKET_TIMEOUT = 0.5  # Seconds; instrumentation must not stall callers
+LOCK_TTL = 60  # Seconds a task lease survives without a heartbeat
+
+# Cache
+# Shared between web and Celery processes so workers can publish data
+# (e.g. monitor snapshots) that views read.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://localhost:6379/1',
+    }
+}
+
 # Celery Configuration
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
@@ -153,8 +196,63 @@ CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TIME_LIMIT = 30 * 60
 CELERY_TASK_SOFT_TIME_LIMIT = 60
-CELERY_WORKER_MAX_TASKS_PER_CHILD = 50
-CELERY_WORKER_CONCURRENCY = 1
+# Recycle rarely: each new child re-imports Django and the job vocabulary
+CELERY_WORKER_MAX_TASKS_PER_CHILD = 1000
+# Reserve one task at a time so a long fetch does not hold queued work hostage
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_ACKS_LATE = True
+
+# Queues: ingest (feed fetch and index rebuilds, CPU/DB heavy), alerts
+# (matching, DB bound) and email (SMTP, I/O bound). Unrouted tasks use default.
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ROUTES = {
+    'jobs.tasks.fetch_and_save_jobs': {'queue': 'ingest'},
+    'jobs.tasks.prune_old_jobs': {'queue': 'ingest'},
+    'jobs.tasks.reconcile_job_rollups': {'queue': 'ingest'},
+    'jobs.tasks.maintain_skill_demand': {'queue': 'ingest'},
+    'jobs.tasks.refresh_facets': {'queue': 'ingest'},
+    'jobs.tasks.refresh_suggestions': {'queue': 'ingest'},
+    'jobs.tasks.refresh_search_index': {'queue': 'ingest'},
+    'jobs.tasks.refresh_similar_jobs': {'queue': 'ingest'},
+    'jobs.tasks.rebuild_similar_jobs': {'queue': 'ingest'},
+    'jobs.tasks.send_job_alerts': {'queue': 'alerts'},
+    'jobs.tasks.deliver_job_alert': {'queue': 'email'},
+}
+
+# Worker profiles started with `python manage.py run_worker <profile>`
+# Heavy modules a worker's tasks import on first use. The worker's main
+# process imports them before forking, so recycled children inherit them
+# instead of importing them again (see base/celery.py).
+_INGEST_PRELOAD = ['aiohttp', 'lxml.html', 'jobs.similarity']
+
+CELERY_WORKER_PROFILES = {
+    'ingest': {'queues': ['ingest'], 'pool': 'prefork', 'concurrency': 2, 'prefetch_multiplier': 1,
+               'preload': _INGEST_PRELOAD},
+    'alerts': {'queues': ['alerts'], 'pool': 'prefork', 'concurrency': 2, 'prefetch_multiplier': 1},
+    'email': {'queues': ['email'], 'pool': 'threads', 'concurrency': 20, 'prefetch_multiplier': 4},
+    'default': {'queues': ['default'], 'pool': 'prefork', 'concurrency': 2, 'prefetch_multiplier': 1},
+    # Everything in one process, for development
+    'all': {'queues': ['default', 'ingest', 'alerts', 'email'], 'pool': 'prefork', 'concurrency': 4, 'prefetch_multiplier': 1,
+            'preload': _INGEST_PRELOAD},
+}
+
+# Cold start (see jobs/benchmarks/startup.py and benchmark_startup).
+# Budgets are median seconds from interpreter start to ready; modules in
+# STARTUP_DEFERRED_MODULES must only be imported by the code that uses them.
+STARTUP_BUDGETS = {
+    'manage': 1.0,
+    'web': 1.25,
+    'worker': 1.0,
+}
+STARTUP_DEFERRED_MODULES = ['aiohttp', 'lxml', 'numpy', 'scipy', 'redis']
+
+# Job Alert Settings
+ALERT_DELIVERY_REQUEUE_AFTER = 15 * 60  # Re-queue unsent alert emails after 15 minutes
+ALERT_DELIVERY_MAX_ATTEMPTS = 5  # Give up on an alert email after this many failed sends
+ALERT_WATERMARK_LAG = 5 * 60  # Seconds; must exceed the longest ingest transaction
+
+# Job Feed
+JOB_FEED_URL = 'https://www.myjobmag.co.ke/jobsxml_by_categories.xml'
 
 # Job Filtering Settings
 ALLOWED_INDUSTRIES = {
@@ -204,6 +302,61 @@ SOFT_SKILLS = {
 # Combine all skills for the job model
 ALLOWED_SKILLS = TECH_SKILLS.union(SOFT_SKILLS)
 
+# Seconds between checks for Skill table changes in each process
+SKILL_DICTIONARY_CHECK_INTERVAL = 60
+
+# Titles whose classification is memoized per worker process
+CLASSIFIER_TITLE_CACHE_SIZE = 10000
+
+# Retention: older jobs move to the archive table in small batches
+JOB_RETENTION_DAYS = 90
+JOB_PRUNE_CHUNK_SIZE = 500
+JOB_PRUNE_MAX_CHUNKS = 200  # Per run; the rest waits for the next run
+JOB_PRUNE_PAUSE = 0.1  # Seconds between chunks
+
+# Derived indexes shared through the cache (see jobs/artifacts.py)
+ARTIFACT_CHECK_INTERVAL = 10  # Seconds between generation checks per process
+ARTIFACT_TIMEOUT = 7 * 24 * 3600
+
+# Typeahead suggestions
+SUGGEST_TOP_K = 10  # Completions precomputed per trie node
+SUGGEST_CACHE_SECONDS = 300
+
+# Memory-mapped search index (see jobs/index_file.py). The ingest worker
+# writes it, so this directory must be shared with the web processes.
+SEARCH_INDEX_DIR = BASE_DIR / 'var' / 'search-index'
+
+# "Similar jobs" (see jobs/similarity.py). Like the search index, the
+# saved model must be on storage shared by the ingest workers.
+SIMILARITY_DIR = BASE_DIR / 'var' / 'similarity'
+SIMILARITY_TOP_K = 20  # Neighbours stored per job
+SIMILARITY_MIN_SCORE = 0.1  # Weaker matches are not stored
+SIMILARITY_BATCH_SIZE = 128  # Rows scored per product; memory ~ batch x jobs x 4 bytes
+SIMILARITY_MAX_DESCRIPTION_CHARS = 5000
+
+# Search Query Cache
+SEARCH_CACHE_LOCAL_MAX_IDS = 1_000_000  # Ids held across all entries per process (~8 MB)
+SEARCH_CACHE_MAX_ENTRY_IDS = 50_000  # Larger results are not cached
+SEARCH_CACHE_TIMEOUT = 3600  # Only reclaims old generations; never serves stale results
+
+# Length of Job.snippet, the plain-text preview used by lists and emails
+JOB_SNIPPET_LENGTH = 280
+
+# Serialized job cache for detail and ?ids= requests (see jobs/job_cache.py)
+JOB_CACHE_TIMEOUT = 600  # Also bounds staleness after QuerySet.update()
+JOB_MULTI_GET_MAX = 100
+
+# Bulk export (see jobs/export.py)
+EXPORT_CHUNK_SIZE = 2000  # Rows fetched per server-side cursor round trip
+
+# Skill demand trends (see jobs/trends.py)
+SKILL_DEMAND_DAILY_DAYS = 180  # Older days are kept as monthly counters
+SKILL_TRENDS_MAX_DAYS = 3 * 366  # Longest range the trends API accepts
+
+# Near-duplicate detection (see jobs/dedup.py)
+DEDUP_BANDS = 4  # 16-bit LSH bands over the 64-bit SimHash
+DEDUP_MAX_DISTANCE = 3  # Max differing bits for two postings to be the same job; below DEDUP_BANDS
+
 # Add this after DEFAULT_AUTO_FIELD setting
 
 REST_FRAMEWORK = {
@@ -225,11 +378,44 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'jobs.tasks.fetch_and_save_jobs',
         'schedule': 300.0,  # 5 minutes
     },
+    'snapshot-workers-every-15-seconds': {
+        'task': 'monitor.tasks.snapshot_workers',
+        'schedule': 15.0,
+    },
+    'prune-old-jobs-daily': {
+        'task': 'jobs.tasks.prune_old_jobs',
+        'schedule': 86400.0,  # Daily
+    },
+    'reconcile-job-rollups-hourly': {
+        'task': 'jobs.tasks.reconcile_job_rollups',
+        'schedule': 3600.0,  # Hourly
+    },
+    'maintain-skill-demand-daily': {
+        'task': 'jobs.tasks.maintain_skill_demand',
+        'schedule': 86400.0,  # Daily
+    },
+    'refresh-facets-hourly': {
+        # Republishes the facet index even when no ingest changed any jobs
+        'task': 'jobs.tasks.refresh_facets',
+        'schedule': 3600.0,  # Hourly
+    },
+    'rebuild-similar-jobs-daily': {
+        'task': 'jobs.tasks.rebuild_similar_jobs',
+        'schedule': 86400.0,  # Daily
+    },
 }
 
 # Celery Beat Settings
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
+# Monitor Settings
+METRICS_REDIS_URL = 'redis://localhost:6379/2'
+MONITOR_INSPECT_TIMEOUT = 1.0  # Seconds to wait for worker replies
+MONITOR_SNAPSHOT_TTL = 300  # Drop worker snapshots older than 5 minutes
+PROFILE_SAMPLE_RATE = 0.0  # Fraction of requests run under cProfile (e.g. 0.01)
+PROFILE_DIR = BASE_DIR / 'profiles'
+PROFILE_MAX_FILES = 200
+
 # Add this after the existing settings
 
 LOGGING = {
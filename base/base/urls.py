@@ -1,13 +1,16 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from jobs.views import JobViewSet
+from jobs.views import JobViewSet, async_job_list, async_job_detail, async_job_search
 
 router = DefaultRouter()
 router.register(r'jobs', JobViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/async/jobs/', async_job_list, name='async-job-list'),
+    path('api/async/jobs/search/', async_job_search, name='async-job-search'),
+    path('api/async/jobs/<int:pk>/', async_job_detail, name='async-job-detail'),
     path('api/', include(router.urls)),
     path('monitor/', include('monitor.urls')),
 ]
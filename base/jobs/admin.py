@@ -1,8 +1,47 @@
 from django.contrib import admin
-from .models import Job
+from .models import Job, JobAlert, AlertDelivery, Skill, ArchivedJob, SkillDemand, JobNeighbours
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
     list_display = ['title', 'industry', 'publication_date', 'created_at']
     list_filter = ['industry']
     search_fields = ['title', 'description']
+
+
+@admin.register(JobAlert)
+class JobAlertAdmin(admin.ModelAdmin):
+    list_display = ['email', 'is_active', 'last_sent', 'last_job_id']
+    list_filter = ['is_active']
+    search_fields = ['email']
+
+
+@admin.register(AlertDelivery)
+class AlertDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['alert', 'from_job_id', 'to_job_id', 'job_count', 'attempts', 'sent_at', 'failed_at']
+    list_filter = ['sent_at', 'failed_at']
+
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ['name', 'kind']
+    list_filter = ['kind']
+    search_fields = ['name', 'aliases']
+
+
+@admin.register(SkillDemand)
+class SkillDemandAdmin(admin.ModelAdmin):
+    list_display = ['period', 'granularity', 'skill_id', 'industry', 'count']
+    list_filter = ['granularity', 'industry']
+
+
+@admin.register(JobNeighbours)
+class JobNeighboursAdmin(admin.ModelAdmin):
+    list_display = ['job', 'computed_at']
+    raw_id_fields = ['job']
+
+
+@admin.register(ArchivedJob)
+class ArchivedJobAdmin(admin.ModelAdmin):
+    list_display = ['title', 'industry', 'publication_date', 'archived_at']
+    list_filter = ['industry']
+    search_fields = ['title']
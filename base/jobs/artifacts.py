@@ -0,0 +1,76 @@
+"""
+Generation-versioned objects published through the shared cache.
+
+A builder (usually a Celery task) publishes a new version of a derived
+structure - a facet index, a suggestion trie - and every web process keeps
+the latest version in memory, re-checking the generation number at most
+every ARTIFACT_CHECK_INTERVAL seconds instead of fetching per request.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_loaded: Dict[str, Tuple[int, Any]] = {}
+_checked_at: Dict[str, float] = {}
+
+
+def _generation_key(name: str) -> str:
+    return f'artifact:{name}:generation'
+
+
+def _data_key(name: str, generation: int) -> str:
+    return f'artifact:{name}:{generation}'
+
+
+def publish(name: str, obj: Any) -> int:
+    """Store a new version of the artifact and return its generation"""
+    try:
+        generation = cache.incr(_generation_key(name))
+    except ValueError:
+        generation = 1
+        cache.set(_generation_key(name), generation, timeout=None)
+
+    # Keep the data past the next publish so readers mid-swap still find it
+    cache.set(_data_key(name, generation), obj, timeout=settings.ARTIFACT_TIMEOUT)
+
+    with _lock:
+        _loaded[name] = (generation, obj)
+        _checked_at[name] = time.monotonic()
+
+    logger.info(f"Published {name} generation {generation}")
+    return generation
+
+
+def load(name: str, build: Optional[Callable[[], Any]] = None) -> Tuple[int, Any]:
+    """
+    The latest (generation, object) for this process. When nothing has been
+    published yet, `build` is called and its result published.
+    """
+    now = time.monotonic()
+    current = _loaded.get(name)
+    if current is not None and now - _checked_at.get(name, 0) < settings.ARTIFACT_CHECK_INTERVAL:
+        return current
+
+    generation = cache.get(_generation_key(name))
+    if current is not None and current[0] == generation:
+        _checked_at[name] = now
+        return current
+
+    obj = cache.get(_data_key(name, generation)) if generation else None
+    if obj is None:
+        if build is None:
+            return current if current is not None else (0, None)
+        generation = publish(name, build())
+        return _loaded[name]
+
+    with _lock:
+        _loaded[name] = (generation, obj)
+        _checked_at[name] = now
+    return _loaded[name]
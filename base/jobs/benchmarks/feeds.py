@@ -0,0 +1,119 @@
+"""Synthetic myjobmag-style feeds for benchmarks"""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Iterator
+from xml.sax.saxutils import escape
+import random
+
+from django.conf import settings
+
+INDUSTRIES = [
+    'NGO / Non-Profit Associations', 'ICT / Computer', 'Banking',
+    'Education / Teaching', 'Healthcare / Medical', 'Sales / Marketing',
+    'Manufacturing', 'Consulting', 'Agriculture / Agro-Allied',
+]
+LOCATIONS = ['Nairobi', 'Mombasa', 'Kisumu', 'Nakuru', 'Eldoret', 'Remote']
+OTHER_TITLES = [
+    'Sales Executive', 'Accountant', 'Program Officer', 'Nurse',
+    'Field Coordinator', 'Procurement Officer', 'Driver', 'Teacher',
+]
+COMPANIES = [f'Company {n}' for n in range(500)]
+FILLER = (
+    'We are looking for a motivated professional to join our growing team. '
+    'You will work closely with stakeholders to deliver results, maintain '
+    'high standards and support the organisation in achieving its mission. '
+)
+
+
+def generate_items(count: int, match_ratio: float = 0.3, seed: int = 0,
+                   description_words: int = 250) -> Iterator[dict]:
+    """
+    Yield raw feed items. Roughly match_ratio of them are tech jobs in an
+    allowed industry, so they survive JobFetcher's filter.
+    """
+    rng = random.Random(seed)
+    tech_titles = sorted(settings.TECH_JOB_TITLES)
+    skills = sorted(settings.TECH_SKILLS | settings.SOFT_SKILLS)
+    allowed = sorted(settings.ALLOWED_INDUSTRIES)
+    filler_words = FILLER.split()
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    for n in range(count):
+        if rng.random() < match_ratio:
+            position = rng.choice(tech_titles)
+            industry = rng.choice(allowed)
+        else:
+            position = rng.choice(OTHER_TITLES)
+            industry = rng.choice(INDUSTRIES)
+        company = rng.choice(COMPANIES)
+
+        words = [rng.choice(filler_words) for _ in range(description_words)]
+        for skill in rng.sample(skills, rng.randint(2, 8)):
+            words.insert(rng.randrange(len(words)), skill)
+
+        yield {
+            'title': f'{position} at {company}',
+            'industry': industry,
+            'position': position,
+            'company': company,
+            'location': rng.choice(LOCATIONS),
+            'link': f'https://bench.invalid/jobs/{seed}/{n}',
+            'pub_date': format_datetime(start + timedelta(minutes=n), usegmt=True),
+            'description': ' '.join(words),
+        }
+
+
+def generate_jobs(count: int, match_ratio: float = 0.3, seed: int = 0,
+                  description_words: int = 50) -> Iterator[dict]:
+    """Yield job dicts shaped like JobFetcher.parse_jobs output"""
+    tech_skills = {skill.lower() for skill in settings.TECH_SKILLS}
+    soft_skills = {skill.lower() for skill in settings.SOFT_SKILLS}
+
+    for item in generate_items(count, match_ratio=match_ratio, seed=seed,
+                               description_words=description_words):
+        description = item['description'].lower()
+        job_tech = sorted(skill for skill in tech_skills if skill in description)
+        job_soft = sorted(skill for skill in soft_skills if skill in description)
+
+        yield {
+            'title': item['title'],
+            'description': item['description'],
+            'job_link': item['link'],
+            'publication_date': item['pub_date'],
+            'industry': item['industry'],
+            'position': item['position'],
+            'company': item['company'],
+            'location': item['location'],
+            'skills': job_tech + job_soft,
+            'tech_skills': job_tech,
+            'soft_skills': job_soft,
+        }
+
+
+def _cdata(value: str) -> str:
+    return f'<![CDATA[ {value} ]]>'
+
+
+def generate_feed(count: int, **kwargs) -> bytes:
+    """A complete jobsxml_by_categories.xml document with `count` items"""
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rss xmlns:atom="https://www.w3.org/2005/Atom" version="2.0">\n'
+        '<channel>\n<title>MyJobMag Job Feed</title>\n'
+        '<link>https://www.myjobmag.co.ke</link>\n'
+    ]
+    for item in generate_items(count, **kwargs):
+        parts.append(
+            '<item>\n'
+            f'<title>{_cdata(item["title"])}</title>\n'
+            f'<industry>{_cdata(item["industry"])}</industry>\n'
+            f'<position>{_cdata(item["position"])}</position>\n'
+            f'<company>{_cdata(item["company"])}</company>\n'
+            f'<location>{_cdata(item["location"])}</location>\n'
+            f'<link>{escape(item["link"])}</link>\n'
+            f'<pubDate>{item["pub_date"]}</pubDate>\n'
+            f'<description>{_cdata(item["description"])}</description>\n'
+            '</item>\n'
+        )
+    parts.append('</channel>\n</rss>\n')
+    return ''.join(parts).encode('utf-8')
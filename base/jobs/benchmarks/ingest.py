@@ -0,0 +1,85 @@
+"""Stage-by-stage benchmark of the ingest pipeline"""
+from typing import Any, Dict
+import asyncio
+import gc
+
+from django.db import transaction
+
+from monitor.metrics import Stopwatch
+from ..services import JobFetcher
+from ..tasks import save_jobs
+from .feeds import generate_feed
+from .server import FeedServer
+from .utils import QueryCounter, Timer, peak_rss_mb
+
+
+class _Rollback(Exception):
+    pass
+
+
+def run_ingest_benchmark(size: int, match_ratio: float = 0.3, seed: int = 0,
+                         keep: bool = False) -> Dict[str, Any]:
+    """
+    Serve a synthetic feed of `size` items locally and push it through
+    download, parse, text, extract, filter and upsert. The upsert is rolled back
+    unless keep is set.
+    """
+    feed = generate_feed(size, match_ratio=match_ratio, seed=seed)
+    gc.collect()
+
+    with FeedServer(feed) as server:
+        fetcher = JobFetcher(url=server.url)
+
+        async def download():
+            try:
+                return await fetcher._download()
+            finally:
+                await fetcher.close()
+
+        with Timer() as download_timer:
+            content = asyncio.run(download())
+
+    stopwatch = Stopwatch()
+    with Timer() as parse_timer:
+        jobs = fetcher.parse_jobs(content, stopwatch=stopwatch)
+
+    counts = {}
+    with QueryCounter() as queries, Timer() as upsert_timer:
+        try:
+            with transaction.atomic():
+                counts = save_jobs(jobs)
+                if not keep:
+                    raise _Rollback()
+        except _Rollback:
+            pass
+
+    stages = {
+        'download': download_timer.seconds,
+        'parse': stopwatch.totals['parse'],
+        'text': stopwatch.totals['text'],
+        'extract': stopwatch.totals['extract'],
+        'filter': stopwatch.totals['filter'],
+        'upsert': upsert_timer.seconds,
+    }
+
+    return {
+        'items': size,
+        'feed_bytes': len(feed),
+        'matched_jobs': len(jobs),
+        'upsert_counts': counts,
+        'stage_seconds': stages,
+        'items_per_second': {
+            stage: (jobs_in / seconds if seconds else None)
+            for stage, seconds, jobs_in in [
+                ('download', stages['download'], size),
+                ('parse', stages['parse'], size),
+                ('text', stages['text'], size),
+                ('extract', stages['extract'], size),
+                ('filter', stages['filter'], size),
+                ('upsert', stages['upsert'], len(jobs)),
+            ]
+        },
+        'total_seconds': download_timer.seconds + parse_timer.seconds + upsert_timer.seconds,
+        'db_round_trips': queries.count,
+        'peak_rss_mb': peak_rss_mb(),
+    }
@@ -0,0 +1,114 @@
+"""Build, query and memory benchmark for SearchIndex-compatible engines"""
+from typing import Any, Callable, Dict, List, Tuple
+import gc
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+
+from .feeds import LOCATIONS, generate_jobs
+
+QUERY_TYPES = ('title_prefix', 'skills', 'industry_location')
+
+
+def build_query_mix(count: int, seed: int = 0) -> List[Tuple[str, Dict[str, Any]]]:
+    """A fixed, reproducible mix of search() keyword arguments"""
+    rng = random.Random(seed)
+    title_words = sorted({
+        word.lower()
+        for title in settings.TECH_JOB_TITLES
+        for word in title.replace('-', ' ').split()
+        if len(word) > 2
+    })
+    skills = sorted(skill.lower() for skill in settings.TECH_SKILLS)
+    industries = sorted(settings.ALLOWED_INDUSTRIES)
+
+    queries = []
+    for n in range(count):
+        kind = QUERY_TYPES[n % len(QUERY_TYPES)]
+        if kind == 'title_prefix':
+            word = rng.choice(title_words)
+            criteria = {'title_patterns': [word[:rng.randint(2, len(word))]]}
+        elif kind == 'skills':
+            criteria = {'skills': rng.sample(skills, rng.randint(1, 3))}
+        else:
+            criteria = {
+                'industries': [rng.choice(industries)],
+                'locations': [rng.choice(LOCATIONS)],
+            }
+        queries.append((kind, criteria))
+    return queries
+
+
+def _percentile(values: List[float], pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[pct - 1]
+
+
+def run_search_benchmark(engine: Callable[[], Any], size: int, queries: int = 300,
+                         seed: int = 0) -> Dict[str, Any]:
+    """
+    Benchmark one engine at one corpus size. `engine` is a zero-argument
+    factory returning an object with add_job/bulk_add_jobs/search.
+    """
+    jobs = list(generate_jobs(size, seed=seed))
+
+    # Build time, one job at a time and in bulk
+    gc.collect()
+    index = engine()
+    started = time.perf_counter()
+    for job in jobs:
+        index.add_job(job)
+    add_seconds = time.perf_counter() - started
+
+    bulk_index = engine()
+    started = time.perf_counter()
+    bulk_index.bulk_add_jobs(jobs)
+    bulk_seconds = time.perf_counter() - started
+    del bulk_index
+
+    # Memory held by an index, measured on a separate build because
+    # tracemalloc slows allocation down considerably
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    measured = engine()
+    for job in jobs:
+        measured.add_job(job)
+    gc.collect()
+    retained = sum(
+        stat.size_diff
+        for stat in tracemalloc.take_snapshot().compare_to(baseline, 'filename')
+    )
+    tracemalloc.stop()
+    del measured
+
+    # Query latency per query type
+    latencies = {kind: [] for kind in QUERY_TYPES}
+    result_sizes = {kind: [] for kind in QUERY_TYPES}
+    for kind, criteria in build_query_mix(queries, seed=seed):
+        started = time.perf_counter()
+        results = index.search(**criteria)
+        latencies[kind].append(time.perf_counter() - started)
+        result_sizes[kind].append(len(results))
+
+    return {
+        'jobs': size,
+        'build_seconds': add_seconds,
+        'build_jobs_per_second': size / add_seconds if add_seconds else None,
+        'bulk_build_seconds': bulk_seconds,
+        'memory_bytes': retained,
+        'memory_bytes_per_job': retained / size if size else None,
+        'queries': {
+            kind: {
+                'count': len(values),
+                'p50_ms': _percentile(values, 50) * 1000,
+                'p99_ms': _percentile(values, 99) * 1000,
+                'mean_results': statistics.fmean(result_sizes[kind]) if values else 0,
+            }
+            for kind, values in latencies.items()
+        },
+    }
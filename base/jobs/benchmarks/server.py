@@ -0,0 +1,45 @@
+"""A local HTTP stand-in for the myjobmag feed"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+
+
+class FeedServer:
+    """
+    Serve a fixed payload on 127.0.0.1 from a background thread:
+
+        with FeedServer(feed) as server:
+            JobFetcher(url=server.url)
+    """
+
+    def __init__(self, payload: bytes):
+        self.payload = payload
+
+        payload_ref = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/xml')
+                self.send_header('Content-Length', str(len(payload_ref.payload)))
+                self.end_headers()
+                self.wfile.write(payload_ref.payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/jobsxml_by_categories.xml'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
@@ -0,0 +1,146 @@
+"""
+Cold-start time of manage.py, the web app and Celery workers.
+
+Each target runs in a fresh interpreter. Wall time is the median over a
+few plain runs; one extra run under `python -X importtime` says where the
+time went and which modules pulled in anything listed in
+STARTUP_DEFERRED_MODULES.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+
+TARGETS = {
+    # Setup every management command pays before doing its own work
+    'manage': ['manage.py', 'help', '--commands'],
+    # WSGI application plus the URLconf, which imports every view
+    'web': ['-c', 'from base.wsgi import application; '
+                  'from django.urls import get_resolver; get_resolver().url_patterns'],
+    # What a worker's main process imports before it forks the pool
+    'worker': ['-c', 'from base.celery import app; app.loader.import_default_modules()'],
+}
+
+# Environment each target runs with, matching how it is started in production
+TARGET_ENV = {
+    'worker': {'CELERY_SKIP_CHECKS': '1'},  # Set by run_worker
+}
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+    importer: Optional[int] = None  # Index of the record that imported this one
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """
+    Records from `-X importtime` stderr, in the order Python printed them.
+    A module is printed after everything it imported, one level deeper, so
+    the importer of a record is the next one printed at a lower depth.
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # The header line
+        name = fields[2].rstrip()
+        records.append(ImportRecord(
+            module=name.strip(),
+            self_us=int(fields[0]),
+            cumulative_us=int(fields[1]),
+            depth=(len(name) - len(name.lstrip()) - 1) // 2,
+        ))
+
+    pending: List[int] = []
+    for index, record in enumerate(records):
+        while pending and records[pending[-1]].depth > record.depth:
+            records[pending.pop()].importer = index
+        pending.append(index)
+    return records
+
+
+def import_chain(records: List[ImportRecord], index: int) -> List[str]:
+    """The module at `index` followed by the modules that led to importing it"""
+    chain = []
+    while index is not None:
+        chain.append(records[index].module)
+        index = records[index].importer
+    return chain
+
+
+def deferred_imports(records: List[ImportRecord], modules: List[str]) -> Dict[str, List[str]]:
+    """Import chain of the first import of each of `modules` (or a submodule)"""
+    found = {}
+    for index, record in enumerate(records):
+        top = record.module.split('.')[0]
+        if top in modules and top not in found:
+            # Report the outermost module of the package, not a submodule
+            while records[index].importer is not None and \
+                    records[records[index].importer].module.split('.')[0] == top:
+                index = records[index].importer
+            found[top] = import_chain(records, index)
+    return found
+
+
+def _run(target: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    argv = TARGETS[target]
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'base.settings', **TARGET_ENV.get(target, {})}
+    flags = ['-X', 'importtime'] if importtime else []
+    result = subprocess.run(
+        [sys.executable, *flags, *argv],
+        cwd=settings.BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(argv)} exited with {result.returncode}:\n{result.stderr[-2000:]}")
+    return result
+
+
+def measure_startup(target: str, repeat: int = 5, top: int = 15) -> Dict[str, Any]:
+    _run(target)  # Warm the OS page cache and bytecode caches
+
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _run(target)
+        seconds.append(time.perf_counter() - started)
+
+    records = parse_importtime(_run(target, importtime=True).stderr)
+    # Only outermost imports add up to the total; nested ones are inside them
+    total_us = sum(record.cumulative_us for record in records if record.importer is None)
+    return {
+        'target': target,
+        'repeat': repeat,
+        'median_seconds': statistics.median(seconds),
+        'min_seconds': min(seconds),
+        'max_seconds': max(seconds),
+        'import_seconds': total_us / 1e6,
+        'modules': len(records),
+        'slowest_cumulative': [
+            {
+                'module': r.module,
+                'ms': r.cumulative_us / 1000,
+                'via': import_chain(records, r.importer) if r.importer is not None else [],
+            }
+            for r in sorted(records, key=lambda r: -r.cumulative_us)[:top]
+        ],
+        'slowest_self': [
+            {'module': r.module, 'ms': r.self_us / 1000}
+            for r in sorted(records, key=lambda r: -r.self_us)[:top]
+        ],
+        'deferred_imported': deferred_imports(records, settings.STARTUP_DEFERRED_MODULES),
+    }
@@ -0,0 +1,84 @@
+"""Helpers shared by the benchmark commands"""
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.db import connection
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return peak / divisor
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR,
+            stderr=subprocess.DEVNULL,
+            text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class QueryCounter:
+    """Count database round trips made inside the block"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._wrapper.__exit__(*exc)
+
+
+class Timer:
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self._started
+        return False
+
+
+def save_results(name: str, results: Dict[str, Any], output_dir: str = None) -> Path:
+    """
+    Write results as JSON under benchmarks/results/, named after the
+    benchmark and the current commit so runs can be diffed across commits.
+    """
+    commit = git_commit()
+    now = datetime.now(timezone.utc)
+    directory = Path(output_dir or settings.BASE_DIR / 'benchmarks' / 'results')
+    directory.mkdir(parents=True, exist_ok=True)
+
+    path = directory / f'{name}-{commit}-{now:%Y%m%dT%H%M%S}.json'
+    path.write_text(json.dumps({
+        'benchmark': name,
+        'commit': commit,
+        'timestamp': now.isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }, indent=2, default=str))
+    return path
@@ -0,0 +1,118 @@
+"""
+Process-wide compiled matchers for job classification.
+
+Building the skill and title regexes is the expensive part of setting up a
+JobFetcher, so compiled classifiers are cached per process, keyed by a hash
+of the vocabulary (job titles from settings plus skill names and aliases
+from the Skill dictionary). A Skill change moves the dictionary version,
+which changes the hash, so the next fetcher builds a fresh classifier.
+"""
+from collections import OrderedDict
+from typing import Dict, Iterable, Set, Tuple
+import hashlib
+import re
+import threading
+
+from django.conf import settings
+
+from .skills import SkillDictionary
+
+
+class BoundedMemo:
+    """Thread-safe LRU memo with hit/miss counters"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        value = compute(key)
+
+        with self._lock:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _alternation(terms: Iterable[str]) -> re.Pattern:
+    # Longest first so "Senior Software Engineer" wins over "Software Engineer"
+    ordered = sorted(set(terms), key=lambda term: (-len(term), term))
+    return re.compile(r'\b(' + '|'.join(map(re.escape, ordered)) + r')\b', re.IGNORECASE)
+
+
+class JobClassifier:
+    def __init__(self, titles: Iterable[str], skill_terms: Dict[str, int],
+                 skill_kinds: Dict[int, str]):
+        self.skill_terms = skill_terms  # lowercase name or alias -> skill id
+        self.skill_kinds = skill_kinds
+        self._skill_pattern = _alternation(skill_terms) if skill_terms else None
+        self._title_pattern = _alternation(title.lower() for title in titles)
+        self.title_memo = BoundedMemo(settings.CLASSIFIER_TITLE_CACHE_SIZE)
+
+    def extract_skill_ids(self, text: str) -> Tuple[Set[int], Set[int]]:
+        """(tech skill ids, soft skill ids) mentioned in the text, in one regex pass"""
+        tech, soft = set(), set()
+        if self._skill_pattern is None:
+            return tech, soft
+
+        for match in self._skill_pattern.finditer(text):
+            skill_id = self.skill_terms[match.group(1).lower()]
+            (soft if self.skill_kinds[skill_id] == 'soft' else tech).add(skill_id)
+        return tech, soft
+
+    def matches_title(self, title: str) -> bool:
+        """Whether the title mentions a tech job title; memoized per process"""
+        return self.title_memo.get_or_compute(
+            title.lower(),
+            lambda key: self._title_pattern.search(key) is not None
+        )
+
+
+def vocabulary_version(titles: Iterable[str], skill_terms: Dict[str, int],
+                       skill_kinds: Dict[int, str]) -> str:
+    digest = hashlib.sha1()
+    for title in sorted(title.lower() for title in titles):
+        digest.update(f't:{title}\n'.encode('utf-8'))
+    for term, skill_id in sorted(skill_terms.items()):
+        digest.update(f's:{term}:{skill_id}:{skill_kinds[skill_id]}\n'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+_lock = threading.Lock()
+_classifiers: 'OrderedDict[str, JobClassifier]' = OrderedDict()
+
+
+def get_classifier(dictionary: SkillDictionary) -> JobClassifier:
+    """The compiled classifier for the current vocabulary, built once per process"""
+    titles = settings.TECH_JOB_TITLES
+    version = vocabulary_version(titles, dictionary.ids_by_name, dictionary.kinds_by_id)
+
+    with _lock:
+        if version in _classifiers:
+            _classifiers.move_to_end(version)
+            return _classifiers[version]
+
+        classifier = JobClassifier(titles, dict(dictionary.ids_by_name), dict(dictionary.kinds_by_id))
+        _classifiers[version] = classifier
+        # Old vocabularies are dropped with their memoized titles
+        while len(_classifiers) > 2:
+            _classifiers.popitem(last=False)
+        return classifier
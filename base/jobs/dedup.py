@@ -0,0 +1,141 @@
+"""
+Near-duplicate detection for cross-posted jobs.
+
+Each job gets a 64-bit SimHash over word shingles of its normalized title,
+company and description. Two postings whose fingerprints differ in at most
+DEDUP_MAX_DISTANCE bits are treated as the same job. The fingerprint is split
+into DEDUP_BANDS bands; with more bands than allowed differing bits, any two
+near-duplicates agree on at least one whole band, so candidates can be found
+with an indexed array overlap on the band keys instead of a full scan.
+
+Jobs without a description are not fingerprinted: title and company alone
+would make every opening at one company look like the same job.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r'\w+')
+
+
+def _check_bands(max_distance: int) -> None:
+    if max_distance >= settings.DEDUP_BANDS:
+        raise ImproperlyConfigured(
+            f"The near-duplicate distance ({max_distance}) must be less than "
+            f"DEDUP_BANDS ({settings.DEDUP_BANDS}), or duplicates differing in "
+            f"every band are never compared"
+        )
+
+
+_check_bands(settings.DEDUP_MAX_DISTANCE)
+
+
+def normalize(text: str) -> List[str]:
+    """Lowercase words with markup and punctuation removed"""
+    return _WORD_RE.findall(_TAG_RE.sub(' ', text or '').lower())
+
+
+def shingles(words: List[str], size: int = SHINGLE_SIZE) -> set:
+    if len(words) < size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def simhash(features: Iterable[str]) -> int:
+    """Unsigned 64-bit SimHash of the given features"""
+    hashes = [
+        format(int.from_bytes(
+            hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(),
+            'big'
+        ), '064b')
+        for feature in features
+    ]
+    if not hashes:
+        return 0
+
+    # A bit is set when more than half of the feature hashes set it;
+    # zip(*hashes) walks the bit columns in C rather than per feature.
+    half = len(hashes) / 2
+    return int(''.join('1' if column.count('1') > half else '0' for column in zip(*hashes)), 2)
+
+
+def fingerprint_job(job: Dict) -> Optional[int]:
+    """
+    Signed 64-bit fingerprint (fits a bigint column) for a job dict, or
+    None when it has no description to compare
+    """
+    if not normalize(job.get('description')):
+        return None
+    words = normalize(' '.join([
+        job.get('title') or '',
+        job.get('company') or '',
+        job.get('description') or '',
+    ]))
+    value = simhash(shingles(words))
+    return value - (1 << FINGERPRINT_BITS) if value >= 1 << (FINGERPRINT_BITS - 1) else value
+
+
+def band_keys(fingerprint: Optional[int]) -> List[int]:
+    """One integer per band, tagged with the band number so bands never collide"""
+    if fingerprint is None:
+        return []
+    bands = settings.DEDUP_BANDS
+    width = FINGERPRINT_BITS // bands
+    mask = (1 << width) - 1
+    value = fingerprint & ((1 << FINGERPRINT_BITS) - 1)
+    return [(band << width) | (value >> (band * width) & mask) for band in range(bands)]
+
+
+def distance(a: int, b: int) -> int:
+    return ((a ^ b) & ((1 << FINGERPRINT_BITS) - 1)).bit_count()
+
+
+class DuplicateDetector:
+    """
+    LSH index of canonical jobs, loaded once per ingest batch and extended
+    as new canonical jobs are created.
+    """
+
+    def __init__(self, max_distance: Optional[int] = None):
+        self.max_distance = settings.DEDUP_MAX_DISTANCE if max_distance is None else max_distance
+        _check_bands(self.max_distance)
+        self.buckets: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+
+    def add(self, job_id: int, fingerprint: Optional[int]) -> None:
+        for key in band_keys(fingerprint):
+            self.buckets[key].append((job_id, fingerprint))
+
+    def load(self, fingerprints: Iterable[Optional[int]]) -> None:
+        """Load the stored canonical jobs that share a band with any fingerprint"""
+        from .models import Job
+
+        keys = sorted({key for fingerprint in fingerprints for key in band_keys(fingerprint)})
+        if not keys:
+            return
+
+        candidates = Job.objects.filter(
+            canonical__isnull=True,
+            fingerprint_bands__overlap=keys
+        ).values_list('id', 'fingerprint')
+        for job_id, fingerprint in candidates:
+            self.add(job_id, fingerprint)
+
+    def find(self, fingerprint: Optional[int]) -> Optional[int]:
+        """Id of the oldest canonical job within max_distance, if any"""
+        if fingerprint is None:
+            return None
+        matches = {
+            job_id
+            for key in band_keys(fingerprint)
+            for job_id, other in self.buckets.get(key, ())
+            if distance(fingerprint, other) <= self.max_distance
+        }
+        return min(matches) if matches else None
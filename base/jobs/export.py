@@ -0,0 +1,97 @@
+"""
+Bulk export of jobs as NDJSON or CSV.
+
+Rows are read with a server-side cursor (QuerySet.iterator) and encoded one
+line at a time, so an export of any size runs in constant memory and can
+be streamed straight into an HTTP response or a file.
+
+Under ASGI a response fed by a sync iterator is collected into a list
+before anything is sent, so ASGI responses use aexport_lines instead.
+"""
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Iterator, Optional
+import csv
+import itertools
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+from .skills import get_skill_dictionary
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+FIELDS = [
+    'id', 'title', 'industry', 'position', 'company', 'location',
+    'skills', 'job_link', 'publication_date', 'description', 'updated_at',
+]
+
+_COLUMNS = [field for field in FIELDS if field != 'skills'] + ['skill_ids']
+
+
+def export_queryset(queryset: QuerySet, since: Optional[datetime] = None) -> QuerySet:
+    """
+    Restrict to jobs updated at or after `since` and order by update time,
+    so a consumer can resume from the last updated_at it has seen. The
+    bound is inclusive: rows at the boundary repeat rather than go missing.
+    """
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+    return queryset.order_by('updated_at', 'id')
+
+
+def iter_rows(queryset: QuerySet, chunk_size: int = None) -> Iterator[dict]:
+    dictionary = get_skill_dictionary()
+    rows = queryset.values(*_COLUMNS).iterator(chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE)
+    for row in rows:
+        row['skills'] = dictionary.names(row.pop('skill_ids'))
+        yield row
+
+
+def ndjson_lines(rows: Iterable[dict]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps({field: row[field] for field in FIELDS}, cls=DjangoJSONEncoder) + '\n'
+
+
+class _Line:
+    """File-like target that hands back what csv.writer writes"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows: Iterable[dict]) -> Iterator[str]:
+    writer = csv.writer(_Line())
+    yield writer.writerow(FIELDS)
+    for row in rows:
+        yield writer.writerow([
+            ';'.join(row[field]) if field == 'skills' else
+            row[field].isoformat() if isinstance(row[field], datetime) else
+            row[field]
+            for field in FIELDS
+        ])
+
+
+def export_lines(queryset: QuerySet, fmt: str, since: Optional[datetime] = None,
+                 chunk_size: int = None) -> Iterator[str]:
+    rows = iter_rows(export_queryset(queryset, since), chunk_size)
+    return ndjson_lines(rows) if fmt == 'ndjson' else csv_lines(rows)
+
+
+async def aexport_lines(queryset: QuerySet, fmt: str, since: Optional[datetime] = None,
+                        chunk_size: int = None) -> AsyncIterator[str]:
+    """
+    export_lines as an async iterator. Each chunk is read in Django's sync
+    thread, so the server-side cursor stays on one connection, and memory
+    stays bounded by the chunk size.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    lines = export_lines(queryset, fmt, since, chunk_size)
+    next_chunk = sync_to_async(lambda: ''.join(itertools.islice(lines, chunk_size)))
+    while chunk := await next_chunk():
+        yield chunk
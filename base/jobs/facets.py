@@ -0,0 +1,159 @@
+"""
+Facet counts for the jobs API from an in-memory bitmap index.
+
+Every canonical job gets an ordinal; each facet value (industry, location,
+skill) maps to the ordinals of its jobs. A filter is an AND of OR-ed bitmaps
+and a count is a popcount, so a facet request costs a few hundred big-int
+operations regardless of how the filters are combined.
+
+A value held by many jobs keeps its ordinals as a bitmap in a Python int; a
+rare one keeps a sorted array of them, which is smaller whenever fewer than
+one job in 32 has the value. Memory therefore grows with the number of
+(job, value) pairs rather than with values times jobs.
+
+The index is built by the refresh_facets task only; until it has published
+one, the endpoint answers 503 instead of building it in a request.
+"""
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Union
+import logging
+
+from .artifacts import load, publish
+from .models import Job
+from .skills import get_skill_dictionary
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_NAME = 'facets'
+
+Posting = Union[int, array]
+
+
+def _bitmap(ordinals: Iterable[int], size: int) -> int:
+    bits = bytearray((size + 7) // 8)
+    for ordinal in ordinals:
+        bits[ordinal >> 3] |= 1 << (ordinal & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def _posting(ordinals: List[int], size: int) -> Posting:
+    """Whichever of a bitmap (size bits) or an array (32 bits per job) is smaller"""
+    if len(ordinals) * 32 >= size:
+        return _bitmap(ordinals, size)
+    return array('I', ordinals)
+
+
+class FacetIndex:
+    def __init__(self, size: int, industries: Dict[str, Posting],
+                 locations: Dict[str, Posting], skills: Dict[int, Posting]):
+        self.size = size
+        self.industries = industries
+        self.locations = locations
+        self.skills = skills
+
+    @classmethod
+    def build(cls, rows: Iterable[tuple]) -> 'FacetIndex':
+        """Build from (industry, location, skill_ids) rows"""
+        industries = defaultdict(list)
+        locations = defaultdict(list)
+        skills = defaultdict(list)
+        size = 0
+
+        for ordinal, (industry, location, skill_ids) in enumerate(rows):
+            industries[industry or ''].append(ordinal)
+            locations[location or ''].append(ordinal)
+            for skill_id in skill_ids or []:
+                skills[skill_id].append(ordinal)
+            size = ordinal + 1
+
+        return cls(
+            size,
+            {value: _posting(ordinals, size) for value, ordinals in industries.items()},
+            {value: _posting(ordinals, size) for value, ordinals in locations.items()},
+            {value: _posting(ordinals, size) for value, ordinals in skills.items()},
+        )
+
+    @classmethod
+    def from_database(cls) -> 'FacetIndex':
+        rows = (
+            Job.objects.filter(canonical__isnull=True)
+            .order_by()
+            .values_list('industry', 'location', 'skill_ids')
+            .iterator(chunk_size=5000)
+        )
+        return cls.build(rows)
+
+    def filter(self, industry: Optional[str] = None,
+               skill_ids: Optional[List[int]] = None) -> int:
+        """
+        Bitmap of jobs matching JobFilter's semantics: industry is a
+        case-insensitive substring, skills match if any overlaps.
+        """
+        mask = (1 << self.size) - 1
+
+        if industry:
+            needle = industry.lower()
+            matched = 0
+            for value, posting in self.industries.items():
+                if needle in value.lower():
+                    matched |= self._as_bitmap(posting)
+            mask &= matched
+
+        if skill_ids is not None:
+            matched = 0
+            for skill_id in skill_ids:
+                matched |= self._as_bitmap(self.skills.get(skill_id, 0))
+            mask &= matched
+
+        return mask
+
+    def _as_bitmap(self, posting: Posting) -> int:
+        if isinstance(posting, int):
+            return posting
+        return _bitmap(posting, self.size)
+
+    @staticmethod
+    def _counts(postings: Dict, mask: int, mask_bytes: bytes, limit: int) -> List[tuple]:
+        counts = []
+        for value, posting in postings.items():
+            if isinstance(posting, int):
+                count = (posting & mask).bit_count()
+            else:
+                count = sum(mask_bytes[ordinal >> 3] >> (ordinal & 7) & 1 for ordinal in posting)
+            if count:
+                counts.append((value, count))
+        counts.sort(key=lambda item: (-item[1], str(item[0])))
+        return counts[:limit]
+
+    def counts(self, mask: int, limit: int = 50) -> Dict:
+        names = get_skill_dictionary().names_by_id
+        # Array postings are tested ordinal by ordinal against these bytes
+        mask_bytes = mask.to_bytes((self.size + 7) // 8, 'little')
+        return {
+            'count': mask.bit_count(),
+            'industry': [
+                {'value': value, 'count': count}
+                for value, count in self._counts(self.industries, mask, mask_bytes, limit)
+            ],
+            'location': [
+                {'value': value, 'count': count}
+                for value, count in self._counts(self.locations, mask, mask_bytes, limit)
+            ],
+            'skills': [
+                {'value': names.get(skill_id, str(skill_id)), 'count': count}
+                for skill_id, count in self._counts(self.skills, mask, mask_bytes, limit)
+            ],
+        }
+
+
+def publish_facet_index() -> int:
+    """Rebuild the index from the database and publish it to every process"""
+    index = FacetIndex.from_database()
+    logger.info(f"Built facet index over {index.size} jobs")
+    return publish(ARTIFACT_NAME, index)
+
+
+def get_facet_index():
+    """(generation, FacetIndex), or (0, None) until refresh_facets has published one"""
+    return load(ARTIFACT_NAME)
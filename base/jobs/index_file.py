@@ -0,0 +1,325 @@
+"""
+Read-only search index stored in a file and shared through mmap.
+
+A builder (the refresh_search_index task, one at a time under a lease lock)
+writes the whole index for the canonical jobs to a new generation file, then
+atomically repoints CURRENT at it. Every web and worker process maps the current file read-only, so the
+index lives once in the OS page cache however many processes read it, and
+lookups slice posting lists straight out of the mapping without copying or
+unpickling anything.
+
+Layout (little-endian, sections 8-byte aligned):
+
+    header      magic, format version, generation, doc count, term count
+    sections    (offset, length) of each section below
+    doc_ids     int64 per doc: Job.id
+    pub_dates   int64 per doc: publication_date as epoch seconds
+    key_offsets uint32 per term + 1: slices of key_blob
+    key_blob    sorted term keys, b'<field>\\x1f<term>'
+    post_offsets uint64 per term + 1: slices of postings
+    postings    uint32 doc ordinals, ascending per term
+
+Docs are numbered newest publication_date first, so ascending ordinals are
+already in the API's default order.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import logging
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'JIX1'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sIQII')
+SECTIONS = ('doc_ids', 'pub_dates', 'key_offsets', 'key_blob', 'post_offsets', 'postings')
+SECTION = struct.Struct('<QQ')
+CURRENT = 'CURRENT'
+SEPARATOR = b'\x1f'
+
+FIELDS = ('title', 'skill', 'industry', 'location')
+
+
+def _key(field: str, term: str) -> bytes:
+    return field.encode() + SEPARATOR + term.encode()
+
+
+def _words(text: str) -> Set[str]:
+    return set(re.findall(r'\w+', (text or '').lower()))
+
+
+def _pad(data: bytes) -> bytes:
+    return data + b'\0' * (-len(data) % 8)
+
+
+def write_index(path: Path, generation: int, rows: Iterable[tuple]) -> int:
+    """
+    Write an index file from (id, title, position, industry, location,
+    skill_ids, publication_date) rows given newest first. Returns the
+    number of docs.
+    """
+    doc_ids = []
+    pub_dates = []
+    terms: Dict[bytes, List[int]] = defaultdict(list)
+
+    for ordinal, (job_id, title, position, industry, location, skill_ids, published) in enumerate(rows):
+        doc_ids.append(job_id)
+        pub_dates.append(int(published.timestamp()))
+        for word in _words(title) | _words(position):
+            terms[_key('title', word)].append(ordinal)
+        for skill_id in set(skill_ids or ()):
+            terms[_key('skill', str(skill_id))].append(ordinal)
+        terms[_key('industry', (industry or '').lower())].append(ordinal)
+        terms[_key('location', (location or '').lower())].append(ordinal)
+
+    keys = sorted(terms)
+    key_offsets = [0]
+    post_offsets = [0]
+    for key in keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+        post_offsets.append(post_offsets[-1] + len(terms[key]))
+
+    count = len(doc_ids)
+    sections = [
+        struct.pack(f'<{count}q', *doc_ids),
+        struct.pack(f'<{count}q', *pub_dates),
+        struct.pack(f'<{len(key_offsets)}I', *key_offsets),
+        b''.join(keys),
+        struct.pack(f'<{len(post_offsets)}Q', *post_offsets),
+        b''.join(struct.pack(f'<{len(terms[key])}I', *terms[key]) for key in keys),
+    ]
+
+    offset = HEADER.size + SECTION.size * len(SECTIONS)
+    offset += -offset % 8
+    table = []
+    for data in sections:
+        table.append(SECTION.pack(offset, len(data)))
+        offset += len(_pad(data))
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, generation, count, len(keys)))
+        f.write(b''.join(table))
+        f.write(b'\0' * (-f.tell() % 8))
+        for data in sections:
+            f.write(_pad(data))
+        f.flush()
+        os.fsync(f.fileno())
+    return count
+
+
+class IndexReader:
+    """Zero-copy view of one index file"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.file_id = (stat.st_dev, stat.st_ino)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        magic, version, self.generation, self.size, self.term_count = HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} index file")
+
+        sections = {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = SECTION.unpack_from(view, HEADER.size + i * SECTION.size)
+            sections[name] = view[offset:offset + length]
+
+        self.doc_ids = sections['doc_ids'].cast('q')
+        self.pub_dates = sections['pub_dates'].cast('q')
+        self._key_offsets = sections['key_offsets'].cast('I')
+        self._key_blob = sections['key_blob']
+        self._post_offsets = sections['post_offsets'].cast('Q')
+        self._postings = sections['postings'].cast('I')
+
+    def _term_key(self, index: int) -> bytes:
+        return bytes(self._key_blob[self._key_offsets[index]:self._key_offsets[index + 1]])
+
+    def _lower_bound(self, key: bytes) -> int:
+        return bisect_left(range(self.term_count), key, key=self._term_key)
+
+    def _posting(self, index: int) -> memoryview:
+        return self._postings[self._post_offsets[index]:self._post_offsets[index + 1]]
+
+    def _terms_with_prefix(self, prefix: bytes) -> Iterator[Tuple[bytes, int]]:
+        index = self._lower_bound(prefix)
+        while index < self.term_count:
+            key = self._term_key(index)
+            if not key.startswith(prefix):
+                return
+            yield key, index
+            index += 1
+
+    def postings(self, field: str, term: str) -> memoryview:
+        key = _key(field, term)
+        index = self._lower_bound(key)
+        if index < self.term_count and self._term_key(index) == key:
+            return self._posting(index)
+        return self._postings[0:0]
+
+    def terms(self, field: str) -> Iterator[Tuple[str, int]]:
+        """(term, doc count) for every term of a field"""
+        prefix = _key(field, '')
+        for key, index in self._terms_with_prefix(prefix):
+            yield key[len(prefix):].decode(), self._post_offsets[index + 1] - self._post_offsets[index]
+
+    def _union(self, postings: Iterable[memoryview]) -> Set[int]:
+        matched = set()
+        for posting in postings:
+            matched.update(posting)
+        return matched
+
+    def search(self, query: str = '', skill_ids: Iterable[int] = (),
+               industry: str = '', location: str = '') -> List[int]:
+        """
+        Ordinals of docs, newest first, where every word of `query` starts a
+        title or position word, any of `skill_ids` is present, and industry
+        and location contain the given text (case-insensitive).
+        """
+        candidates: List[Set[int]] = []
+
+        for word in _words(query):
+            prefix = _key('title', word)
+            candidates.append(self._union(
+                self._posting(index) for _, index in self._terms_with_prefix(prefix)
+            ))
+        if skill_ids:
+            candidates.append(self._union(self.postings('skill', str(s)) for s in skill_ids))
+        for field, needle in (('industry', industry), ('location', location)):
+            if needle:
+                needle = needle.lower()
+                prefix = _key(field, '')
+                candidates.append(self._union(
+                    self._posting(index)
+                    for key, index in self._terms_with_prefix(prefix)
+                    if needle in key[len(prefix):].decode()
+                ))
+
+        if not candidates:
+            return list(range(self.size))
+        candidates.sort(key=len)
+        matched = candidates[0].intersection(*candidates[1:])
+        return sorted(matched)
+
+    def job_ids(self, ordinals: Iterable[int]) -> List[int]:
+        return [self.doc_ids[ordinal] for ordinal in ordinals]
+
+    def close(self) -> None:
+        for name in ('doc_ids', 'pub_dates', '_key_offsets', '_key_blob', '_post_offsets', '_postings'):
+            getattr(self, name).release()
+        self._mmap.close()
+
+
+def _directory() -> Path:
+    return Path(settings.SEARCH_INDEX_DIR)
+
+
+def _current_file(directory: Path) -> Optional[str]:
+    try:
+        return (directory / CURRENT).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def build_search_index() -> int:
+    """
+    Write a new generation from the database, switch CURRENT to it and
+    remove all but the previous generation. Returns the new generation.
+    """
+    directory = _directory()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    current = _current_file(directory)
+    generation = 1
+    if current:
+        generation = int(current.split('-')[1].split('.')[0]) + 1
+
+    rows = (
+        Job.objects.filter(canonical__isnull=True)
+        .order_by('-publication_date', '-id')
+        .values_list('id', 'title', 'position', 'industry', 'location',
+                     'skill_ids', 'publication_date')
+        .iterator(chunk_size=5000)
+    )
+    filename = f'index-{generation:08d}.bin'
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.index-')
+    os.close(fd)
+    try:
+        count = write_index(Path(tmp), generation, rows)
+        os.replace(tmp, directory / filename)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+    # Repoint CURRENT with a rename so readers see either file, never half
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.current-')
+    with os.fdopen(fd, 'w') as f:
+        f.write(filename)
+    os.replace(tmp, directory / CURRENT)
+
+    # Processes that still map an older file keep reading it after unlink
+    keep = {filename, current}
+    for old in directory.glob('index-*.bin'):
+        if old.name not in keep:
+            old.unlink(missing_ok=True)
+
+    logger.info(f"Built search index generation {generation} with {count} jobs")
+    return generation
+
+
+_lock = threading.Lock()
+_reader: Optional[IndexReader] = None
+_checked_at = 0.0
+
+
+def get_index_reader() -> Optional[IndexReader]:
+    """
+    This process's reader for the current generation, re-checking CURRENT
+    at most every ARTIFACT_CHECK_INTERVAL seconds. None until the first
+    build.
+    """
+    global _reader, _checked_at
+
+    now = time.monotonic()
+    if _reader is not None and now - _checked_at < settings.ARTIFACT_CHECK_INTERVAL:
+        return _reader
+
+    with _lock:
+        _checked_at = now
+        filename = _current_file(_directory())
+        if filename is None:
+            return _reader
+        path = _directory() / filename
+        if _reader is not None:
+            # Same name is not enough: a file replaced under that name needs
+            # a new mapping
+            try:
+                stat = path.stat()
+            except OSError as e:
+                logger.warning(f"Could not stat search index {filename}: {str(e)}")
+                return _reader
+            if _reader.file_id == (stat.st_dev, stat.st_ino):
+                return _reader
+        try:
+            reader = IndexReader(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not open search index {filename}: {str(e)}")
+            return _reader
+        # The old reader is left to the garbage collector: requests may
+        # still hold it, and its mapping stays valid until they finish
+        _reader = reader
+        return _reader
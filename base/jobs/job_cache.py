@@ -0,0 +1,92 @@
+"""
+Cache of serialized jobs for detail and multi-get requests.
+
+Each job has a small version key holding its updated_at, and its serialized
+form is stored under a key that includes that version, the skill dictionary
+version (skill names are part of the payload) and the serializer (lists and
+details use different forms). Reads cost
+two cache round trips for any number of jobs; a save or delete removes the
+version key, so the next read reloads the job instead of serving the old
+payload. Changes made with QuerySet.update() or bulk_update() fire no
+signals; callers invalidate with invalidate_jobs(), or the change is picked
+up when the version key expires after JOB_CACHE_TIMEOUT.
+
+Cached hits cost no query, so anything that changes which queryset a job
+belongs to (e.g. dedup_jobs linking it as a duplicate) must invalidate it.
+"""
+from typing import Dict, Iterable, List
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from monitor.metrics import inc
+
+from .skills import get_skill_dictionary
+
+logger = logging.getLogger(__name__)
+
+
+def _version_key(job_id: int) -> str:
+    return f'job:{job_id}:version'
+
+
+def _data_key(job_id: int, version: str, skills_version: int, serializer: str) -> str:
+    return f'job:{job_id}:{version}:{skills_version}:{serializer}'
+
+
+def invalidate_job(job_id: int) -> None:
+    try:
+        cache.delete(_version_key(job_id))
+    except Exception as e:
+        logger.warning(f"Could not invalidate cached job {job_id}: {str(e)}")
+
+
+def invalidate_jobs(job_ids: Iterable[int]) -> None:
+    """invalidate_job for many jobs in one round trip, e.g. after bulk_update()"""
+    try:
+        cache.delete_many([_version_key(job_id) for job_id in job_ids])
+    except Exception as e:
+        logger.warning(f"Could not invalidate cached jobs: {str(e)}")
+
+
+def get_serialized_jobs(ids: Iterable[int], queryset, serializer_class) -> List[dict]:
+    """
+    Serialized jobs for `ids`, in the order given, skipping ids that are not
+    in `queryset`. Cached payloads are used where current; the rest are
+    loaded in one query and cached.
+    """
+    ids = list(dict.fromkeys(ids))
+    skills_version = get_skill_dictionary().version
+    serializer = serializer_class.__name__
+    found: Dict[int, dict] = {}
+
+    try:
+        versions = cache.get_many([_version_key(job_id) for job_id in ids])
+        data_keys = {
+            _data_key(job_id, versions[_version_key(job_id)], skills_version, serializer): job_id
+            for job_id in ids
+            if _version_key(job_id) in versions
+        }
+        for key, data in cache.get_many(list(data_keys)).items():
+            found[data_keys[key]] = data
+    except Exception as e:
+        logger.warning(f"Job cache read failed: {str(e)}")
+
+    missing = [job_id for job_id in ids if job_id not in found]
+    inc('job_cache_total', len(found), result='hit')
+    inc('job_cache_total', len(missing), result='miss')
+
+    if missing:
+        jobs = list(queryset.filter(id__in=missing))
+        entries = {}
+        for job, data in zip(jobs, serializer_class(jobs, many=True).data):
+            version = job.updated_at.isoformat()
+            found[job.id] = data
+            entries[_version_key(job.id)] = version
+            entries[_data_key(job.id, version, skills_version, serializer)] = data
+        try:
+            cache.set_many(entries, timeout=settings.JOB_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Job cache write failed: {str(e)}")
+
+    return [found[job_id] for job_id in ids if job_id in found]
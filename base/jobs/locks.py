@@ -0,0 +1,147 @@
+"""
+Redis lease locks for tasks that must not run concurrently.
+
+A lease is a key holding a random token with a short TTL. While the holder
+works, a heartbeat thread extends the TTL; if the process dies the lease
+simply expires instead of blocking the task forever. Only the holder's
+token can extend or release the key.
+
+Callers that find the lease taken can either skip or leave a "pending"
+mark so the holder runs once more after it finishes, which collapses any
+number of overlapping triggers into a single follow-up run.
+"""
+from typing import Optional
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from base.redis_client import get_redis
+from monitor.metrics import inc, observe
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'lock'
+
+# Extend or delete the key only while it still holds our token
+_EXTEND = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class LockLost(Exception):
+    """The lease expired or was taken over while the holder was working"""
+
+
+class LeaseLock:
+    """
+    Lease lock with a heartbeat:
+
+        lock = LeaseLock('fetch_and_save_jobs')
+        if lock.acquire():
+            try:
+                ...
+                lock.ensure_held()
+                ...
+            finally:
+                lock.release()
+
+    `client` defaults to the shared Redis connection; pass another client
+    (e.g. fakeredis) in tests.
+    """
+
+    def __init__(self, name: str, ttl: float = None, heartbeat: float = None, client=None):
+        self.name = name
+        self.key = f'{KEY_PREFIX}:{name}'
+        self.pending_key = f'{self.key}:pending'
+        self.ttl = ttl or settings.LOCK_TTL
+        self.heartbeat = heartbeat or self.ttl / 3
+        self.client = client or get_redis()
+        self.token = uuid.uuid4().hex
+        self.lost = False
+        self._extend = self.client.register_script(_EXTEND)
+        self._release = self.client.register_script(_RELEASE)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._acquired_at = None
+
+    def acquire(self, blocking: bool = False, timeout: float = 0, poll: float = 0.1) -> bool:
+        """
+        Take the lease. Non-blocking by default; with blocking=True wait up
+        to `timeout` seconds for the current holder to release it.
+        """
+        started = time.perf_counter()
+        deadline = started + timeout
+        while True:
+            if self.client.set(self.key, self.token, nx=True, px=int(self.ttl * 1000)):
+                break
+            if not blocking or time.perf_counter() >= deadline:
+                observe('lock_wait_seconds', time.perf_counter() - started, lock=self.name)
+                inc('lock_acquire_total', lock=self.name, result='busy')
+                return False
+            time.sleep(poll)
+
+        self._acquired_at = time.perf_counter()
+        observe('lock_wait_seconds', self._acquired_at - started, lock=self.name)
+        inc('lock_acquire_total', lock=self.name, result='acquired')
+
+        self.lost = False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._beat, name=f'{self.key}:heartbeat', daemon=True)
+        self._thread.start()
+        return True
+
+    def _beat(self):
+        while not self._stop.wait(self.heartbeat):
+            try:
+                extended = self._extend(keys=[self.key], args=[self.token, int(self.ttl * 1000)])
+            except Exception as e:
+                # A transient Redis error is not a lost lease; the next beat
+                # may still land before the TTL runs out
+                logger.warning(f"Heartbeat for {self.key} failed: {str(e)}")
+                continue
+            if not extended:
+                self.lost = True
+                inc('lock_lost_total', lock=self.name)
+                logger.error(f"Lost lease {self.key}")
+                return
+
+    def ensure_held(self) -> None:
+        """Raise LockLost if the lease has expired since it was acquired"""
+        if self.lost:
+            raise LockLost(self.key)
+
+    def release(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._acquired_at is None:
+            return
+
+        observe('lock_hold_seconds', time.perf_counter() - self._acquired_at, lock=self.name)
+        self._acquired_at = None
+        try:
+            self._release(keys=[self.key], args=[self.token])
+        except Exception as e:
+            # The lease expires on its own after ttl
+            logger.warning(f"Could not release {self.key}: {str(e)}")
+
+    def mark_pending(self) -> None:
+        """Ask the current holder to run once more when it finishes"""
+        self.client.set(self.pending_key, 1, ex=int(self.ttl * 10))
+        inc('lock_acquire_total', lock=self.name, result='coalesced')
+
+    def take_pending(self) -> bool:
+        """Clear and return the pending mark left by overlapping triggers"""
+        return bool(self.client.delete(self.pending_key))
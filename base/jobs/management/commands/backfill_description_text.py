@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from jobs.job_cache import invalidate_jobs
+from jobs.models import Job
+from jobs.text import describe
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill Job.description_text, snippet and word_count from the raw '
+        'description for jobs stored before those columns existed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--all', action='store_true',
+                            help='Recompute every job, e.g. after changing JOB_SNIPPET_LENGTH')
+
+    def handle(self, *args, **options):
+        queryset = Job.objects.order_by('id')
+        if not options['all']:
+            queryset = queryset.filter(description_text='')
+
+        updated = 0
+        last_id = 0
+        while True:
+            rows = list(
+                queryset.filter(id__gt=last_id)
+                .values_list('id', 'description')[:options['batch_size']]
+            )
+            if not rows:
+                break
+
+            jobs = [Job(id=job_id, **describe(description)) for job_id, description in rows]
+            with transaction.atomic():
+                Job.objects.bulk_update(jobs, ['description_text', 'snippet', 'word_count'])
+            # bulk_update sends no post_save, so cached payloads would stay stale
+            invalidate_jobs(job.id for job in jobs)
+            updated += len(jobs)
+            last_id = rows[-1][0]
+
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {updated} jobs'))
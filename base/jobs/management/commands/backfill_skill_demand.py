@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from jobs.models import ArchivedJob, Job, SkillDemand
+from jobs.trends import aggregate_demand, increment
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the skill demand counters from Job and ArchivedJob. Id ranges '
+        'are aggregated in parallel, each by its own database connection. '
+        'Pause the fetch task while this runs or its counts are lost.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--chunk-size', type=int, default=50000, help='Job ids per chunk')
+
+    def handle(self, *args, **options):
+        chunks = []
+        for model in (Job, ArchivedJob):
+            bounds = model.objects.aggregate(low=Min('id'), high=Max('id'))
+            if bounds['low'] is None:
+                continue
+            for start in range(bounds['low'], bounds['high'] + 1, options['chunk_size']):
+                chunks.append((model, start, start + options['chunk_size']))
+
+        SkillDemand.objects.all().delete()
+        self.stdout.write(f'Aggregating {len(chunks)} chunks with {options["workers"]} workers...')
+
+        rows = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = [executor.submit(self._run_chunk, *chunk) for chunk in chunks]
+            for done, future in enumerate(as_completed(futures), start=1):
+                rows += future.result()
+                if done % 10 == 0 or done == len(futures):
+                    self.stdout.write(f'  {done}/{len(futures)} chunks')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Backfilled skill demand: {SkillDemand.objects.count()} counter rows '
+            f'from {rows} aggregated rows'
+        ))
+
+    @staticmethod
+    def _run_chunk(model, start, end):
+        # Each worker thread gets its own connection; close it when done
+        try:
+            counts = aggregate_demand(model, 'id >= %s AND id < %s', [start, end])
+            with transaction.atomic():
+                increment(counts)
+            return len(counts)
+        finally:
+            connection.close()
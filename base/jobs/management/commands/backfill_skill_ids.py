@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from jobs.models import Job, JobAlert, Skill
+from jobs.skills import get_skill_dictionary, invalidate_skill_dictionary, sync_vocabulary
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill Job.skill_ids and JobAlert.skill_ids from the legacy skills '
+        'name arrays. Run after adding skill_ids and before dropping the old columns.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        dictionary = sync_vocabulary()
+
+        for model in (Job, JobAlert):
+            table = model._meta.db_table
+            with connection.cursor() as cursor:
+                columns = {
+                    column.name
+                    for column in connection.introspection.get_table_description(cursor, table)
+                }
+            if 'skills' not in columns:
+                self.stdout.write(f'{table}: no legacy skills column, skipping')
+                continue
+
+            updated = 0
+            last_id = 0
+            while True:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'SELECT id, skills FROM {table} WHERE id > %s ORDER BY id LIMIT %s',
+                        [last_id, options['batch_size']]
+                    )
+                    rows = cursor.fetchall()
+                if not rows:
+                    break
+
+                # Keep skills outside the configured vocabulary (e.g. typed
+                # into alerts) by adding them to the dictionary
+                unknown = {
+                    name.strip().lower()
+                    for _, names in rows
+                    for name in names or []
+                    if dictionary.id(name) is None
+                }
+                if unknown:
+                    Skill.objects.bulk_create(
+                        [Skill(name=name, kind=Skill.TECH) for name in unknown],
+                        ignore_conflicts=True
+                    )
+                    invalidate_skill_dictionary()
+                    dictionary = get_skill_dictionary()
+
+                with transaction.atomic():
+                    for row_id, names in rows:
+                        model.objects.filter(pk=row_id).update(
+                            skill_ids=dictionary.ids(names or [])
+                        )
+                updated += len(rows)
+                last_id = rows[-1][0]
+
+            self.stdout.write(self.style.SUCCESS(f'{table}: backfilled {updated} rows'))
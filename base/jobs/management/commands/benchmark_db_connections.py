@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+from jobs.benchmarks.utils import save_results
+import statistics
+import time
+
+
+class Command(BaseCommand):
+    help = '''Measure per-request database overhead under the current DB_CONNECTION_MODE.
+
+Each iteration fires request_started, runs one query and fires
+request_finished, exactly as Django does around a view, so connection
+setup and teardown are included. Compare modes with
+
+    DB_CONNECTION_MODE=none python manage.py benchmark_db_connections
+    DB_CONNECTION_MODE=persistent python manage.py benchmark_db_connections
+    DB_CONNECTION_MODE=pool python manage.py benchmark_db_connections
+'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--output-dir', help='Directory for the JSON results')
+
+    def handle(self, *args, **options):
+        connection.close()
+        latencies = []
+        for _ in range(options['requests']):
+            started = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            request_finished.send(sender=self.__class__)
+            latencies.append(time.perf_counter() - started)
+        connection.close()
+
+        percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        result = {
+            'mode': settings.DB_CONNECTION_MODE,
+            'requests': options['requests'],
+            'first_ms': latencies[0] * 1000,
+            'mean_ms': statistics.fmean(latencies) * 1000,
+            'p50_ms': percentiles[49] * 1000,
+            'p99_ms': percentiles[98] * 1000,
+        }
+        self.stdout.write(
+            f"{result['mode']}: first {result['first_ms']:.2f} ms, "
+            f"mean {result['mean_ms']:.2f} ms, p50 {result['p50_ms']:.2f} ms, "
+            f"p99 {result['p99_ms']:.2f} ms"
+        )
+
+        path = save_results('db-connections', result, options['output_dir'])
+        self.stdout.write(self.style.SUCCESS(f'Results saved to {path}'))
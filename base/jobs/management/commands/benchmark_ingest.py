@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from jobs.benchmarks.ingest import run_ingest_benchmark
+from jobs.benchmarks.utils import save_results
+import logging
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the ingest pipeline against synthetic feeds served locally'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+            help='Feed sizes (number of items) to benchmark, e.g. 1000 200000'
+        )
+        parser.add_argument('--match-ratio', type=float, default=0.3,
+                            help='Fraction of items that pass the tech job filter')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--keep', action='store_true',
+                            help='Commit the upserted jobs instead of rolling back')
+        parser.add_argument('--output-dir', help='Directory for the JSON results')
+
+    def handle(self, *args, **options):
+        # Per-job INFO logging would dominate the measurements
+        logging.getLogger('jobs').setLevel(logging.WARNING)
+
+        runs = []
+        for size in options['sizes']:
+            self.stdout.write(f'Benchmarking ingest of {size} items...')
+            result = run_ingest_benchmark(
+                size,
+                match_ratio=options['match_ratio'],
+                seed=options['seed'],
+                keep=options['keep']
+            )
+            runs.append(result)
+
+            stages = ', '.join(
+                f'{stage} {seconds:.3f}s' for stage, seconds in result['stage_seconds'].items()
+            )
+            self.stdout.write(
+                f"  {result['matched_jobs']} matched; {stages}; "
+                f"{result['db_round_trips']} queries; peak RSS {result['peak_rss_mb']:.1f} MiB"
+            )
+
+        path = save_results('ingest', {
+            'match_ratio': options['match_ratio'],
+            'seed': options['seed'],
+            'runs': runs,
+        }, options['output_dir'])
+        self.stdout.write(self.style.SUCCESS(f'Results saved to {path}'))
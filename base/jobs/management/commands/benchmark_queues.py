@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from celery import group
+from jobs.benchmarks.utils import save_results
+from jobs.tasks import benchmark_probe
+import time
+
+
+class Command(BaseCommand):
+    help = '''Measure task throughput of the workers consuming each queue.
+
+Start the worker profiles to compare (see run_worker), then e.g.
+
+    python manage.py benchmark_queues --queue email --kind io --tasks 500
+    python manage.py benchmark_queues --queue ingest --kind cpu --tasks 200
+'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', action='append', dest='queues',
+                            help='Queue to benchmark; repeat for several (default: all routed queues)')
+        parser.add_argument('--kind', choices=['io', 'cpu'], default='io',
+                            help='io sleeps like an SMTP call, cpu spins like parsing')
+        parser.add_argument('--duration', type=float, default=0.05, help='Seconds of work per task')
+        parser.add_argument('--tasks', type=int, default=200, help='Tasks to enqueue per queue')
+        parser.add_argument('--timeout', type=float, default=600)
+        parser.add_argument('--label', default='', help='Name for this run, e.g. the worker profile')
+        parser.add_argument('--output-dir', help='Directory for the JSON results')
+
+    def handle(self, *args, **options):
+        queues = options['queues'] or ['default', 'ingest', 'alerts', 'email']
+        results = []
+
+        for queue in queues:
+            self.stdout.write(f"{queue}: {options['tasks']} {options['kind']} tasks...")
+            probes = group(
+                benchmark_probe.s(options['kind'], options['duration']).set(queue=queue)
+                for _ in range(options['tasks'])
+            )
+            started = time.perf_counter()
+            probes.apply_async().get(timeout=options['timeout'])
+            elapsed = time.perf_counter() - started
+
+            run = {
+                'queue': queue,
+                'kind': options['kind'],
+                'duration': options['duration'],
+                'tasks': options['tasks'],
+                'elapsed_seconds': elapsed,
+                'tasks_per_second': options['tasks'] / elapsed if elapsed else 0.0,
+            }
+            results.append(run)
+            self.stdout.write(f"  {run['tasks_per_second']:.1f} tasks/s in {elapsed:.2f}s")
+
+        path = save_results('queues', {
+            'label': options['label'],
+            'runs': results,
+        }, options['output_dir'])
+        self.stdout.write(self.style.SUCCESS(f'Results saved to {path}'))
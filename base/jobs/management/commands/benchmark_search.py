@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+from jobs.benchmarks.search import run_search_benchmark
+from jobs.benchmarks.utils import save_results
+
+
+class Command(BaseCommand):
+    help = 'Benchmark SearchIndex build time, query latency and memory on synthetic jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+            help='Corpus sizes to benchmark'
+        )
+        parser.add_argument(
+            '--engine', action='append', dest='engines',
+            help='Dotted path to an index class with the SearchIndex interface; '
+                 'repeat to compare engines (default: jobs.search.SearchIndex)'
+        )
+        parser.add_argument('--queries', type=int, default=300,
+                            help='Number of queries in the mix per size')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output-dir', help='Directory for the JSON results')
+
+    def handle(self, *args, **options):
+        engines = options['engines'] or ['jobs.search.SearchIndex']
+        results = {}
+
+        for engine_path in engines:
+            engine = import_string(engine_path)
+            runs = []
+            for size in options['sizes']:
+                self.stdout.write(f'{engine_path}: {size} jobs...')
+                run = run_search_benchmark(engine, size, options['queries'], options['seed'])
+                runs.append(run)
+
+                latencies = ', '.join(
+                    f"{kind} p50 {stats['p50_ms']:.3f}ms p99 {stats['p99_ms']:.3f}ms"
+                    for kind, stats in run['queries'].items()
+                )
+                self.stdout.write(
+                    f"  build {run['build_seconds']:.2f}s "
+                    f"(bulk {run['bulk_build_seconds']:.2f}s), "
+                    f"{run['memory_bytes_per_job']:.0f} B/job; {latencies}"
+                )
+            results[engine_path] = runs
+
+        path = save_results('search', {
+            'queries': options['queries'],
+            'seed': options['seed'],
+            'engines': results,
+        }, options['output_dir'])
+        self.stdout.write(self.style.SUCCESS(f'Results saved to {path}'))
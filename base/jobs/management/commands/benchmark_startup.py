@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from jobs.benchmarks.startup import TARGETS, measure_startup
+from jobs.benchmarks.utils import save_results
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure cold-start time of manage.py, the web app and Celery workers, '
+        'and report the slowest imports from python -X importtime. With --check, '
+        'fail if a target is over its STARTUP_BUDGETS entry or imports a module '
+        'in STARTUP_DEFERRED_MODULES.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--targets', nargs='+', choices=sorted(TARGETS), default=sorted(TARGETS))
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per target')
+        parser.add_argument('--top', type=int, default=15, help='Modules listed per report')
+        parser.add_argument('--check', action='store_true',
+                            help='Exit with an error on a budget or deferred-import regression')
+        parser.add_argument('--output-dir', help='Directory for the JSON results')
+
+    def handle(self, *args, **options):
+        results = {}
+        failures = []
+
+        for target in options['targets']:
+            self.stdout.write(f'{target}: {options["repeat"]} runs...')
+            try:
+                run = measure_startup(target, options['repeat'], options['top'])
+            except RuntimeError as e:
+                raise CommandError(str(e))
+            results[target] = run
+
+            self.stdout.write(
+                f"  median {run['median_seconds']:.3f}s "
+                f"(min {run['min_seconds']:.3f}s, max {run['max_seconds']:.3f}s), "
+                f"{run['modules']} modules, {run['import_seconds']:.3f}s importing"
+            )
+            self.stdout.write('  slowest imports (cumulative):')
+            for row in run['slowest_cumulative']:
+                via = f" <- {' <- '.join(row['via'][:3])}" if row['via'] else ''
+                self.stdout.write(f"    {row['ms']:8.1f}ms  {row['module']}{via}")
+            self.stdout.write('  slowest imports (self):')
+            for row in run['slowest_self']:
+                self.stdout.write(f"    {row['ms']:8.1f}ms  {row['module']}")
+
+            for module, chain in run['deferred_imported'].items():
+                message = f"{target} imports {module} at startup: {' <- '.join(chain)}"
+                self.stdout.write(self.style.WARNING(f'  {message}'))
+                failures.append(message)
+
+            budget = settings.STARTUP_BUDGETS.get(target)
+            if budget is not None and run['median_seconds'] > budget:
+                message = f"{target} took {run['median_seconds']:.3f}s, over its {budget:.3f}s budget"
+                self.stdout.write(self.style.WARNING(f'  {message}'))
+                failures.append(message)
+
+        path = save_results('startup', {
+            'repeat': options['repeat'],
+            'budgets': settings.STARTUP_BUDGETS,
+            'targets': results,
+        }, options['output_dir'])
+        self.stdout.write(self.style.SUCCESS(f'Results saved to {path}'))
+
+        if options['check'] and failures:
+            raise CommandError('Startup regressions:\n' + '\n'.join(failures))
@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from jobs.dedup import DuplicateDetector, band_keys, fingerprint_job
+from jobs.job_cache import invalidate_jobs
+from jobs.models import Job
+from jobs.rollups import reconcile_rollups
+
+
+class Command(BaseCommand):
+    help = 'Fingerprint stored jobs that have none yet and link near-duplicates to their canonical job'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        fields = ['id', 'title', 'company', 'description']
+        last_id = 0
+        processed = 0
+        duplicates = 0
+
+        while True:
+            # Oldest first, so the earliest posting becomes the canonical one
+            batch = list(
+                Job.objects.filter(id__gt=last_id, fingerprint__isnull=True)
+                .order_by('id')
+                .only(*fields)[:options['batch_size']]
+            )
+            if not batch:
+                break
+
+            for job in batch:
+                job.fingerprint = fingerprint_job({
+                    'title': job.title,
+                    'company': job.company,
+                    'description': job.description,
+                })
+                job.fingerprint_bands = band_keys(job.fingerprint)
+
+            detector = DuplicateDetector()
+            detector.load(job.fingerprint for job in batch)
+
+            for job in batch:
+                job.canonical_id = detector.find(job.fingerprint)
+                if job.canonical_id is None:
+                    detector.add(job.id, job.fingerprint)
+                else:
+                    duplicates += 1
+
+            with transaction.atomic():
+                Job.objects.bulk_update(
+                    batch,
+                    ['fingerprint', 'fingerprint_bands', 'canonical']
+                )
+                # bulk_update sends no post_save; duplicates must leave the job cache
+                linked = [job.id for job in batch if job.canonical_id is not None]
+                if linked:
+                    transaction.on_commit(lambda ids=linked: invalidate_jobs(ids))
+
+            processed += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f'Processed {processed} jobs, {duplicates} duplicates')
+
+        if duplicates:
+            # Rollups only count canonical jobs; older hours are not reconciled otherwise
+            reconcile_rollups(hours=None)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done: {processed} jobs fingerprinted, {duplicates} linked as duplicates'
+        ))
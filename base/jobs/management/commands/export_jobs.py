@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from jobs.export import FORMATS, export_lines
+from jobs.models import Job
+from jobs.views import JobFilter
+import sys
+
+
+class Command(BaseCommand):
+    help = '''Export jobs as NDJSON or CSV, streaming rows from a server-side cursor.
+
+    python manage.py export_jobs --output jobs.ndjson
+    python manage.py export_jobs --format csv --industry "Software" --since 2024-06-01T00:00:00Z
+'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='ndjson')
+        parser.add_argument('--output', help='File to write (default: stdout)')
+        parser.add_argument('--since', help='Only jobs updated at or after this ISO 8601 datetime with a UTC offset')
+        parser.add_argument('--industry', help='Same as the ?industry= API filter')
+        parser.add_argument('--skills', help='Comma-separated skills, same as the ?skills= API filter')
+        parser.add_argument('--include-duplicates', action='store_true',
+                            help='Also export cross-posted copies of canonical jobs')
+        parser.add_argument('--chunk-size', type=int, help='Rows per cursor fetch')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError('--since must be an ISO 8601 datetime')
+            if timezone.is_naive(since):
+                raise CommandError('--since must include a UTC offset, e.g. 2024-01-31T00:00:00Z')
+
+        queryset = Job.objects.all()
+        if not options['include_duplicates']:
+            queryset = queryset.filter(canonical__isnull=True)
+        filters = {name: options[name] for name in ('industry', 'skills') if options[name]}
+        queryset = JobFilter(filters, queryset=queryset).qs
+
+        out = open(options['output'], 'w', newline='') if options['output'] else sys.stdout
+        count = 0
+        try:
+            for line in export_lines(queryset, options['format'], since, options['chunk_size']):
+                out.write(line)
+                count += 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+        if options['format'] == 'csv':
+            count -= 1  # Header row
+        self.stderr.write(self.style.SUCCESS(f'Exported {count} jobs'))
@@ -6,5 +6,5 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         self.stdout.write('Fetching jobs...')
-        result = fetch_and_save_jobs.delay()
+        result = fetch_and_save_jobs.delay(coalesce=True)
         self.stdout.write(self.style.SUCCESS('Jobs fetch task initiated')) 
\ No newline at end of file
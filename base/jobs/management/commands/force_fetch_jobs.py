@@ -7,7 +7,7 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write('Starting immediate job fetch...')
         try:
-            result = fetch_and_save_jobs()  # Note: not using .delay() to run synchronously
+            result = fetch_and_save_jobs(coalesce=True)  # Note: not using .delay() to run synchronously
             self.stdout.write(self.style.SUCCESS(f'Job fetch completed: {result}'))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Error fetching jobs: {str(e)}')) 
\ No newline at end of file
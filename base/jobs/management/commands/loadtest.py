@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand
+import aiohttp
+import asyncio
+import json
+import statistics
+import time
+
+
+class Command(BaseCommand):
+    help = '''Load test an HTTP endpoint and report requests/sec and latency percentiles.
+
+Compare the WSGI and ASGI paths by running the same test against each server:
+
+    gunicorn base.wsgi:application -w 4 -b 127.0.0.1:8000
+    python manage.py loadtest http://127.0.0.1:8000/api/jobs/ --label wsgi
+
+    uvicorn base.asgi:application --workers 4 --port 8001
+    python manage.py loadtest http://127.0.0.1:8001/api/async/jobs/ --label asgi
+'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='URL to request')
+        parser.add_argument('--requests', type=int, default=1000, help='Total number of requests')
+        parser.add_argument('--concurrency', type=int, default=50, help='Requests in flight at once')
+        parser.add_argument('--label', default='', help='Name for this run in the report')
+        parser.add_argument('--output', help='Append the result as a JSON line to this file')
+
+    def handle(self, *args, **options):
+        result = asyncio.run(self._run(
+            options['url'],
+            options['requests'],
+            options['concurrency']
+        ))
+        result['label'] = options['label']
+
+        self.stdout.write(
+            f"{options['label'] or options['url']}: "
+            f"{result['requests_per_second']:.1f} req/s, "
+            f"p50 {result['p50_ms']:.1f} ms, "
+            f"p99 {result['p99_ms']:.1f} ms, "
+            f"{result['errors']} errors"
+        )
+
+        if options['output']:
+            with open(options['output'], 'a') as f:
+                f.write(json.dumps(result) + '\n')
+
+    async def _run(self, url, total, concurrency):
+        latencies = []
+        errors = 0
+        remaining = iter(range(total))
+
+        async def worker(session):
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    async with session.get(url) as response:
+                        await response.read()
+                        if response.status >= 400:
+                            errors += 1
+                except aiohttp.ClientError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        percentiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+
+        return {
+            'url': url,
+            'requests': total,
+            'concurrency': concurrency,
+            'errors': errors,
+            'elapsed_seconds': elapsed,
+            'requests_per_second': total / elapsed if elapsed else 0.0,
+            'p50_ms': percentiles[49] * 1000,
+            'p99_ms': percentiles[98] * 1000,
+        }
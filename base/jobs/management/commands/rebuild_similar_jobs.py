@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand
+from jobs.locks import LeaseLock
+from jobs.similarity import rebuild_similarity
+
+
+class Command(BaseCommand):
+    help = 'Refit the "similar jobs" model and recompute every neighbour list now'
+
+    def handle(self, *args, **options):
+        lock = LeaseLock('similarity')
+        if not lock.acquire(blocking=True, timeout=60):
+            self.stderr.write('A similarity update is still running; try again later')
+            return
+
+        start = time.perf_counter()
+        try:
+            count = rebuild_similarity()
+        finally:
+            lock.release()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt neighbours for {count} jobs in {time.perf_counter() - start:.1f}s'
+        ))
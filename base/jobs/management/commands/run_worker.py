@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import os
+import sys
+
+
+class Command(BaseCommand):
+    help = '''Start a Celery worker for one of the profiles in CELERY_WORKER_PROFILES.
+
+Run one worker per profile in production, e.g.
+
+    python manage.py run_worker ingest
+    python manage.py run_worker alerts
+    python manage.py run_worker email
+'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('profile', choices=sorted(settings.CELERY_WORKER_PROFILES))
+        parser.add_argument('--concurrency', type=int, help='Override the profile concurrency')
+        parser.add_argument('--pool', help='Override the profile pool (prefork, threads, gevent, eventlet)')
+        parser.add_argument('--prefetch-multiplier', type=int, help='Override the profile prefetch multiplier')
+        parser.add_argument('--loglevel', default='info')
+
+    def handle(self, *args, **options):
+        profile = dict(settings.CELERY_WORKER_PROFILES[options['profile']])
+        for key in ('concurrency', 'pool', 'prefetch_multiplier'):
+            if options[key] is not None:
+                profile[key] = options[key]
+
+        if profile['pool'] in ('gevent', 'eventlet'):
+            try:
+                __import__(profile['pool'])
+            except ImportError:
+                raise CommandError(f"The {profile['pool']} pool needs the {profile['pool']} package installed")
+
+        argv = [
+            sys.executable, '-m', 'celery', '-A', 'base', 'worker',
+            '--queues', ','.join(profile['queues']),
+            '--pool', profile['pool'],
+            '--concurrency', str(profile['concurrency']),
+            '--prefetch-multiplier', str(profile['prefetch_multiplier']),
+            '--hostname', f"{options['profile']}@%h",
+            '--loglevel', options['loglevel'],
+        ]
+        self.stdout.write(' '.join(argv[1:]))
+        sys.stdout.flush()
+        # Workers share a connection pool per process unless told otherwise
+        os.environ.setdefault('DB_CONNECTION_MODE', 'pool')
+        # System checks import the URLconf and every view; `manage.py check`
+        # at deploy time covers them, so workers do not repeat them
+        os.environ.setdefault('CELERY_SKIP_CHECKS', '1')
+        os.environ['CELERY_WORKER_PRELOAD'] = ','.join(profile.get('preload', []))
+        os.execv(sys.executable, argv)
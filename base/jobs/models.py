@@ -1,31 +1,57 @@
 from django.db import models
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import URLValidator
 from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.dispatch import receiver
+from .skills import get_skill_dictionary, invalidate_skill_dictionary
+from .job_cache import invalidate_job
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Create your models here.
 
+class Skill(models.Model):
+    """Dictionary of known skills; jobs and alerts refer to skills by id"""
+    TECH = 'tech'
+    SOFT = 'soft'
+    KIND_CHOICES = [
+        (TECH, 'Tech'),
+        (SOFT, 'Soft'),
+    ]
+
+    # Plain integer ids keep Job.skill_ids at four bytes per entry
+    id = models.AutoField(primary_key=True)
+    name = models.CharField(max_length=50, unique=True)  # Lowercase canonical name
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    aliases = ArrayField(
+        models.CharField(max_length=50),
+        blank=True,
+        default=list
+    )
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+@receiver([post_save, post_delete], sender=Skill)
+def skill_changed(sender, **kwargs):
+    # After commit, so no process caches the old rows under the new version
+    transaction.on_commit(invalidate_skill_dictionary)
+
 class Job(models.Model):
     title = models.CharField(max_length=255)
     industry = models.CharField(max_length=100)
     position = models.CharField(max_length=255, null=True, blank=True)
     company = models.CharField(max_length=255, null=True, blank=True)
     location = models.CharField(max_length=255, null=True, blank=True)
-    skills = ArrayField(
-        models.CharField(max_length=50),
-        blank=True,
-        default=list
-    )
-    tech_skills = ArrayField(
-        models.CharField(max_length=50),
-        blank=True,
-        default=list
-    )
-    soft_skills = ArrayField(
-        models.CharField(max_length=50),
+    skill_ids = ArrayField(
+        models.IntegerField(),
         blank=True,
         default=list
     )
@@ -36,6 +62,25 @@ class Job(models.Model):
     )
     publication_date = models.DateTimeField()
     description = models.TextField()
+    # Derived from description at ingest (see jobs/text.py)
+    description_text = models.TextField(blank=True, default='')
+    snippet = models.CharField(max_length=300, blank=True, default='')
+    word_count = models.PositiveIntegerField(default=0)
+    # SimHash of title, company and description plus its LSH band keys;
+    # cross-posted copies point at the first stored posting via canonical
+    fingerprint = models.BigIntegerField(null=True, blank=True)
+    fingerprint_bands = ArrayField(
+        models.IntegerField(),
+        blank=True,
+        default=list
+    )
+    canonical = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='duplicates'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -46,8 +91,27 @@ class Job(models.Model):
             models.Index(fields=['publication_date']),
             models.Index(fields=['position']),
             models.Index(fields=['location']),
+            GinIndex(fields=['skill_ids']),
+            GinIndex(fields=['fingerprint_bands']),
+            models.Index(
+                fields=['-publication_date'],
+                condition=models.Q(canonical__isnull=True),
+                name='job_canonical_pub_date_idx'
+            ),
         ]
 
+    @property
+    def skills(self):
+        return get_skill_dictionary().names(self.skill_ids)
+
+    @property
+    def tech_skills(self):
+        return get_skill_dictionary().names(self.skill_ids, kind='tech')
+
+    @property
+    def soft_skills(self):
+        return get_skill_dictionary().names(self.skill_ids, kind='soft')
+
     def __str__(self):
         return f"{self.title} at {self.company or 'Unknown Company'} ({self.location or 'Unknown Location'})"
 
@@ -55,6 +119,46 @@ class Job(models.Model):
         logger.info(f"Saving job: {self.title}")
         super().save(*args, **kwargs)
 
+@receiver([post_save, post_delete], sender=Job)
+def job_changed(sender, instance, **kwargs):
+    # After commit, so a concurrent read cannot re-cache the old row
+    transaction.on_commit(lambda pk=instance.pk: invalidate_job(pk))
+
+class ArchivedJob(models.Model):
+    """
+    Jobs past the retention window, moved out of the Job table by the prune
+    task so the live table and its indexes stay small. Keeps the original id.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    industry = models.CharField(max_length=100)
+    position = models.CharField(max_length=255, null=True, blank=True)
+    company = models.CharField(max_length=255, null=True, blank=True)
+    location = models.CharField(max_length=255, null=True, blank=True)
+    skill_ids = ArrayField(
+        models.IntegerField(),
+        blank=True,
+        default=list
+    )
+    job_link = models.URLField(max_length=500)
+    publication_date = models.DateTimeField()
+    description = models.TextField()
+    fingerprint = models.BigIntegerField(null=True, blank=True)
+    canonical_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-publication_date']
+        indexes = [
+            models.Index(fields=['publication_date']),
+            models.Index(fields=['job_link']),
+        ]
+
+    def __str__(self):
+        return f"{self.title} (archived)"
+
 class JobAlert(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     email = models.EmailField()
@@ -63,8 +167,8 @@ class JobAlert(models.Model):
         blank=True,
         default=list
     )
-    skills = ArrayField(
-        models.CharField(max_length=50),
+    skill_ids = ArrayField(
+        models.IntegerField(),
         blank=True,
         default=list
     )
@@ -80,6 +184,9 @@ class JobAlert(models.Model):
     )
     is_active = models.BooleanField(default=True)
     last_sent = models.DateTimeField(null=True, blank=True)
+    # High-water mark on Job.id: every job up to and including this id has
+    # already been considered for this alert.
+    last_job_id = models.BigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -90,5 +197,124 @@ class JobAlert(models.Model):
             models.Index(fields=['last_sent']),
         ]
 
+    @property
+    def skills(self):
+        return get_skill_dictionary().names(self.skill_ids)
+
     def __str__(self):
         return f"Job Alert for {self.email}"
+
+
+class AlertDelivery(models.Model):
+    """
+    Ledger entry for one alert email covering the job id range
+    (from_job_id, to_job_id]. The unique constraint makes a retried run
+    reuse the same entry instead of sending the same batch twice, and
+    sent_at stays empty until the email has actually gone out. sending_at
+    marks an attempt in progress; after ALERT_DELIVERY_MAX_ATTEMPTS failed
+    attempts the delivery is given up and failed_at is set.
+    """
+    alert = models.ForeignKey(JobAlert, on_delete=models.CASCADE, related_name='deliveries')
+    from_job_id = models.BigIntegerField()
+    to_job_id = models.BigIntegerField()
+    job_count = models.PositiveIntegerField(default=0)
+    job_ids = ArrayField(
+        models.BigIntegerField(),
+        blank=True,
+        default=list
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    sending_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['alert', 'to_job_id'],
+                name='unique_alert_delivery_range'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['created_at'],
+                condition=models.Q(sent_at__isnull=True, failed_at__isnull=True),
+                name='alert_delivery_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Delivery for {self.alert.email} (jobs {self.from_job_id}-{self.to_job_id})"
+
+
+class JobHourlyRollup(models.Model):
+    """
+    Number of canonical jobs ingested per hour and industry, kept up to date
+    by the fetch and prune tasks
+    """
+    hour = models.DateTimeField()
+    industry = models.CharField(max_length=100)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['hour', 'industry'],
+                name='unique_job_hourly_rollup'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['hour']),
+        ]
+
+    def __str__(self):
+        return f"{self.industry} @ {self.hour:%Y-%m-%d %H:00}: {self.count}"
+
+
+class SkillDemand(models.Model):
+    """
+    Canonical jobs published per period, skill and industry. Recent history
+    is kept per day; older days are compacted into one row per month.
+    """
+    DAY = 'day'
+    MONTH = 'month'
+    GRANULARITY_CHOICES = [
+        (DAY, 'Day'),
+        (MONTH, 'Month'),
+    ]
+
+    period = models.DateField()  # First day of the day or month
+    granularity = models.CharField(max_length=5, choices=GRANULARITY_CHOICES, default=DAY)
+    skill_id = models.IntegerField()
+    industry = models.CharField(max_length=100)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['period', 'granularity', 'skill_id', 'industry'],
+                name='unique_skill_demand'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['skill_id', 'period']),
+            models.Index(fields=['period']),
+        ]
+
+    def __str__(self):
+        return f"skill {self.skill_id} / {self.industry} @ {self.period} ({self.granularity}): {self.count}"
+
+
+class JobNeighbours(models.Model):
+    """Precomputed most similar canonical jobs, best first (see jobs/similarity.py)"""
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='neighbours')
+    neighbour_ids = ArrayField(models.BigIntegerField(), default=list, blank=True)
+    scores = ArrayField(models.FloatField(), default=list, blank=True)  # Cosine similarity per neighbour
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'job neighbours'
+
+    def __str__(self):
+        return f"{len(self.neighbour_ids)} neighbours of job {self.job_id}"
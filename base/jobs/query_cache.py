@@ -0,0 +1,135 @@
+"""
+Two-tier cache for search results.
+
+Entries are sorted arrays of index ids (8 bytes each), not job dicts, keyed
+by the canonical form of the query and the index generation. Changing the
+index bumps its generation, so stale entries are never read again; they
+fall out of the in-process LRU by size and expire from Redis on their TTL.
+"""
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import hashlib
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from monitor.metrics import inc
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_criteria(criteria: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Search criteria as sorted lists of distinct, stripped, lowercase values,
+    with empty criteria dropped. Search with the result as well as keying
+    on it, so every query that shares an entry also has the same results.
+    """
+    normalized = {}
+    for name, values in criteria.items():
+        if isinstance(values, str):
+            values = [values]
+        values = sorted({str(value).strip().lower() for value in values or ()} - {''})
+        if values:
+            normalized[name] = values
+    return normalized
+
+
+def canonical_query(criteria: Dict[str, Any]) -> str:
+    """
+    Order-, case- and duplicate-insensitive form of search criteria, so
+    {'skills': ['SQL', 'python']} and {'skills': ['python', 'sql']} share
+    an entry.
+    """
+    return json.dumps(normalize_criteria(criteria), sort_keys=True, separators=(',', ':'))
+
+
+class QueryCache:
+    """
+    In-process LRU bounded by the total number of ids held, in front of
+    the shared Django cache.
+    """
+
+    def __init__(self, max_ids: int = None, max_entry_ids: int = None, timeout: int = None):
+        self.max_ids = max_ids or settings.SEARCH_CACHE_LOCAL_MAX_IDS
+        self.max_entry_ids = max_entry_ids or settings.SEARCH_CACHE_MAX_ENTRY_IDS
+        self.timeout = timeout or settings.SEARCH_CACHE_TIMEOUT
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(namespace: str, generation: int, criteria: Dict[str, Any]) -> str:
+        digest = hashlib.sha1(canonical_query(criteria).encode()).hexdigest()
+        return f'search:{namespace}:{generation}:{digest}'
+
+    def get_or_search(self, namespace: str, generation: int, criteria: Dict[str, Any],
+                      search: Callable[[], Iterable[int]]) -> List[int]:
+        key = self.key(namespace, generation, criteria)
+
+        ids = self._get_local(key)
+        if ids is not None:
+            inc('search_cache_total', tier='local', result='hit')
+            return ids.tolist()
+
+        ids = self._get_shared(key)
+        if ids is not None:
+            inc('search_cache_total', tier='shared', result='hit')
+            self._set_local(key, ids)
+            return ids.tolist()
+
+        inc('search_cache_total', tier='shared', result='miss')
+        ids = array('q', sorted(search()))
+        if len(ids) <= self.max_entry_ids:
+            self._set_local(key, ids)
+            self._set_shared(key, ids)
+        return ids.tolist()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _get_local(self, key: str) -> Optional[array]:
+        with self._lock:
+            ids = self._entries.get(key)
+            if ids is not None:
+                self._entries.move_to_end(key)
+            return ids
+
+    def _set_local(self, key: str, ids: array) -> None:
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = ids
+            self.size += len(ids)
+            while self.size > self.max_ids and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def _get_shared(self, key: str) -> Optional[array]:
+        try:
+            raw = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Search cache read failed: {str(e)}")
+            return None
+        if raw is None:
+            return None
+        ids = array('q')
+        ids.frombytes(raw)
+        return ids
+
+    def _set_shared(self, key: str, ids: array) -> None:
+        try:
+            cache.set(key, ids.tobytes(), timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"Search cache write failed: {str(e)}")
+
+
+@lru_cache(maxsize=None)
+def get_query_cache() -> QueryCache:
+    """Process-wide query cache"""
+    return QueryCache()
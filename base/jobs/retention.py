@@ -0,0 +1,70 @@
+from datetime import timedelta
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedJob, Job
+from .rollups import record_removed_jobs
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_FIELDS = [
+    'id', 'title', 'industry', 'position', 'company', 'location', 'skill_ids',
+    'job_link', 'publication_date', 'description', 'fingerprint',
+    'canonical_id', 'created_at', 'updated_at',
+]
+
+
+def prune_jobs(retention_days=None, chunk_size=None, max_chunks=None) -> int:
+    """
+    Move jobs published before the retention window into ArchivedJob.
+
+    Works in small chunks, each in its own short transaction, with a pause
+    in between so the deletes never hold long locks or starve the ingest
+    task. Duplicates go with their canonical job, which would otherwise
+    leave them canonical and listed again. Returns the number of jobs
+    archived.
+
+    The archived job_links double as tombstones: ingest skips them, so a
+    posting still in the feed does not come back as a new job.
+    """
+    if retention_days is None:
+        retention_days = settings.JOB_RETENTION_DAYS
+    chunk_size = chunk_size or settings.JOB_PRUNE_CHUNK_SIZE
+    max_chunks = max_chunks or settings.JOB_PRUNE_MAX_CHUNKS
+    cutoff = timezone.now() - timedelta(days=retention_days)
+
+    archived = 0
+    for _ in range(max_chunks):
+        with transaction.atomic():
+            ids = list(
+                Job.objects.filter(publication_date__lt=cutoff)
+                .order_by('publication_date')
+                .select_for_update(skip_locked=True)
+                .values_list('id', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            ids += list(
+                Job.objects.filter(canonical_id__in=ids)
+                .exclude(id__in=ids)
+                .select_for_update()
+                .values_list('id', flat=True)
+            )
+
+            rows = list(Job.objects.filter(id__in=ids).values(*ARCHIVED_FIELDS))
+            ArchivedJob.objects.bulk_create(
+                [ArchivedJob(**row) for row in rows],
+                ignore_conflicts=True
+            )
+            Job.objects.filter(id__in=ids).delete()
+            record_removed_jobs(rows)
+
+        archived += len(ids)
+        time.sleep(settings.JOB_PRUNE_PAUSE)
+
+    logger.info(f"Archived {archived} jobs published before {cutoff:%Y-%m-%d}")
+    return archived
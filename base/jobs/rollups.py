@@ -0,0 +1,119 @@
+from collections import Counter
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Optional
+import logging
+
+from django.db import transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest, TruncHour
+from django.utils import timezone
+
+from .models import Job, JobHourlyRollup
+
+logger = logging.getLogger(__name__)
+
+
+def _truncate_to_hour(value):
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def record_new_jobs(jobs: Iterable[Job]) -> None:
+    """Add newly created canonical jobs to the hourly per-industry rollups"""
+    # Cross-posted copies are hidden everywhere else, so they are not counted
+    counts = Counter(
+        (_truncate_to_hour(job.created_at), job.industry)
+        for job in jobs
+        if job.canonical_id is None
+    )
+
+    for (hour, industry), count in counts.items():
+        rollup, created = JobHourlyRollup.objects.get_or_create(
+            hour=hour,
+            industry=industry,
+            defaults={'count': count}
+        )
+        if not created:
+            JobHourlyRollup.objects.filter(pk=rollup.pk).update(
+                count=F('count') + count
+            )
+
+
+def record_removed_jobs(rows: Iterable[Dict[str, Any]]) -> None:
+    """
+    Take jobs leaving the Job table (e.g. archived by prune_jobs) out of the
+    rollups, so totals keep matching the canonical jobs still stored. Rows
+    are dicts with created_at, industry and canonical_id.
+    """
+    counts = Counter(
+        (_truncate_to_hour(row['created_at']), row['industry'])
+        for row in rows
+        if row['canonical_id'] is None
+    )
+
+    for (hour, industry), count in counts.items():
+        JobHourlyRollup.objects.filter(hour=hour, industry=industry).update(
+            count=Greatest(F('count') - count, Value(0))
+        )
+
+
+def reconcile_rollups(hours: Optional[int] = 48) -> int:
+    """
+    Rebuild rollups from the Job table for the last `hours` hours, or for
+    the whole table when hours is None. Returns the number of rollup rows.
+    """
+    jobs = Job.objects.filter(canonical__isnull=True)
+    rollups = JobHourlyRollup.objects.all()
+
+    if hours is not None:
+        since = _truncate_to_hour(timezone.now() - timedelta(hours=hours))
+        jobs = jobs.filter(created_at__gte=since)
+        rollups = rollups.filter(hour__gte=since)
+
+    rows = (
+        jobs.annotate(hour=TruncHour('created_at'))
+        .values('hour', 'industry')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        rollups.delete()
+        created = JobHourlyRollup.objects.bulk_create(
+            JobHourlyRollup(**row) for row in rows
+        )
+
+    logger.info(f"Reconciled {len(created)} job rollup rows")
+    return len(created)
+
+
+def _recent_rollups():
+    since = timezone.now() - timedelta(hours=24)
+    return JobHourlyRollup.objects.filter(hour__gte=_truncate_to_hour(since))
+
+
+def get_job_stats() -> Dict[str, Any]:
+    """Dashboard statistics read from the rollups rather than the Job table"""
+    total_jobs = JobHourlyRollup.objects.aggregate(total=Sum('count'))['total'] or 0
+    last_24h_jobs = _recent_rollups().aggregate(total=Sum('count'))['total'] or 0
+
+    return {
+        'total_jobs': total_jobs,
+        'last_24h_jobs': last_24h_jobs,
+    }
+
+
+async def aget_job_stats() -> Dict[str, Any]:
+    """Async variant of get_job_stats for async views"""
+    total = await JobHourlyRollup.objects.aaggregate(total=Sum('count'))
+    recent = await _recent_rollups().aaggregate(total=Sum('count'))
+
+    return {
+        'total_jobs': total['total'] or 0,
+        'last_24h_jobs': recent['total'] or 0,
+    }
+
+
+def get_jobs_by_industry():
+    return JobHourlyRollup.objects.values('industry').annotate(
+        count=Sum('count')
+    ).order_by('-count')
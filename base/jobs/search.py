@@ -1,5 +1,7 @@
 from typing import Set, Dict, List, Any, Generator
 from collections import defaultdict
+import hashlib
+import json
 import re
 from concurrent.futures import ThreadPoolExecutor
 
@@ -20,6 +22,29 @@ class SearchIndex:
         self._bulk_buffer = []
         self._bulk_size = 1000
         self._executor = ThreadPoolExecutor(max_workers=4)
+        # Query caches key on (uid, generation); any change bumps generation
+        self.generation = 0
+        self._uid = None
+        self._uid_generation = None
+
+    @property
+    def uid(self) -> str:
+        """
+        Digest of the indexed fields of every job under its index id, so
+        processes that built the same index from the same feed share
+        query cache entries. Recomputed only after the index changes.
+        """
+        if self._uid_generation != self.generation:
+            digest = hashlib.sha1()
+            for job_id in sorted(self.jobs):
+                job = self.jobs[job_id]
+                digest.update(json.dumps([
+                    job_id, job.get('job_link'), job['title'], job['position'],
+                    job['tech_skills'], job['industry'], job['location'],
+                ], default=str).encode())
+            self._uid = digest.hexdigest()
+            self._uid_generation = self.generation
+        return self._uid
     
     def _insert_into_trie(self, trie: TrieNode, text: str, job_id: int):
         """Insert word into trie and associate with job_id"""
@@ -47,6 +72,7 @@ class SearchIndex:
         """Add job to search index"""
         job_id = self.next_id
         self.next_id += 1
+        self.generation += 1
         
         # Store job data
         self.jobs[job_id] = job
@@ -73,6 +99,7 @@ class SearchIndex:
             
         # Bulk update tries
         self._bulk_update_tries(jobs, job_ids)
+        self.generation += 1
         
     def _bulk_update_tries(self, jobs: List[Dict[str, Any]], job_ids: List[int]) -> None:
         """Update tries in bulk"""
@@ -107,15 +134,12 @@ class SearchIndex:
                 node.job_ids.update(job_ids)
             node.is_end = True
 
-    def search(self, 
-              title_patterns: List[str] = None,
-              skills: List[str] = None,
-              industries: List[str] = None,
-              locations: List[str] = None) -> List[Dict[str, Any]]:
-        """
-        Search for jobs matching the given criteria
-        Returns jobs sorted by relevance
-        """
+    def search_ids(self,
+                   title_patterns: List[str] = None,
+                   skills: List[str] = None,
+                   industries: List[str] = None,
+                   locations: List[str] = None) -> List[int]:
+        """Sorted ids of jobs matching all of the given criteria"""
         matching_ids = None
         
         # Find jobs matching title patterns
@@ -136,18 +160,97 @@ class SearchIndex:
         if industries:
             industry_matches = set()
             for industry in industries:
-                industry_matches.update(self.industry_map[industry.lower()])
+                industry_matches.update(self.industry_map.get(industry.lower(), ()))
             matching_ids = industry_matches if matching_ids is None else matching_ids.intersection(industry_matches)
         
         # Find jobs matching locations
         if locations:
             location_matches = set()
             for location in locations:
-                location_matches.update(self.location_map[location.lower()])
+                location_matches.update(self.location_map.get(location.lower(), ()))
             matching_ids = location_matches if matching_ids is None else matching_ids.intersection(location_matches)
         
         if matching_ids is None:
-            return list(self.jobs.values())
-        
-        # Return matching jobs
-        return [self.jobs[job_id] for job_id in matching_ids] 
\ No newline at end of file
+            return sorted(self.jobs)
+        return sorted(matching_ids)
+
+    def search(self, 
+              title_patterns: List[str] = None,
+              skills: List[str] = None,
+              industries: List[str] = None,
+              locations: List[str] = None) -> List[Dict[str, Any]]:
+        """
+        Search for jobs matching the given criteria
+        Returns jobs in index order
+        """
+        ids = self.search_ids(title_patterns, skills, industries, locations)
+        return [self.jobs[job_id] for job_id in ids]
+
+class SuggestionNode:
+    __slots__ = ('children', 'terms', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.terms = None  # display -> weight for terms whose key ends here
+        self.top = ()  # Precomputed best (weight, display) pairs below this node
+
+
+class SuggestionTrie:
+    """
+    Prefix trie for typeahead. Every node stores the top-k completions of
+    its subtree, computed once by finalize(), so a lookup is a walk down
+    the prefix and a slice - independent of how many terms share it.
+    """
+
+    def __init__(self, k: int = 10):
+        self.k = k
+        self.root = SuggestionNode()
+
+    def insert(self, key: str, display: str, weight: int) -> None:
+        node = self.root
+        for char in key.lower():
+            node = node.children.setdefault(char, SuggestionNode())
+        if node.terms is None:
+            node.terms = {}
+        node.terms[display] = max(weight, node.terms.get(display, 0))
+
+    def add_term(self, term: str, weight: int) -> None:
+        """Index a term under its start and the start of each later word"""
+        words = re.findall(r'\w+', term.lower())
+        for i in range(len(words)):
+            self.insert(' '.join(words[i:]), term, weight)
+
+    def finalize(self) -> 'SuggestionTrie':
+        # Iterative post-order walk; titles can be long enough to make
+        # recursion depth a concern
+        stack = [(self.root, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+                continue
+
+            best = dict(node.terms or {})
+            for child in node.children.values():
+                for weight, display in child.top:
+                    if weight > best.get(display, 0):
+                        best[display] = weight
+            node.top = tuple(sorted(
+                ((weight, display) for display, weight in best.items()),
+                key=lambda item: (-item[0], item[1])
+            )[:self.k])
+            # Only the precomputed lists are needed from here on
+            node.terms = None
+        return self
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        node = self.root
+        for char in ' '.join(re.findall(r'\w+', prefix.lower())):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [
+            {'value': display, 'count': weight}
+            for weight, display in node.top[:limit]
+        ]
@@ -2,7 +2,20 @@ from rest_framework import serializers
 from .models import Job
 
 class JobSerializer(serializers.ModelSerializer):
+    skills = serializers.ListField(child=serializers.CharField(), read_only=True)
+
     class Meta:
         model = Job
         fields = ['id', 'title', 'industry', 'skills', 'job_link', 
-                 'publication_date', 'description'] 
\ No newline at end of file
+                 'publication_date', 'description', 'description_text',
+                 'word_count']
+
+
+class JobListSerializer(serializers.ModelSerializer):
+    """Compact form for lists: the precomputed snippet instead of the description"""
+    skills = serializers.ListField(child=serializers.CharField(), read_only=True)
+
+    class Meta:
+        model = Job
+        fields = ['id', 'title', 'industry', 'position', 'company', 'location',
+                  'skills', 'job_link', 'publication_date', 'snippet', 'word_count']
@@ -1,64 +1,55 @@
-import requests
-from lxml import etree
+"""
+Feed fetching and parsing, and alert emails.
+
+Celery imports this module (through jobs.tasks) in every worker, and
+manage.py commands import it too, so the HTTP client and XML parser are
+imported on first use rather than here. dateutil is not deferred because
+Celery imports it anyway.
+"""
 from datetime import datetime
 from django.conf import settings
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
-import os
-from requests.adapters import HTTPAdapter
-from urllib3.util import Retry
 from io import BytesIO
-from django.core.mail import send_mail
+from django.core.mail import send_mail, get_connection, EmailMultiAlternatives
 from django.template.loader import render_to_string
 from .models import Job
 from .search import SearchIndex
-from django.core.cache import cache
-from functools import lru_cache, cached_property
-import aiohttp
-import asyncio
+from .skills import sync_vocabulary
+from .dedup import band_keys, fingerprint_job
+from .classifier import get_classifier
+from .text import describe, strip_cdata
+from .query_cache import get_query_cache, normalize_criteria
+from functools import cached_property
 from dateutil import parser as date_parser
-import re
-import pickle
-import hashlib
+import time
+from monitor.metrics import Stopwatch, inc, timer
 
 logger = logging.getLogger(__name__)
 
 class JobFetcher:
-    def __init__(self):
-        self.url = "https://www.myjobmag.co.ke/jobsxml_by_categories.xml"
-        self.allowed_industries = set(settings.ALLOWED_INDUSTRIES)
-        
-        # Pre-process tech job titles to lowercase
-        self.tech_job_titles_lower = {
-            title.lower() for title in settings.TECH_JOB_TITLES
-        }
-        
-        # Pre-process skills to lowercase
-        self.tech_skills_lower = {
-            skill.lower() for skill in settings.TECH_SKILLS
+    def __init__(self, url: Optional[str] = None):
+        self.url = url or settings.JOB_FEED_URL
+        self.allowed_industries = {
+            industry.lower() for industry in settings.ALLOWED_INDUSTRIES
         }
-        self.soft_skills_lower = {
-            skill.lower() for skill in settings.SOFT_SKILLS
-        }
-        self.search_index = SearchIndex()
-        self.timeout = aiohttp.ClientTimeout(total=20)  # Optimized timeout
-        
-        self._skill_pattern = re.compile(
-            r'\b(' + '|'.join(map(re.escape, self.tech_skills_lower)) + r')\b',
-            re.IGNORECASE
-        )
-        self._soft_skill_pattern = re.compile(
-            r'\b(' + '|'.join(map(re.escape, self.soft_skills_lower)) + r')\b',
-            re.IGNORECASE
-        )
+        self.skill_dictionary = sync_vocabulary()
+        # Compiled once per worker process and vocabulary version
+        self.classifier = get_classifier(self.skill_dictionary)
         
         logger.info(f"JobFetcher initialized with URL: {self.url}")
 
+    @cached_property
+    def search_index(self) -> SearchIndex:
+        return SearchIndex()
+
     @cached_property
     def session(self):
         """Lazy session initialization with connection pooling"""
+        import aiohttp
+
         return aiohttp.ClientSession(
-            timeout=self.timeout,
+            timeout=aiohttp.ClientTimeout(total=20),
             headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'},
             connector=aiohttp.TCPConnector(limit=10)
         )
@@ -66,31 +57,79 @@ class JobFetcher:
     async def fetch_jobs(self) -> List[Dict[str, Any]]:
         """Asynchronous job fetching"""
         try:
-            async with self.session.get(self.url) as response:
-                response.raise_for_status()
-                content = await response.read()
-                
-                # Use iterparse for memory efficiency
-                context = etree.iterparse(
-                    BytesIO(content),
-                    events=('end',),
-                    tag='item',
-                    remove_blank_text=True,
-                    recover=True
-                )
-                
-                jobs = []
-                for _, elem in context:
-                    if job := self._parse_job_item(elem):
-                        if self._should_include_job(job):
-                            jobs.append(job)
-                    elem.clear()  # Free memory
-                
-                return jobs
+            with timer('ingest_stage_seconds', stage='download'):
+                content = await self._download()
+            return self.parse_jobs(content)
                 
         except Exception as e:
             logger.error(f"Error fetching jobs: {str(e)}")
             return []
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Close the session; it is bound to the event loop that created it"""
+        if 'session' in self.__dict__:
+            await self.__dict__.pop('session').close()
+
+    async def _download(self) -> bytes:
+        async with self.session.get(self.url) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    def parse_jobs(self, content: bytes, stopwatch: Optional[Stopwatch] = None) -> List[Dict[str, Any]]:
+        """
+        Parse, enrich and filter the raw feed, timing each stage. Stage times
+        are recorded as metrics unless the caller passes its own stopwatch.
+        """
+        record = stopwatch is None
+        stopwatch = stopwatch or Stopwatch()
+        started = time.perf_counter()
+        from lxml import etree
+
+        # Use iterparse for memory efficiency
+        context = etree.iterparse(
+            BytesIO(content),
+            events=('end',),
+            tag='item',
+            remove_blank_text=True,
+            recover=True
+        )
+        
+        memo = self.classifier.title_memo
+        hits, misses = memo.hits, memo.misses
+
+        jobs = []
+        items = 0
+        for _, elem in context:
+            items += 1
+            if job := self._parse_job_item(elem):
+                with stopwatch('text'):
+                    job.update(describe(job['description']))
+                with stopwatch('extract'):
+                    self._add_skills(job)
+                with stopwatch('filter'):
+                    include = self._should_include_job(job)
+                if include:
+                    with stopwatch('fingerprint'):
+                        job['fingerprint'] = fingerprint_job(job)
+                        job['fingerprint_bands'] = band_keys(job['fingerprint'])
+                    jobs.append(job)
+            elem.clear()  # Free memory
+
+        # Whatever the loop spent outside extraction and filtering is parsing
+        stopwatch.add(
+            'parse',
+            time.perf_counter() - started - stopwatch.total(['text', 'extract', 'fingerprint', 'filter'])
+        )
+        if record:
+            stopwatch.observe('ingest_stage_seconds')
+            inc('ingest_feed_items_total', items)
+            inc('ingest_jobs_matched_total', len(jobs))
+            inc('classifier_title_cache_total', memo.hits - hits, result='hit')
+            inc('classifier_title_cache_total', memo.misses - misses, result='miss')
+        
+        return jobs
 
     def _parse_job_item(self, item) -> Dict[str, Any]:
         try:
@@ -100,7 +139,7 @@ class JobFetcher:
                     text = el.text or ''
                     if isinstance(text, bytes):
                         text = text.decode('utf-8')
-                    return text.strip()
+                    return strip_cdata(text.strip())
                 return ''
 
             title = get_text(item, 'title')
@@ -112,22 +151,12 @@ class JobFetcher:
             company = get_text(item, 'company')
             location = get_text(item, 'location')
 
-            # Clean CDATA if present
-            for field in [title, description, link, industry, position, company, location]:
-                if field.startswith('<![CDATA[') and field.endswith(']]>'):
-                    field = field[9:-3].strip()
-
             try:
                 pub_date = self._parse_date(pub_date)
             except ValueError:
                 logger.error(f"Could not parse date: {pub_date}")
                 return None
 
-            # Extract skills
-            tech_skills = self._extract_tech_skills(description)
-            soft_skills = self._extract_soft_skills(description)
-            all_skills = tech_skills.union(soft_skills)
-
             return {
                 'title': title,
                 'description': description,
@@ -137,37 +166,33 @@ class JobFetcher:
                 'position': position,
                 'company': company,
                 'location': location,
-                'skills': list(all_skills),
-                'tech_skills': list(tech_skills),
-                'soft_skills': list(soft_skills)
             }
         except Exception as e:
             logger.error(f"Error parsing job item: {str(e)}")
             return None
 
-    def _should_include_job(self, job: Dict[str, Any]) -> bool:
-        """Optimized job matching using search index"""
-        # Add job to search index
-        job_id = self.search_index.add_job(job)
-        
-        # Search for matching jobs
-        matches = self.search_index.search(
-            industries=list(self.allowed_industries),
-            title_patterns=list(self.tech_job_titles_lower)
-        )
-        
-        # Check if this job is in matches
-        return any(match['job_link'] == job['job_link'] for match in matches)
+    def _add_skills(self, job: Dict[str, Any]) -> None:
+        """Extract skills from the description into the job dict"""
+        tech_ids, soft_ids = self.classifier.extract_skill_ids(job['description_text'])
+        names = self.skill_dictionary.names_by_id
+
+        job['tech_skills'] = [names[skill_id] for skill_id in tech_ids]
+        job['soft_skills'] = [names[skill_id] for skill_id in soft_ids]
+        job['skills'] = job['tech_skills'] + job['soft_skills']
+        job['skill_ids'] = sorted(tech_ids | soft_ids)
 
-    def _extract_tech_skills(self, text: str) -> set:
-        """Optimized skill extraction using regex"""
-        return set(match.group(1).lower() 
-                  for match in self._skill_pattern.finditer(text))
+    def _should_include_job(self, job: Dict[str, Any]) -> bool:
+        """Keep jobs in an allowed industry whose title names a tech role"""
+        # Index every parsed job so search_jobs can query the whole feed
+        self.search_index.add_job(job)
 
-    def _extract_soft_skills(self, text: str) -> set:
-        """Optimized soft skill extraction using regex"""
-        return set(match.group(1).lower() 
-                  for match in self._soft_skill_pattern.finditer(text))
+        if (job['industry'] or '').lower() not in self.allowed_industries:
+            return False
+        # Positions repeat across postings, so check them first for memo hits
+        return (
+            self._check_title_match(job['position'] or '')
+            or self._check_title_match(job['title'])
+        )
 
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Optimized date parsing"""
@@ -177,39 +202,19 @@ class JobFetcher:
             logger.error(f"Could not parse date: {date_str}")
             return None
 
-    @lru_cache(maxsize=1000)
     def _check_title_match(self, title: str) -> bool:
-        """Cache title matching results"""
-        cache_key = f"title_match:{title}"
-        result = cache.get(cache_key)
-        
-        if result is None:
-            matches = self.search_index.search(title_patterns=[title])
-            result = bool(matches)
-            cache.set(cache_key, result, timeout=3600)  # Cache for 1 hour
-            
-        return result
-
-    def _cache_key(self, criteria: Dict[str, Any]) -> str:
-        """Generate cache key for search criteria"""
-        criteria_str = pickle.dumps(sorted(criteria.items()))
-        return f"job_search:{hashlib.md5(criteria_str).hexdigest()}"
+        """Title classification, memoized in the process-wide classifier"""
+        return self.classifier.matches_title(title)
 
     async def search_jobs(self, criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Search jobs with caching"""
-        cache_key = self._cache_key(criteria)
-        
-        # Try to get from cache
-        if cached_results := cache.get(cache_key):
-            return cached_results
-        
-        # Perform search
-        results = self.search_index.search(**criteria)
-        
-        # Cache results
-        cache.set(cache_key, results, timeout=3600)  # 1 hour
-        
-        return results
+        """Search jobs, caching the matching ids per index generation"""
+        index = self.search_index
+        criteria = normalize_criteria(criteria)
+        ids = get_query_cache().get_or_search(
+            index.uid, index.generation, criteria,
+            lambda: index.search_ids(**criteria)
+        )
+        return [index.jobs[job_id] for job_id in ids]
 
 class JobEmailService:
     @staticmethod
@@ -221,19 +226,51 @@ class JobEmailService:
                 'criteria': alert_criteria
             }
             
+            with timer('alert_stage_seconds', stage='email_render'):
+                html_content = render_to_string('jobs/email/job_alert.html', context)
+                text_content = render_to_string('jobs/email/job_alert.txt', context)
+            
+            # Send email
+            with timer('alert_stage_seconds', stage='email_send'):
+                send_mail(
+                    subject='New Job Matches Found!',
+                    message=text_content,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    recipient_list=[email],
+                    html_message=html_content,
+                    fail_silently=False,
+                )
+            inc('alert_emails_total', result='sent')
+            return True
+        except Exception as e:
+            logger.error(f"Error sending job alert email: {str(e)}")
+            inc('alert_emails_total', result='failed')
+            return False 
+
+    @staticmethod
+    def batch_send_alerts(alerts: List[Tuple[str, List[Job], dict]]) -> None:
+        """Send email alerts in batch"""
+        connection = get_connection()
+        messages = []
+        
+        for email, jobs, criteria in alerts:
+            context = {
+                'jobs': jobs,
+                'criteria': criteria
+            }
+            
             html_content = render_to_string('jobs/email/job_alert.html', context)
             text_content = render_to_string('jobs/email/job_alert.txt', context)
             
-            # Send email
-            send_mail(
+            message = EmailMultiAlternatives(
                 subject='New Job Matches Found!',
-                message=text_content,
+                body=text_content,
                 from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[email],
-                html_message=html_content,
-                fail_silently=False,
+                to=[email],
+                connection=connection
             )
-            return True
-        except Exception as e:
-            logger.error(f"Error sending job alert email: {str(e)}")
-            return False 
\ No newline at end of file
+            message.attach_alternative(html_content, "text/html")
+            messages.append(message)
+        
+        # Send all emails in one connection
+        connection.send_messages(messages)
@@ -0,0 +1,273 @@
+"""
+"Similar jobs" from TF-IDF vectors and precomputed cosine neighbours.
+
+rebuild_similarity() vectorizes every canonical job (title words, skills and
+description words) into an L2-normalised sparse matrix, finds each job's
+top SIMILARITY_TOP_K neighbours with batched sparse matrix products and
+stores them in JobNeighbours. The fitted model (vocabulary, IDF weights,
+matrix) is saved under SIMILARITY_DIR so update_similarity() can handle an
+ingest batch without refitting: new jobs are vectorized with the saved
+vocabulary, get their own neighbour lists, and are merged into the lists
+of existing jobs they now outrank. The nightly rebuild refreshes IDF
+weights and drops jobs that have been archived or marked duplicate.
+"""
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+
+import numpy as np
+from scipy import sparse
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job, JobNeighbours
+
+logger = logging.getLogger(__name__)
+
+_WORDS = re.compile(r'[a-z][a-z0-9+#.]{1,30}')
+_STOPWORDS = frozenset('''
+    a an and are as at be by for from has have in is it of on or our that the
+    this to we will with you your their they all any can may who what which
+    job jobs role work working position candidate candidates apply
+'''.split())
+
+# Term weights: a shared skill or title word says more than a description word
+TITLE_WEIGHT = 3
+SKILL_WEIGHT = 2
+
+
+def _terms(title: str, skill_ids: Iterable[int], description: str) -> Counter:
+    limit = settings.SIMILARITY_MAX_DESCRIPTION_CHARS
+    terms = Counter()
+    for word in _WORDS.findall((title or '').lower()):
+        if word not in _STOPWORDS:
+            terms[f't:{word}'] += TITLE_WEIGHT
+    for skill_id in set(skill_ids or ()):
+        terms[f's:{skill_id}'] += SKILL_WEIGHT
+    for word in _WORDS.findall((description or '')[:limit].lower()):
+        if word not in _STOPWORDS:
+            terms[f'd:{word}'] += 1
+    return terms
+
+
+def _rows(job_ids: Optional[List[int]] = None):
+    jobs = Job.objects.filter(canonical__isnull=True)
+    if job_ids is not None:
+        jobs = jobs.filter(id__in=job_ids)
+    return (
+        jobs.order_by('id')
+        .values_list('id', 'title', 'skill_ids', 'description_text')
+        .iterator(chunk_size=2000)
+    )
+
+
+class SimilarityModel:
+    def __init__(self, vocabulary: Dict[str, int], idf: np.ndarray,
+                 ids: np.ndarray, matrix: sparse.csr_matrix):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.ids = ids
+        self.matrix = matrix
+
+    @classmethod
+    def fit(cls, rows) -> 'SimilarityModel':
+        ids, documents = [], []
+        document_frequency = Counter()
+        for job_id, title, skill_ids, description in rows:
+            terms = _terms(title, skill_ids, description)
+            ids.append(job_id)
+            documents.append(terms)
+            document_frequency.update(terms.keys())
+
+        # Terms in a single job cannot connect two jobs; leave them out
+        vocabulary = {}
+        for term, count in document_frequency.items():
+            if count > 1:
+                vocabulary[term] = len(vocabulary)
+        frequencies = np.zeros(len(vocabulary), dtype=np.float32)
+        for term, index in vocabulary.items():
+            frequencies[index] = document_frequency[term]
+        idf = np.log((1 + len(ids)) / (1 + frequencies)).astype(np.float32) + 1
+
+        model = cls(vocabulary, idf, np.array(ids, dtype=np.int64), None)
+        model.matrix = model.transform(documents)
+        return model
+
+    def transform(self, documents: List[Counter]) -> sparse.csr_matrix:
+        """L2-normalised sublinear TF-IDF rows for term counters"""
+        indptr, indices, data = [0], [], []
+        for terms in documents:
+            for term, count in terms.items():
+                index = self.vocabulary.get(term)
+                if index is not None:
+                    indices.append(index)
+                    data.append(1 + math.log(count))
+            indptr.append(len(indices))
+
+        matrix = sparse.csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr)),
+            shape=(len(documents), len(self.vocabulary)),
+        )
+        matrix = matrix.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1))).ravel()
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms).dot(matrix).tocsr().astype(np.float32)
+
+    def neighbours(self, queries: sparse.csr_matrix, exclude: Optional[np.ndarray] = None,
+                   k: int = None, batch_size: int = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        (positions, scores) of the top-k rows of the model matrix for each
+        query row, best first. exclude[i] is a matrix position to skip for
+        query i (the query itself), or -1.
+        """
+        k = k or settings.SIMILARITY_TOP_K
+        batch_size = batch_size or settings.SIMILARITY_BATCH_SIZE
+        min_score = settings.SIMILARITY_MIN_SCORE
+        corpus = self.matrix.T.tocsr()
+        results = []
+
+        for start in range(0, queries.shape[0], batch_size):
+            scores = (queries[start:start + batch_size] @ corpus).toarray()
+            if exclude is not None:
+                rows = np.arange(scores.shape[0])
+                skip = exclude[start:start + batch_size]
+                scores[rows[skip >= 0], skip[skip >= 0]] = 0
+
+            count = min(k, scores.shape[1])
+            if count == 0:
+                results.extend((np.array([], dtype=np.int64), np.array([], dtype=np.float32))
+                               for _ in range(scores.shape[0]))
+                continue
+            top = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            for positions, values in zip(top, top_scores):
+                keep = values >= min_score
+                results.append((positions[keep], values[keep]))
+        return results
+
+    def save(self, directory: Path) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, write in (
+            ('vocabulary.json', lambda f: f.write(json.dumps(self.vocabulary).encode())),
+            ('arrays.npz', lambda f: np.savez(f, idf=self.idf, ids=self.ids)),
+            ('matrix.npz', lambda f: sparse.save_npz(f, self.matrix)),
+        ):
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=f'.{name}-')
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp, directory / name)
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional['SimilarityModel']:
+        try:
+            vocabulary = json.loads((directory / 'vocabulary.json').read_text())
+            arrays = np.load(directory / 'arrays.npz')
+            matrix = sparse.load_npz(directory / 'matrix.npz').tocsr()
+        except FileNotFoundError:
+            return None
+        return cls(vocabulary, arrays['idf'], arrays['ids'], matrix)
+
+
+def _directory() -> Path:
+    return Path(settings.SIMILARITY_DIR)
+
+
+def _save_neighbours(job_ids: Iterable[int], results, ids: np.ndarray) -> None:
+    now = timezone.now()
+    JobNeighbours.objects.bulk_create(
+        [
+            JobNeighbours(
+                job_id=int(job_id),
+                neighbour_ids=ids[positions].tolist(),
+                scores=[round(float(score), 4) for score in scores],
+                computed_at=now,
+            )
+            for job_id, (positions, scores) in zip(job_ids, results)
+        ],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['job'],
+        update_fields=['neighbour_ids', 'scores', 'computed_at'],
+    )
+
+
+def rebuild_similarity() -> int:
+    """Refit on all canonical jobs and recompute every neighbour list"""
+    model = SimilarityModel.fit(_rows())
+    results = model.neighbours(model.matrix, exclude=np.arange(len(model.ids)))
+    _save_neighbours(model.ids, results, model.ids)
+    JobNeighbours.objects.exclude(job_id__in=model.ids.tolist()).delete()
+    model.save(_directory())
+
+    logger.info(f"Rebuilt neighbours for {len(model.ids)} jobs over {len(model.vocabulary)} terms")
+    return len(model.ids)
+
+
+def update_similarity(job_ids: List[int]) -> int:
+    """
+    Add or refresh jobs in the saved model, compute their neighbours and
+    insert them into existing jobs' lists where they rank in the top k.
+    Falls back to a full rebuild when there is no saved model yet.
+    """
+    model = SimilarityModel.load(_directory())
+    if model is None:
+        return rebuild_similarity()
+
+    rows = list(_rows(job_ids))
+    if not rows:
+        return 0
+    vectors = model.transform([_terms(title, skills, text) for _, title, skills, text in rows])
+    new_ids = np.array([row[0] for row in rows], dtype=np.int64)
+
+    # Replace rows of jobs already in the model, append the rest
+    positions = {int(job_id): position for position, job_id in enumerate(model.ids)}
+    existing = [i for i, job_id in enumerate(new_ids) if int(job_id) in positions]
+    appended = [i for i, job_id in enumerate(new_ids) if int(job_id) not in positions]
+    if existing:
+        matrix = model.matrix.tolil()
+        for i in existing:
+            matrix[positions[int(new_ids[i])]] = vectors[i]
+        model.matrix = matrix.tocsr()
+    if appended:
+        model.matrix = sparse.vstack([model.matrix, vectors[appended]]).tocsr()
+        model.ids = np.concatenate([model.ids, new_ids[appended]])
+    positions = {int(job_id): position for position, job_id in enumerate(model.ids)}
+
+    own = np.array([positions[int(job_id)] for job_id in new_ids])
+    results = model.neighbours(vectors, exclude=own)
+    _save_neighbours(new_ids, results, model.ids)
+
+    # Existing jobs whose lists the new jobs now belong in
+    k = settings.SIMILARITY_TOP_K
+    candidates: Dict[int, Dict[int, float]] = {}
+    for job_id, (neighbour_positions, scores) in zip(new_ids, results):
+        for position, score in zip(neighbour_positions, scores):
+            neighbour = int(model.ids[position])
+            candidates.setdefault(neighbour, {})[int(job_id)] = float(score)
+
+    now = timezone.now()
+    changed = []
+    for neighbours in JobNeighbours.objects.filter(job_id__in=list(candidates)):
+        merged = dict(zip(neighbours.neighbour_ids, neighbours.scores))
+        merged.update(candidates.pop(neighbours.job_id))
+        best = sorted(merged.items(), key=lambda item: -item[1])[:k]
+        neighbours.neighbour_ids = [job_id for job_id, _ in best]
+        neighbours.scores = [round(score, 4) for _, score in best]
+        neighbours.computed_at = now
+        changed.append(neighbours)
+    JobNeighbours.objects.bulk_update(changed, ['neighbour_ids', 'scores', 'computed_at'], batch_size=1000)
+
+    model.save(_directory())
+    logger.info(f"Updated neighbours for {len(new_ids)} jobs and {len(changed)} existing lists")
+    return len(new_ids)
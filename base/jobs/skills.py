@@ -0,0 +1,132 @@
+"""
+In-process view of the Skill table.
+
+Jobs and alerts store skill ids; this module maps between ids and names
+(including aliases) without a query per lookup. Each process loads the
+dictionary once and reloads it when the shared version in the cache moves,
+which invalidate_skill_dictionary() does whenever skills change.
+"""
+from typing import Dict, Iterable, List, Optional
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'skills:version'
+
+
+class SkillDictionary:
+    def __init__(self, rows: Iterable[tuple], version: int = 0):
+        self.version = version
+        self.names_by_id: Dict[int, str] = {}
+        self.kinds_by_id: Dict[int, str] = {}
+        self.ids_by_name: Dict[str, int] = {}
+
+        for skill_id, name, kind, aliases in rows:
+            self.names_by_id[skill_id] = name
+            self.kinds_by_id[skill_id] = kind
+            for alias in aliases or []:
+                self.ids_by_name[alias.lower()] = skill_id
+            self.ids_by_name[name.lower()] = skill_id
+
+    def id(self, name: str) -> Optional[int]:
+        return self.ids_by_name.get(name.strip().lower())
+
+    def ids(self, names: Iterable[str]) -> List[int]:
+        """Ids for the given names or aliases, skipping unknown ones"""
+        ids = {self.id(name) for name in names}
+        ids.discard(None)
+        return sorted(ids)
+
+    def names(self, ids: Iterable[int], kind: Optional[str] = None) -> List[str]:
+        return [
+            self.names_by_id[skill_id]
+            for skill_id in ids or []
+            if skill_id in self.names_by_id
+            and (kind is None or self.kinds_by_id[skill_id] == kind)
+        ]
+
+    def __len__(self):
+        return len(self.names_by_id)
+
+
+_lock = threading.Lock()
+_dictionary: Optional[SkillDictionary] = None
+_checked_at = 0.0
+
+
+def _load(version: int) -> SkillDictionary:
+    from .models import Skill
+
+    rows = Skill.objects.values_list('id', 'name', 'kind', 'aliases')
+    dictionary = SkillDictionary(rows, version=version)
+    logger.info(f"Loaded {len(dictionary)} skills (version {version})")
+    return dictionary
+
+
+def get_skill_dictionary() -> SkillDictionary:
+    """
+    The process-wide dictionary. The shared version is checked at most
+    every SKILL_DICTIONARY_CHECK_INTERVAL seconds.
+    """
+    global _dictionary, _checked_at
+
+    now = time.monotonic()
+    if _dictionary is not None and now - _checked_at < settings.SKILL_DICTIONARY_CHECK_INTERVAL:
+        return _dictionary
+
+    with _lock:
+        version = cache.get(VERSION_KEY, 0)
+        if _dictionary is None or _dictionary.version != version:
+            _dictionary = _load(version)
+        _checked_at = now
+        return _dictionary
+
+
+async def aget_skill_dictionary() -> SkillDictionary:
+    """
+    Async views call this first so that later synchronous lookups (e.g.
+    from serializers) find the dictionary already loaded.
+    """
+    return await sync_to_async(get_skill_dictionary)()
+
+
+def invalidate_skill_dictionary() -> None:
+    """Make every process reload the dictionary on its next check"""
+    global _dictionary
+
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+    _dictionary = None
+
+
+def sync_vocabulary() -> SkillDictionary:
+    """
+    Make sure every skill in the TECH_SKILLS / SOFT_SKILLS settings exists
+    in the Skill table and return the current dictionary.
+    """
+    from .models import Skill
+
+    vocabulary = [(name, Skill.TECH) for name in settings.TECH_SKILLS]
+    vocabulary += [(name, Skill.SOFT) for name in settings.SOFT_SKILLS]
+
+    dictionary = get_skill_dictionary()
+    missing = [
+        Skill(name=name.lower(), kind=kind)
+        for name, kind in vocabulary
+        if dictionary.id(name) is None
+    ]
+
+    if missing:
+        Skill.objects.bulk_create(missing, ignore_conflicts=True)
+        invalidate_skill_dictionary()
+        dictionary = get_skill_dictionary()
+
+    return dictionary
@@ -0,0 +1,68 @@
+"""Typeahead suggestions for job titles and skills"""
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List
+import logging
+
+from django.conf import settings
+from django.db.models import Count
+
+from .artifacts import load, publish
+from .models import Job
+from .search import SuggestionTrie
+from .skills import get_skill_dictionary
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_NAME = 'suggestions'
+KINDS = ('title', 'skill')
+
+
+def build_suggestion_tries() -> Dict[str, SuggestionTrie]:
+    """Tries over positions and skills, weighted by canonical job count"""
+    k = settings.SUGGEST_TOP_K
+    jobs = Job.objects.filter(canonical__isnull=True)
+
+    titles = SuggestionTrie(k)
+    for row in jobs.exclude(position__isnull=True).exclude(position='') \
+            .values('position').annotate(count=Count('id')).order_by():
+        titles.add_term(row['position'], row['count'])
+
+    skill_counts = Counter()
+    for skill_ids in jobs.order_by().values_list('skill_ids', flat=True).iterator(chunk_size=5000):
+        skill_counts.update(skill_ids)
+
+    names = get_skill_dictionary().names_by_id
+    skills = SuggestionTrie(k)
+    for skill_id, count in skill_counts.items():
+        if skill_id in names:
+            skills.add_term(names[skill_id], count)
+
+    return {'title': titles.finalize(), 'skill': skills.finalize()}
+
+
+def publish_suggestions() -> int:
+    return publish(ARTIFACT_NAME, build_suggestion_tries())
+
+
+@lru_cache(maxsize=4096)
+def _suggest(generation: int, kind: str, prefix: str, limit: int) -> tuple:
+    _, tries = load(ARTIFACT_NAME, build=build_suggestion_tries)
+    kinds = KINDS if kind == 'all' else (kind,)
+    return tuple(
+        {**suggestion, 'type': name}
+        for name in kinds
+        for suggestion in tries[name].suggest(prefix, limit)
+    )
+
+
+def suggest(prefix: str, kind: str = 'all', limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Top completions for a prefix. Results are memoized per index generation,
+    so repeated keystrokes across users are dictionary hits.
+    """
+    generation, _ = load(ARTIFACT_NAME, build=build_suggestion_tries)
+    results = list(_suggest(generation, kind, prefix.strip().lower(), limit))
+    if kind == 'all':
+        results.sort(key=lambda item: -item['count'])
+    return results[:limit]
@@ -1,20 +1,146 @@
 from celery import shared_task
 from .services import JobFetcher
-from .models import Job, JobAlert
+from .models import ArchivedJob, Job, JobAlert, AlertDelivery, Skill
+from .skills import get_skill_dictionary
 from django.db import transaction
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+import asyncio
 import logging
 import time
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timedelta
 from django_celery_beat.models import PeriodicTask
 from .services import JobEmailService
-from django.core.mail import get_connection, EmailMultiAlternatives
-from django.template.loader import render_to_string
-from typing import List, Tuple
+from .rollups import record_new_jobs, reconcile_rollups
+from .trends import compact_skill_demand, reconcile_skill_demand, record_skill_demand
+from .dedup import DuplicateDetector
+from .locks import LeaseLock
+from .retention import prune_jobs
+from .facets import publish_facet_index
+from .suggestions import publish_suggestions
+from .index_file import build_search_index
+from monitor.metrics import inc, timer
+from typing import Any, Dict, List
 
 logger = logging.getLogger(__name__)
 
+def save_jobs(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Upsert parsed jobs by job_link and return created/updated/failed/archived
+    counts and the ids of the new canonical jobs. Links that were archived
+    are skipped, so old postings still in the feed are not ingested again.
+    """
+    new_jobs = 0
+    updated_jobs = 0
+    failed_jobs = 0
+    archived_jobs = 0
+    created_jobs = []
+
+    with timer('ingest_stage_seconds', stage='db_write'), transaction.atomic():
+        # One query for every stored canonical job sharing an LSH band
+        # with this batch; new canonical jobs are added as they are created
+        detector = DuplicateDetector()
+        detector.load(job['fingerprint'] for job in jobs)
+        archived_links = set(
+            ArchivedJob.objects.filter(job_link__in=[job.get('job_link') for job in jobs])
+            .values_list('job_link', flat=True)
+        )
+
+        for job_data in jobs:
+            job_link = job_data.get('job_link')
+            if not job_link:
+                logger.warning(f"Missing job_link in data: {job_data}")
+                continue
+            if job_link in archived_links:
+                archived_jobs += 1
+                continue
+
+            logger.info(f"Processing job: {job_data}")  # Log entire job data
+
+            try:
+                defaults = {
+                    'title': job_data['title'],
+                    'industry': job_data['industry'],
+                    'position': job_data['position'],
+                    'company': job_data['company'],
+                    'location': job_data['location'],
+                    'skill_ids': job_data['skill_ids'],
+                    'publication_date': job_data['publication_date'],
+                    'description': job_data['description'],
+                    'description_text': job_data['description_text'],
+                    'snippet': job_data['snippet'],
+                    'word_count': job_data['word_count'],
+                    'fingerprint': job_data['fingerprint'],
+                    'fingerprint_bands': job_data['fingerprint_bands'],
+                }
+                job, created = Job.objects.update_or_create(
+                    job_link=job_link,
+                    defaults=defaults,
+                    # Only new postings are linked; existing rows keep their status
+                    create_defaults={
+                        **defaults,
+                        'canonical_id': detector.find(job_data['fingerprint']),
+                    }
+                )
+
+                if created:
+                    new_jobs += 1
+                    created_jobs.append(job)
+                    if job.canonical_id is None:
+                        detector.add(job.id, job.fingerprint)
+                    logger.info(f"Created new job: {job.title}")
+                else:
+                    updated_jobs += 1
+                    logger.info(f"Updated existing job: {job.title}")
+            except Exception as e:
+                logger.error(f"Error saving job {job_data.get('title', 'Unknown')}: {str(e)}")
+                logger.exception("Full traceback:")
+                failed_jobs += 1
+                continue
+
+        # Keep the dashboard rollups in step with the inserted rows
+        record_new_jobs(created_jobs)
+        record_skill_demand(created_jobs)
+
+    inc('ingest_jobs_total', new_jobs, result='created')
+    inc('ingest_jobs_total', updated_jobs, result='updated')
+    inc('ingest_jobs_total', failed_jobs, result='failed')
+    inc('ingest_jobs_total', archived_jobs, result='archived')
+
+    return {
+        'created': new_jobs,
+        'updated': updated_jobs,
+        'failed': failed_jobs,
+        'archived': archived_jobs,
+        'created_ids': [job.id for job in created_jobs if job.canonical_id is None],
+    }
+
 @shared_task
-def fetch_and_save_jobs():
+@timer('task_duration_seconds', task='fetch_and_save_jobs')
+def fetch_and_save_jobs(coalesce=False):
+    """
+    Fetch the feed and upsert its jobs. Only one run proceeds at a time:
+    an overlapping trigger is skipped, or with coalesce=True asks the
+    running fetch to go again once it finishes.
+    """
+    lock = LeaseLock('fetch_and_save_jobs')
+    if not lock.acquire():
+        if coalesce:
+            lock.mark_pending()
+            logger.info("Job fetch already running; queued a follow-up run")
+            return "Job fetch already running; queued a follow-up run"
+        logger.info("Job fetch already running; skipped")
+        return "Job fetch already running; skipped"
+
+    try:
+        return _fetch_and_save_jobs(lock)
+    finally:
+        lock.release()
+        if lock.take_pending():
+            fetch_and_save_jobs.delay()
+
+def _fetch_and_save_jobs(lock: LeaseLock):
     logger.info("\n=== Starting job fetch task ===")
     current_time = datetime.now()
     logger.info(f"Current time: {current_time}")
@@ -26,7 +152,7 @@ def fetch_and_save_jobs():
         task.save()
         
         job_fetcher = JobFetcher()
-        jobs = job_fetcher.fetch_jobs()
+        jobs = asyncio.run(job_fetcher.fetch_jobs())
         
         logger.info(f"Found {len(jobs)} jobs to process")
         
@@ -34,45 +160,18 @@ def fetch_and_save_jobs():
             logger.warning("No jobs found to process")
             return "No jobs found to process"
         
-        new_jobs = 0
-        updated_jobs = 0
-
-        with transaction.atomic():
-            for job_data in jobs:
-                job_link = job_data.get('job_link')
-                if not job_link:
-                    logger.warning(f"Missing job_link in data: {job_data}")
-                    continue
-                    
-                logger.info(f"Processing job: {job_data}")  # Log entire job data
-                
-                try:
-                    job, created = Job.objects.update_or_create(
-                        job_link=job_link,
-                        defaults={
-                            'title': job_data['title'],
-                            'industry': job_data['industry'],
-                            'position': job_data['position'],
-                            'company': job_data['company'],
-                            'location': job_data['location'],
-                            'skills': job_data['skills'],
-                            'tech_skills': job_data['tech_skills'],
-                            'soft_skills': job_data['soft_skills'],
-                            'publication_date': job_data['publication_date'],
-                            'description': job_data['description']
-                        }
-                    )
-                    
-                    if created:
-                        new_jobs += 1
-                        logger.info(f"Created new job: {job.title}")
-                    else:
-                        updated_jobs += 1
-                        logger.info(f"Updated existing job: {job.title}")
-                except Exception as e:
-                    logger.error(f"Error saving job {job_data.get('title', 'Unknown')}: {str(e)}")
-                    logger.exception("Full traceback:")
-                    continue
+        # Don't write if another run may have taken over the feed meanwhile
+        lock.ensure_held()
+        counts = save_jobs(jobs)
+        new_jobs = counts['created']
+        updated_jobs = counts['updated']
+
+        if new_jobs or updated_jobs:
+            refresh_facets.delay()
+            refresh_suggestions.delay()
+            refresh_search_index.delay()
+        if counts['created_ids']:
+            refresh_similar_jobs.delay(counts['created_ids'])
 
         result = f"Job update complete. New jobs: {new_jobs}, Updated jobs: {updated_jobs}"
         logger.info(result)
@@ -83,6 +182,97 @@ def fetch_and_save_jobs():
         logger.exception("Full traceback:")
         raise
 
+@shared_task
+def reconcile_job_rollups(hours=48):
+    """Periodically correct drift in the dashboard rollups"""
+    count = reconcile_rollups(hours=hours)
+    return f"Reconciled {count} rollup rows"
+
+@shared_task
+def maintain_skill_demand(days=2):
+    """Correct the last few days of skill demand counters and compact old days"""
+    # Rebuilding rows that an ingest run is incrementing would lose counts
+    lock = LeaseLock('fetch_and_save_jobs')
+    if not lock.acquire(blocking=True, timeout=settings.LOCK_TTL):
+        return "Job fetch still running; skipped"
+    try:
+        reconciled = reconcile_skill_demand(days=days)
+    finally:
+        lock.release()
+    compacted = compact_skill_demand()
+    return f"Reconciled {reconciled} skill demand rows, compacted {compacted}"
+
+@shared_task
+def prune_old_jobs():
+    """Archive jobs older than JOB_RETENTION_DAYS in small batches"""
+    archived = prune_jobs()
+    if archived:
+        refresh_facets.delay()
+        refresh_suggestions.delay()
+        refresh_search_index.delay()
+    return f"Archived {archived} jobs"
+
+@shared_task
+def refresh_facets():
+    """Rebuild the facet bitmap index and publish it to the web processes"""
+    generation = publish_facet_index()
+    return f"Published facet index generation {generation}"
+
+@shared_task
+def refresh_suggestions():
+    """Rebuild the typeahead tries and publish them to the web processes"""
+    generation = publish_suggestions()
+    return f"Published suggestions generation {generation}"
+
+@shared_task
+def refresh_search_index():
+    """Write a new search index file generation and switch readers to it"""
+    # Two builds would both write the next generation's file; an overlapping
+    # trigger asks the running build to go again instead
+    lock = LeaseLock('search_index')
+    if not lock.acquire():
+        lock.mark_pending()
+        return "Search index build already running; queued a follow-up build"
+    try:
+        generation = build_search_index()
+    finally:
+        lock.release()
+        if lock.take_pending():
+            refresh_search_index.delay()
+    return f"Built search index generation {generation}"
+
+@shared_task(bind=True, max_retries=10, default_retry_delay=60)
+def refresh_similar_jobs(self, job_ids):
+    """Add newly ingested jobs to the similarity model and neighbour lists"""
+    # Updates and rebuilds both rewrite the saved model, so they take turns
+    # NumPy and SciPy stay out of every worker that never runs this
+    from .similarity import update_similarity
+
+    lock = LeaseLock('similarity')
+    if not lock.acquire(blocking=True, timeout=settings.LOCK_TTL):
+        raise self.retry()
+    try:
+        with timer('task_duration_seconds', task='refresh_similar_jobs'):
+            count = update_similarity(job_ids)
+    finally:
+        lock.release()
+    return f"Updated similar jobs for {count} jobs"
+
+@shared_task(bind=True, max_retries=10, default_retry_delay=60)
+def rebuild_similar_jobs(self):
+    """Refit the similarity model and recompute every job's neighbours"""
+    from .similarity import rebuild_similarity
+
+    lock = LeaseLock('similarity')
+    if not lock.acquire(blocking=True, timeout=settings.LOCK_TTL):
+        raise self.retry()
+    try:
+        with timer('task_duration_seconds', task='rebuild_similar_jobs'):
+            count = rebuild_similarity()
+    finally:
+        lock.release()
+    return f"Rebuilt similar jobs for {count} jobs"
+
 @shared_task
 def test_task():
     try:
@@ -100,93 +290,180 @@ def test_celery():
     logger.info("Test task running")
     return "Test task complete"
 
+def _alert_criteria(alert: JobAlert) -> dict:
+    return {
+        'industries': alert.industries,
+        'skills': alert.skills,
+        'job_titles': alert.job_titles,
+        'locations': alert.locations
+    }
+
+def _matching_jobs(alert: JobAlert, high_water: int):
+    """Jobs in the (last_job_id, high_water] id range that match the alert"""
+    # Range scan on the primary key instead of a created_at window
+    query = Job.objects.filter(
+        id__gt=alert.last_job_id,
+        id__lte=high_water,
+        canonical__isnull=True
+    )
+
+    if not alert.last_job_id:
+        # If never sent, only look back 24 hours
+        query = query.filter(
+            created_at__gt=timezone.now() - timedelta(days=1)
+        )
+
+    # Apply filters
+    if alert.industries:
+        query = query.filter(industry__in=alert.industries)
+    if alert.skill_ids:
+        # Alerts match on tech skills only, as they did before skill ids:
+        # a shared soft skill ("communication") is not a relevant match
+        kinds = get_skill_dictionary().kinds_by_id
+        tech_ids = [skill_id for skill_id in alert.skill_ids if kinds.get(skill_id) == Skill.TECH]
+        query = query.filter(skill_ids__overlap=tech_ids)
+    if alert.job_titles:
+        query = query.filter(title__in=alert.job_titles)
+    if alert.locations:
+        query = query.filter(location__in=alert.locations)
+
+    return query.order_by('id')
+
+def _process_alert(alert: JobAlert, high_water: int):
+    """
+    Record the alert's matches up to high_water as a pending delivery and
+    advance its watermark in the same transaction. Returns the new
+    delivery, or None when nothing matched. Sending happens separately in
+    deliver_job_alert on the email queue.
+    """
+    with timer('alert_stage_seconds', stage='match'):
+        job_ids = list(_matching_jobs(alert, high_water).values_list('id', flat=True))
+
+    delivery = None
+    with transaction.atomic():
+        if job_ids:
+            delivery, created = AlertDelivery.objects.get_or_create(
+                alert=alert,
+                to_job_id=high_water,
+                defaults={
+                    'from_job_id': alert.last_job_id,
+                    'job_count': len(job_ids),
+                    'job_ids': job_ids,
+                }
+            )
+            if not created:
+                delivery = None
+
+        alert.last_job_id = high_water
+        alert.save(update_fields=['last_job_id', 'updated_at'])
+
+    return delivery
+
 @shared_task
+@timer('task_duration_seconds', task='send_job_alerts')
 def send_job_alerts():
     """
-    Task to send job alert emails for new matching jobs
+    Task to match active alerts against new jobs and queue their emails
     """
     logger.info("Starting job alerts task")
-    
-    # Get active alerts
-    alerts = JobAlert.objects.filter(is_active=True)
-    
+
+    # Snapshot the watermark once so every alert in this run covers the same
+    # range and jobs inserted meanwhile are left for the next run. Ids are
+    # handed out at insert, not commit, so a job still in an open ingest
+    # transaction can commit below Max('id') and would never be matched;
+    # stopping at jobs older than ALERT_WATERMARK_LAG leaves every id below
+    # the watermark committed, as long as no ingest transaction runs longer.
+    high_water = Job.objects.filter(
+        created_at__lte=timezone.now() - timedelta(seconds=settings.ALERT_WATERMARK_LAG)
+    ).aggregate(max_id=Max('id'))['max_id'] or 0
+
+    # Get active alerts that have not yet seen the newest jobs
+    alerts = JobAlert.objects.filter(is_active=True, last_job_id__lt=high_water)
+
     for alert in alerts:
         try:
-            # Get jobs since last alert
-            query = Job.objects.all()
-            
-            if alert.last_sent:
-                query = query.filter(created_at__gt=alert.last_sent)
-            else:
-                # If never sent, get last 24 hours
-                query = query.filter(
-                    created_at__gt=timezone.now() - timedelta(days=1)
-                )
-            
-            # Apply filters
-            if alert.industries:
-                query = query.filter(industry__in=alert.industries)
-            if alert.skills:
-                query = query.filter(tech_skills__overlap=alert.skills)
-            if alert.job_titles:
-                query = query.filter(title__in=alert.job_titles)
-            if alert.locations:
-                query = query.filter(location__in=alert.locations)
-            
-            matching_jobs = query.order_by('-created_at')
-            
-            if matching_jobs.exists():
-                # Send email
-                alert_criteria = {
-                    'industries': alert.industries,
-                    'skills': alert.skills,
-                    'job_titles': alert.job_titles,
-                    'locations': alert.locations
-                }
-                
-                success = JobEmailService.send_job_alert(
-                    alert.email,
-                    matching_jobs,
-                    alert_criteria
+            if delivery := _process_alert(alert, high_water):
+                transaction.on_commit(
+                    lambda delivery_id=delivery.id: deliver_job_alert.delay(delivery_id)
                 )
-                
-                if success:
-                    # Update last_sent timestamp
-                    alert.last_sent = timezone.now()
-                    alert.save()
-                    logger.info(f"Sent job alert to {alert.email}")
-                
+                logger.info(f"Queued job alert to {alert.email}")
         except Exception as e:
             logger.error(f"Error processing alert for {alert.email}: {str(e)}")
             continue
-    
+
+    # Re-queue deliveries whose email task was lost (e.g. a worker crash
+    # before the message reached the broker or while sending)
+    stale_before = timezone.now() - timedelta(seconds=settings.ALERT_DELIVERY_REQUEUE_AFTER)
+    stale = AlertDelivery.objects.filter(
+        Q(sending_at__isnull=True) | Q(sending_at__lt=stale_before),
+        sent_at__isnull=True,
+        failed_at__isnull=True,
+        created_at__lt=stale_before
+    ).values_list('id', flat=True)
+    for delivery_id in stale:
+        deliver_job_alert.delay(delivery_id)
+
     logger.info("Completed job alerts task")
 
-class JobEmailService:
-    @staticmethod
-    def batch_send_alerts(alerts: List[Tuple[str, List[Job], dict]]) -> None:
-        """Send email alerts in batch"""
-        connection = get_connection()
-        messages = []
-        
-        for email, jobs, criteria in alerts:
-            context = {
-                'jobs': jobs,
-                'criteria': criteria
-            }
-            
-            html_content = render_to_string('jobs/email/job_alert.html', context)
-            text_content = render_to_string('jobs/email/job_alert.txt', context)
-            
-            message = EmailMultiAlternatives(
-                subject='New Job Matches Found!',
-                body=text_content,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[email],
-                connection=connection
+@shared_task(bind=True, max_retries=5, default_retry_delay=60)
+def deliver_job_alert(self, delivery_id):
+    """
+    Send the email for one pending delivery. The delivery is claimed in a
+    short transaction and the email sent after it commits, so no row lock
+    is held over SMTP; a claim younger than ALERT_DELIVERY_REQUEUE_AFTER
+    makes duplicate or retried messages for the same delivery no-ops.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        delivery = (
+            AlertDelivery.objects.select_for_update(skip_locked=True)
+            .select_related('alert')
+            .filter(pk=delivery_id, sent_at__isnull=True, failed_at__isnull=True)
+            .filter(
+                Q(sending_at__isnull=True) |
+                Q(sending_at__lt=now - timedelta(seconds=settings.ALERT_DELIVERY_REQUEUE_AFTER))
             )
-            message.attach_alternative(html_content, "text/html")
-            messages.append(message)
-        
-        # Send all emails in one connection
-        connection.send_messages(messages) 
\ No newline at end of file
+            .first()
+        )
+        if delivery is None:
+            return f"Delivery {delivery_id} already sent, given up or in progress"
+
+        delivery.sending_at = now
+        delivery.attempts += 1
+        delivery.save(update_fields=['sending_at', 'attempts'])
+
+    alert = delivery.alert
+    # The email shows the snippet; skip loading the full descriptions
+    jobs = list(
+        Job.objects.filter(id__in=delivery.job_ids)
+        .defer('description', 'description_text')
+        .order_by('id')
+    )
+    if jobs and not JobEmailService.send_job_alert(alert.email, jobs, _alert_criteria(alert)):
+        if delivery.attempts >= settings.ALERT_DELIVERY_MAX_ATTEMPTS:
+            AlertDelivery.objects.filter(pk=delivery.pk).update(sending_at=None, failed_at=timezone.now())
+            logger.error(f"Gave up on job alert to {alert.email} after {delivery.attempts} attempts")
+            return f"Gave up on delivery {delivery_id} after {delivery.attempts} attempts"
+        AlertDelivery.objects.filter(pk=delivery.pk).update(sending_at=None)
+        raise self.retry()
+
+    sent_at = timezone.now()
+    AlertDelivery.objects.filter(pk=delivery.pk).update(sending_at=None, sent_at=sent_at)
+    JobAlert.objects.filter(pk=alert.pk).update(last_sent=sent_at)
+
+    logger.info(f"Sent job alert to {alert.email}")
+    return f"Sent {len(jobs)} jobs to {alert.email}"
+
+@shared_task
+def benchmark_probe(kind='io', duration=0.05):
+    """
+    No-op workload for comparing worker profiles: 'io' sleeps like a
+    network call, 'cpu' spins like parsing or matching.
+    """
+    if kind == 'cpu':
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            pass
+    else:
+        time.sleep(duration)
+    return kind
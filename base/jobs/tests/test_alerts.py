@@ -0,0 +1,165 @@
+from datetime import timedelta
+from unittest import mock
+
+from celery.exceptions import Retry
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.utils import timezone
+
+from jobs.models import AlertDelivery, Job, JobAlert, Skill
+from jobs.tasks import _matching_jobs, deliver_job_alert, send_job_alerts
+
+from .utils import JobsTestCase, make_job
+
+
+@override_settings(ALERT_WATERMARK_LAG=300)
+class SendJobAlertsTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create(username='alerts')
+        self.alert = JobAlert.objects.create(user=user, email='alerts@example.com')
+        patcher = mock.patch('jobs.tasks.deliver_job_alert.delay')
+        self.deliver = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_alerts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            send_job_alerts()
+
+    def test_records_one_delivery_for_settled_jobs(self):
+        jobs = [make_job(age=timedelta(minutes=10)) for _ in range(3)]
+
+        self.run_alerts()
+
+        delivery = AlertDelivery.objects.get()
+        self.assertEqual(delivery.job_ids, [job.id for job in jobs])
+        self.assertEqual(delivery.to_job_id, jobs[-1].id)
+        self.deliver.assert_called_once_with(delivery.id)
+        self.alert.refresh_from_db()
+        self.assertEqual(self.alert.last_job_id, jobs[-1].id)
+
+    def test_rerun_does_not_record_the_same_jobs_again(self):
+        make_job(age=timedelta(minutes=10))
+
+        self.run_alerts()
+        self.run_alerts()
+
+        self.assertEqual(AlertDelivery.objects.count(), 1)
+
+    def test_watermark_stops_before_jobs_that_may_still_be_committing(self):
+        settled = make_job(age=timedelta(minutes=10))
+        recent = make_job(age=timedelta(seconds=30))
+
+        self.run_alerts()
+
+        self.alert.refresh_from_db()
+        self.assertEqual(self.alert.last_job_id, settled.id)
+        self.assertEqual(AlertDelivery.objects.get().job_ids, [settled.id])
+
+        # Once it is older than the lag, the next run picks it up
+        type(recent).objects.filter(pk=recent.pk).update(created_at=settled.created_at)
+        self.run_alerts()
+        self.assertEqual(
+            list(AlertDelivery.objects.order_by('id').values_list('job_ids', flat=True)),
+            [[settled.id], [recent.id]]
+        )
+
+    def test_duplicates_are_not_alerted(self):
+        canonical = make_job(age=timedelta(minutes=10))
+        make_job(age=timedelta(minutes=10), canonical=canonical)
+
+        self.run_alerts()
+
+        self.assertEqual(AlertDelivery.objects.get().job_ids, [canonical.id])
+
+
+class AlertSkillMatchTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.python = Skill.objects.create(name='python', kind=Skill.TECH)
+        self.communication = Skill.objects.create(name='communication', kind=Skill.SOFT)
+        self.user = User.objects.create(username='skills')
+
+    def matches(self, skill_ids):
+        alert = JobAlert.objects.create(user=self.user, email='skills@example.com', skill_ids=skill_ids)
+        high_water = Job.objects.order_by('-id').values_list('id', flat=True).first()
+        return list(_matching_jobs(alert, high_water).values_list('id', flat=True))
+
+    def test_matches_on_tech_skills_only(self):
+        tech = make_job(skill_ids=[self.python.id])
+        make_job(skill_ids=[self.communication.id])
+
+        self.assertEqual(self.matches([self.python.id, self.communication.id]), [tech.id])
+
+    def test_soft_skills_alone_match_nothing(self):
+        make_job(skill_ids=[self.communication.id])
+
+        self.assertEqual(self.matches([self.communication.id]), [])
+
+
+@override_settings(ALERT_DELIVERY_MAX_ATTEMPTS=3, ALERT_DELIVERY_REQUEUE_AFTER=900)
+class DeliverJobAlertTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create(username='delivery')
+        alert = JobAlert.objects.create(user=user, email='delivery@example.com')
+        job = make_job()
+        self.delivery = AlertDelivery.objects.create(
+            alert=alert, from_job_id=0, to_job_id=job.id, job_count=1, job_ids=[job.id]
+        )
+        patcher = mock.patch('jobs.tasks.JobEmailService.send_job_alert')
+        self.send = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_claims_the_delivery_before_sending(self):
+        def send(*args):
+            # The claim is saved before the email goes out
+            self.assertIsNotNone(AlertDelivery.objects.get().sending_at)
+            return True
+        self.send.side_effect = send
+
+        deliver_job_alert(self.delivery.id)
+
+        self.delivery.refresh_from_db()
+        self.assertIsNotNone(self.delivery.sent_at)
+        self.assertIsNone(self.delivery.sending_at)
+        self.assertEqual(self.delivery.attempts, 1)
+
+    def test_claimed_delivery_is_not_sent_twice(self):
+        AlertDelivery.objects.filter(pk=self.delivery.pk).update(sending_at=timezone.now())
+
+        deliver_job_alert(self.delivery.id)
+
+        self.send.assert_not_called()
+
+    def test_failed_send_retries_then_gives_up(self):
+        self.send.return_value = False
+
+        for _ in range(2):
+            with self.assertRaises(Retry):
+                deliver_job_alert(self.delivery.id)
+        deliver_job_alert(self.delivery.id)
+        deliver_job_alert(self.delivery.id)
+
+        self.delivery.refresh_from_db()
+        self.assertEqual(self.delivery.attempts, 3)
+        self.assertIsNotNone(self.delivery.failed_at)
+        self.assertIsNone(self.delivery.sent_at)
+        self.assertEqual(self.send.call_count, 3)
+
+    def test_requeue_skips_failed_and_in_progress_deliveries(self):
+        old = timezone.now() - timedelta(hours=1)
+        AlertDelivery.objects.filter(pk=self.delivery.pk).update(created_at=old, failed_at=old)
+        sending = AlertDelivery.objects.create(
+            alert=self.delivery.alert, from_job_id=0, to_job_id=self.delivery.to_job_id + 1
+        )
+        stuck = AlertDelivery.objects.create(
+            alert=self.delivery.alert, from_job_id=0, to_job_id=self.delivery.to_job_id + 2
+        )
+        AlertDelivery.objects.filter(pk=sending.pk).update(created_at=old, sending_at=timezone.now())
+        AlertDelivery.objects.filter(pk=stuck.pk).update(created_at=old, sending_at=old)
+
+        with mock.patch('jobs.tasks.deliver_job_alert.delay') as deliver:
+            send_job_alerts()
+
+        deliver.assert_called_once_with(stuck.id)
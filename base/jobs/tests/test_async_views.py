@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.utils import timezone
+from django_celery_beat.models import IntervalSchedule, PeriodicTask
+
+from jobs.models import Skill
+
+from .utils import JobsTestCase, make_job
+
+
+class AsyncJobViewsTests(JobsTestCase):
+    def get(self, url, **params):
+        return async_to_sync(self.async_client.get)(url, params)
+
+    def test_list_pages_newest_first_without_duplicates(self):
+        now = timezone.now()
+        jobs = [make_job(publication_date=now - timedelta(days=n)) for n in range(3)]
+        make_job(canonical=jobs[0])
+
+        first = self.get('/api/async/jobs/', page_size=2).json()
+        second = self.get('/api/async/jobs/', page_size=2, page=2).json()
+
+        self.assertEqual(first['count'], 3)
+        self.assertEqual([job['id'] for job in first['results'] + second['results']],
+                         [job.id for job in jobs])
+        self.assertIsNone(first['previous'])
+        self.assertIn('page=2', first['next'])
+        self.assertIsNone(second['next'])
+
+    def test_list_accepts_the_job_filters(self):
+        python = Skill.objects.create(name='python', kind=Skill.TECH)
+        match = make_job(skill_ids=[python.id], industry='Banking')
+        make_job(industry='Banking')
+        make_job(skill_ids=[python.id])
+
+        body = self.get('/api/async/jobs/', skills='Python', industry='bank').json()
+
+        self.assertEqual([job['id'] for job in body['results']], [match.id])
+        self.assertEqual(body['results'][0]['skills'], ['python'])
+
+    def test_search_matches_title_position_and_company(self):
+        by_title = make_job(title='Field Officer')
+        by_company = make_job(company='Field Trust')
+        make_job()
+
+        body = self.get('/api/async/jobs/search/', q='field').json()
+
+        self.assertEqual({job['id'] for job in body['results']}, {by_title.id, by_company.id})
+
+    def test_detail_hides_duplicates(self):
+        canonical = make_job()
+        duplicate = make_job(canonical=canonical)
+
+        self.assertEqual(self.get(f'/api/async/jobs/{canonical.id}/').json()['id'], canonical.id)
+        self.assertEqual(self.get(f'/api/async/jobs/{duplicate.id}/').status_code, 404)
+
+    def test_task_status(self):
+        every = IntervalSchedule.objects.create(every=5, period=IntervalSchedule.MINUTES)
+        PeriodicTask.objects.create(name='fetch-jobs-every-5-minutes',
+                                    task='jobs.tasks.fetch_and_save_jobs', interval=every)
+        make_job()
+
+        body = self.get('/monitor/task-status/').json()
+
+        self.assertEqual(body['status'], 'success')
+        self.assertEqual(body['task_info']['name'], 'fetch-jobs-every-5-minutes')
+        self.assertEqual(body['celery_info']['snapshot_error'], 'No worker snapshot collected yet')
@@ -0,0 +1,58 @@
+from django.test import SimpleTestCase
+
+from jobs.benchmarks.feeds import generate_feed, generate_items
+from jobs.benchmarks.ingest import run_ingest_benchmark
+from jobs.benchmarks.search import QUERY_TYPES, build_query_mix, run_search_benchmark
+from jobs.models import Job
+from jobs.search import SearchIndex
+from jobs.services import JobFetcher
+
+from .utils import JobsTestCase
+
+
+class FeedTests(SimpleTestCase):
+    def test_feeds_are_reproducible_per_seed(self):
+        self.assertEqual(generate_feed(5, seed=1), generate_feed(5, seed=1))
+        self.assertNotEqual(generate_feed(5, seed=1), generate_feed(5, seed=2))
+
+
+class IngestBenchmarkTests(JobsTestCase):
+    def test_feed_parses_and_keeps_the_matching_share(self):
+        items = list(generate_items(200, match_ratio=0.3))
+        jobs = JobFetcher().parse_jobs(generate_feed(200, match_ratio=0.3))
+
+        self.assertEqual(len({item['link'] for item in items}), 200)
+        self.assertTrue(20 <= len(jobs) <= 100, len(jobs))
+
+    def test_rolls_back_unless_kept(self):
+        results = run_ingest_benchmark(50, match_ratio=0.5)
+
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(results['items'], 50)
+        self.assertGreater(results['matched_jobs'], 0)
+        self.assertEqual(results['upsert_counts']['created'], results['matched_jobs'])
+        self.assertEqual(
+            set(results['stage_seconds']),
+            {'download', 'parse', 'text', 'extract', 'filter', 'upsert'}
+        )
+
+    def test_keep_leaves_the_jobs(self):
+        results = run_ingest_benchmark(20, match_ratio=0.5, keep=True)
+
+        self.assertEqual(Job.objects.count(), results['matched_jobs'])
+
+
+class SearchBenchmarkTests(SimpleTestCase):
+    def test_query_mix_is_reproducible_and_covers_every_type(self):
+        queries = build_query_mix(9, seed=3)
+
+        self.assertEqual(queries, build_query_mix(9, seed=3))
+        self.assertEqual({kind for kind, _ in queries}, set(QUERY_TYPES))
+
+    def test_reports_build_memory_and_latency(self):
+        results = run_search_benchmark(SearchIndex, size=50, queries=30)
+
+        self.assertEqual(results['jobs'], 50)
+        self.assertGreater(results['memory_bytes'], 0)
+        self.assertEqual(set(results['queries']), set(QUERY_TYPES))
+        self.assertEqual(sum(row['count'] for row in results['queries'].values()), 30)
@@ -0,0 +1,69 @@
+from django.test import SimpleTestCase, override_settings
+
+from jobs import classifier
+from jobs.classifier import BoundedMemo, JobClassifier, get_classifier
+from jobs.models import Skill
+from jobs.skills import get_skill_dictionary
+
+from .utils import JobsTestCase
+
+
+class BoundedMemoTests(SimpleTestCase):
+    def test_evicts_the_least_recently_used(self):
+        memo = BoundedMemo(2)
+        memo.get_or_compute('a', str.upper)
+        memo.get_or_compute('b', str.upper)
+        memo.get_or_compute('a', str.upper)
+        memo.get_or_compute('c', str.upper)
+
+        self.assertEqual((memo.hits, memo.misses, len(memo)), (1, 3, 2))
+        memo.get_or_compute('b', str.upper)
+        self.assertEqual(memo.misses, 4)
+
+
+@override_settings(CLASSIFIER_TITLE_CACHE_SIZE=100)
+class JobClassifierTests(SimpleTestCase):
+    def setUp(self):
+        self.classifier = JobClassifier(
+            ['Software Engineer', 'Data Analyst'],
+            {'python': 1, 'py': 1, 'communication': 2},
+            {1: Skill.TECH, 2: Skill.SOFT},
+        )
+
+    def test_extracts_tech_and_soft_skills_by_alias(self):
+        tech, soft = self.classifier.extract_skill_ids('Py scripting and good Communication; pythonic code')
+
+        self.assertEqual((tech, soft), ({1}, {2}))
+
+    def test_title_match_is_case_insensitive_and_memoized(self):
+        self.assertTrue(self.classifier.matches_title('Senior SOFTWARE ENGINEER'))
+        self.assertTrue(self.classifier.matches_title('senior software engineer'))
+        self.assertFalse(self.classifier.matches_title('Software Engineering Manager'))
+        self.assertEqual(self.classifier.title_memo.hits, 1)
+
+
+class GetClassifierTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        classifier._classifiers.clear()
+        self.addCleanup(classifier._classifiers.clear)
+        Skill.objects.create(name='python', kind=Skill.TECH)
+
+    def test_reused_until_the_vocabulary_changes(self):
+        first = get_classifier(get_skill_dictionary())
+        self.assertIs(get_classifier(get_skill_dictionary()), first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name='sql', kind=Skill.TECH)
+        second = get_classifier(get_skill_dictionary())
+
+        self.assertIsNot(second, first)
+        self.assertEqual(second.extract_skill_ids('python and sql')[0], set(second.skill_terms.values()))
+
+    def test_keeps_at_most_two_vocabularies(self):
+        for name in ('sql', 'excel', 'django'):
+            with self.captureOnCommitCallbacks(execute=True):
+                Skill.objects.create(name=name, kind=Skill.TECH)
+            get_classifier(get_skill_dictionary())
+
+        self.assertEqual(len(classifier._classifiers), 2)
@@ -0,0 +1,57 @@
+from unittest import mock
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from base.celery import close_connection_pools
+
+
+def database_settings(mode):
+    """DATABASES['default'] as a fresh process sees it with DB_CONNECTION_MODE=mode"""
+    output = subprocess.run(
+        [sys.executable, '-c',
+         'import json; from django.conf import settings; '
+         'print(json.dumps(settings.DATABASES["default"], default=str))'],
+        cwd=settings.BASE_DIR,
+        env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'base.settings', 'DB_CONNECTION_MODE': mode},
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output)
+
+
+class ConnectionModeTests(SimpleTestCase):
+    def test_persistent_reuses_checked_connections(self):
+        database = database_settings('persistent')
+
+        self.assertEqual(database['CONN_MAX_AGE'], settings.DB_CONN_MAX_AGE)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('pool', database.get('OPTIONS', {}))
+
+    def test_pool_configures_a_psycopg_pool(self):
+        database = database_settings('pool')
+
+        self.assertEqual(database.get('CONN_MAX_AGE', 0), 0)
+        self.assertEqual(database['OPTIONS']['pool'], {
+            'min_size': settings.DB_POOL_MIN_SIZE,
+            'max_size': settings.DB_POOL_MAX_SIZE,
+            'timeout': settings.DB_POOL_TIMEOUT,
+        })
+
+    def test_none_connects_per_request(self):
+        database = database_settings('none')
+
+        self.assertEqual(database.get('CONN_MAX_AGE', 0), 0)
+        self.assertNotIn('pool', database.get('OPTIONS', {}))
+
+    def test_worker_child_closes_its_pools_on_shutdown(self):
+        postgres, other = mock.Mock(vendor='postgresql'), mock.Mock(vendor='sqlite')
+        with mock.patch('django.db.connections.all', return_value=[postgres, other]) as all_connections:
+            close_connection_pools()
+
+        all_connections.assert_called_once_with(initialized_only=True)
+        postgres.close_pool.assert_called_once_with()
+        other.close_pool.assert_not_called()
@@ -0,0 +1,92 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from jobs.dedup import DuplicateDetector, band_keys, distance, fingerprint_job
+from jobs.models import Job
+
+from .utils import JobsTestCase, make_job
+
+DESCRIPTION = (
+    'We are looking for a backend engineer to build and run our payments '
+    'platform in Python and Django, with Postgres, Redis and Celery. You will '
+    'own services end to end, review code and mentor two junior engineers.'
+)
+
+
+def posting(**fields):
+    job = {'title': 'Backend Engineer', 'company': 'Acme', 'description': DESCRIPTION}
+    job.update(fields)
+    return job
+
+
+class FingerprintTests(SimpleTestCase):
+    def test_settings_keep_the_band_guarantee(self):
+        self.assertLess(settings.DEDUP_MAX_DISTANCE, settings.DEDUP_BANDS)
+
+    @override_settings(DEDUP_BANDS=4)
+    def test_detector_rejects_a_distance_the_bands_cannot_find(self):
+        with self.assertRaises(ImproperlyConfigured):
+            DuplicateDetector(max_distance=4)
+
+    def test_markup_and_case_do_not_change_the_fingerprint(self):
+        html = posting(description=f'<p>{DESCRIPTION.upper()}</p>')
+        self.assertEqual(fingerprint_job(html), fingerprint_job(posting()))
+
+    def test_blank_description_is_not_fingerprinted(self):
+        self.assertIsNone(fingerprint_job(posting(description='')))
+        self.assertIsNone(fingerprint_job(posting(description='<p> </p>')))
+        self.assertEqual(band_keys(None), [])
+
+    def test_any_allowed_distance_leaves_a_band_in_common(self):
+        fingerprint = fingerprint_job(posting())
+        width = 64 // settings.DEDUP_BANDS
+        # Worst case: every differing bit lands in a different band
+        flipped = fingerprint
+        for band in range(settings.DEDUP_MAX_DISTANCE):
+            flipped ^= 1 << (band * width)
+
+        self.assertEqual(distance(fingerprint, flipped), settings.DEDUP_MAX_DISTANCE)
+        self.assertTrue(set(band_keys(fingerprint)) & set(band_keys(flipped)))
+
+
+class DuplicateDetectorTests(JobsTestCase):
+    def save(self, **fields):
+        job = posting(**fields)
+        fingerprint = fingerprint_job(job)
+        return make_job(fingerprint=fingerprint, fingerprint_bands=band_keys(fingerprint), **job)
+
+    def test_finds_a_stored_duplicate(self):
+        original = self.save()
+        detector = DuplicateDetector()
+        fingerprint = fingerprint_job(posting())
+
+        detector.load([fingerprint])
+
+        self.assertEqual(detector.find(fingerprint), original.id)
+
+    def test_ignores_jobs_without_a_fingerprint(self):
+        self.save(description='')
+        detector = DuplicateDetector()
+
+        detector.load([None])
+        detector.add(1, None)
+
+        self.assertIsNone(detector.find(None))
+
+    def test_command_keeps_blank_postings_separate(self):
+        first = make_job(title='Accountant', company='Acme', description='')
+        second = make_job(title='Driver', company='Acme', description='')
+        original = make_job(**posting())
+        duplicate = make_job(**posting())
+
+        call_command('dedup_jobs', stdout=StringIO())
+
+        canonical = dict(Job.objects.values_list('id', 'canonical_id'))
+        self.assertIsNone(canonical[first.id])
+        self.assertIsNone(canonical[second.id])
+        self.assertIsNone(canonical[original.id])
+        self.assertEqual(canonical[duplicate.id], original.id)
@@ -0,0 +1,62 @@
+from io import StringIO
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from jobs.models import Job
+
+from .utils import JobsTestCase, make_job
+
+
+class ListQueriesTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.jobs = [make_job(description='<p>Long posting</p>', description_text='Long posting')
+                     for _ in range(2)]
+
+    def assertSkipsDescriptions(self, get):
+        with CaptureQueriesContext(connection) as context:
+            response = get()
+        self.assertEqual(response.status_code, 200)
+        job_queries = [q['sql'] for q in context.captured_queries if 'FROM "jobs_job"' in q['sql']]
+        self.assertTrue(job_queries)
+        for sql in job_queries:
+            self.assertNotIn('"jobs_job"."description"', sql)
+            self.assertNotIn('"jobs_job"."description_text"', sql)
+
+    def test_list_views_leave_descriptions_unread(self):
+        ids = ','.join(str(job.id) for job in self.jobs)
+        self.assertSkipsDescriptions(lambda: self.client.get('/api/jobs/'))
+        self.assertSkipsDescriptions(lambda: self.client.get(f'/api/jobs/?ids={ids}'))
+        self.assertSkipsDescriptions(lambda: async_to_sync(self.async_client.get)('/api/async/jobs/'))
+        self.assertSkipsDescriptions(
+            lambda: async_to_sync(self.async_client.get)('/api/async/jobs/search/?q=engineer')
+        )
+
+    def test_detail_includes_descriptions(self):
+        response = self.client.get(f'/api/jobs/{self.jobs[0].id}/')
+
+        self.assertEqual(response.json()['description_text'], 'Long posting')
+
+
+class BackfillDescriptionTextTests(JobsTestCase):
+    def test_fills_text_and_refreshes_cached_jobs(self):
+        job = make_job(description='<p>Build <b>data</b> pipelines</p>', description_text='')
+        self.assertEqual(self.client.get(f'/api/jobs/{job.id}/').json()['description_text'], '')
+
+        call_command('backfill_description_text', stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.description_text, 'Build data pipelines')
+        self.assertEqual(job.word_count, 3)
+        response = self.client.get(f'/api/jobs/{job.id}/')
+        self.assertEqual(response.json()['description_text'], 'Build data pipelines')
+
+    def test_skips_jobs_already_filled(self):
+        job = make_job(description='<p>New text</p>', description_text='Old text')
+
+        call_command('backfill_description_text', stdout=StringIO())
+
+        self.assertEqual(Job.objects.get(pk=job.pk).description_text, 'Old text')
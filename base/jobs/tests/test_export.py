@@ -0,0 +1,77 @@
+from datetime import timedelta
+from io import StringIO
+import json
+import tempfile
+
+from asgiref.sync import async_to_sync
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.export import aexport_lines, export_lines
+from jobs.models import Job
+
+from .utils import JobsTestCase, make_job
+
+
+class ExportTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('job-export')
+        self.jobs = [make_job() for _ in range(3)]
+
+    def test_streams_ndjson(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [job.id for job in self.jobs])
+
+    def test_streams_csv(self):
+        response = self.client.get(self.url, {'output': 'csv'})
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('id,title,'))
+        self.assertEqual(len(lines), 4)
+
+    def test_since_needs_a_utc_offset(self):
+        response = self.client.get(self.url, {'since': '2024-01-31T00:00:00'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('since', response.json())
+
+    def test_command_since_needs_a_utc_offset(self):
+        with self.assertRaises(CommandError):
+            call_command('export_jobs', since='2024-01-31T00:00:00', stdout=StringIO(), stderr=StringIO())
+
+        with tempfile.NamedTemporaryFile('r') as output:
+            call_command('export_jobs', since='2024-01-31T00:00:00Z', output=output.name, stderr=StringIO())
+            self.assertEqual(len(output.read().splitlines()), len(self.jobs))
+
+    def test_since_limits_to_recent_updates(self):
+        Job.objects.filter(pk=self.jobs[0].pk).update(updated_at=timezone.now() - timedelta(days=2))
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+
+        response = self.client.get(self.url, {'since': since})
+
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [job.id for job in self.jobs[1:]])
+
+    def test_async_lines_match_sync_lines(self):
+        async def collect():
+            return [chunk async for chunk in aexport_lines(Job.objects.all(), 'csv', chunk_size=2)]
+
+        chunks = async_to_sync(collect)()
+
+        self.assertEqual(len(chunks), 2)  # Header and three rows, two lines per chunk
+        self.assertEqual(''.join(chunks), ''.join(export_lines(Job.objects.all(), 'csv')))
+
+    def test_asgi_response_streams_asynchronously(self):
+        async def fetch():
+            response = await self.async_client.get(self.url)
+            return response.is_async, b''.join([chunk async for chunk in response.streaming_content])
+
+        is_async, body = async_to_sync(fetch)()
+
+        self.assertTrue(is_async)
+        self.assertEqual(len(body.splitlines()), 3)
@@ -0,0 +1,60 @@
+from array import array
+
+from jobs.facets import FacetIndex, publish_facet_index
+from jobs.models import Skill
+
+from .utils import JobsTestCase, make_job
+
+
+class FacetIndexTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.python = Skill.objects.create(name='python', kind=Skill.TECH)
+        self.sql = Skill.objects.create(name='sql', kind=Skill.TECH)
+        canonical = make_job(industry='Banking', location='Nairobi', skill_ids=[self.python.id])
+        make_job(industry='Banking', location='Mombasa', skill_ids=[self.sql.id])
+        make_job(industry='ICT / Computer', location='Nairobi', skill_ids=[self.python.id, self.sql.id])
+        make_job(industry='Banking', skill_ids=[self.python.id], canonical=canonical)
+
+    def test_counts_follow_the_list_filters(self):
+        index = FacetIndex.from_database()
+
+        counts = index.counts(index.filter(industry='bank', skill_ids=[self.python.id]))
+
+        self.assertEqual(counts['count'], 1)
+        self.assertEqual(counts['location'], [{'value': 'Nairobi', 'count': 1}])
+        self.assertEqual(index.counts(index.filter())['count'], 3)  # Duplicate left out
+
+    def test_rare_values_are_stored_as_arrays(self):
+        rows = [('Banking', 'Nairobi', [self.python.id]) for _ in range(100)]
+        rows.append(('Farming', 'Kisumu', [self.python.id, self.sql.id]))
+        index = FacetIndex.build(rows)
+
+        self.assertIsInstance(index.industries['Banking'], int)
+        self.assertEqual(index.industries['Farming'], array('I', [100]))
+        counts = index.counts(index.filter(skill_ids=[self.sql.id]))
+        self.assertEqual(counts['count'], 1)
+        self.assertEqual(counts['location'], [{'value': 'Kisumu', 'count': 1}])
+        self.assertEqual(index.counts(index.filter(industry='farm'))['skills'],
+                         [{'value': 'python', 'count': 1}, {'value': 'sql', 'count': 1}])
+
+    def test_endpoint_is_unavailable_until_published(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/jobs/facets/')
+
+        self.assertEqual(response.status_code, 503)
+
+    def test_endpoint_serves_the_published_index(self):
+        publish_facet_index()
+        body = self.client.get('/api/jobs/facets/', {'skills': 'python'}).json()
+
+        self.assertEqual(body['count'], 2)
+        self.assertEqual(body['skills'], [{'value': 'python', 'count': 2}, {'value': 'sql', 'count': 1}])
+        self.assertEqual(body['industry'], [{'value': 'Banking', 'count': 1},
+                                            {'value': 'ICT / Computer', 'count': 1}])
+
+        make_job(industry='Banking', skill_ids=[self.python.id])
+        generation = publish_facet_index()
+
+        body = self.client.get('/api/jobs/facets/', {'skills': 'python'}).json()
+        self.assertEqual((body['generation'], body['count']), (generation, 3))
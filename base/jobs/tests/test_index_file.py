@@ -0,0 +1,103 @@
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+import os
+import tempfile
+
+from django.test import override_settings
+from django.utils import timezone
+
+from jobs import index_file
+from jobs.index_file import IndexReader, build_search_index, get_index_reader, write_index
+from jobs.locks import LeaseLock
+from jobs.models import Skill
+from jobs.tasks import refresh_search_index
+
+from .utils import JobsTestCase, make_job
+
+
+class SearchIndexFileTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        overrides = override_settings(SEARCH_INDEX_DIR=directory.name, ARTIFACT_CHECK_INTERVAL=0)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        index_file._reader = None
+        self.addCleanup(setattr, index_file, '_reader', None)
+
+        self.python = Skill.objects.create(name='python', kind=Skill.TECH)
+        now = timezone.now()
+        self.older = make_job(title='Data Engineer', industry='ICT / Computer', location='Nairobi',
+                              skill_ids=[self.python.id], publication_date=now - timedelta(days=2))
+        self.newer = make_job(title='Data Analyst', industry='Banking', location='Nairobi',
+                              publication_date=now - timedelta(days=1))
+        make_job(title='Driver', location='Mombasa', publication_date=now)
+        make_job(title='Data Scientist', canonical=self.older)
+
+    def reader(self):
+        build_search_index()
+        return get_index_reader()
+
+    def test_not_built_yet(self):
+        self.assertIsNone(get_index_reader())
+        self.assertEqual(self.client.get('/api/jobs/search/').status_code, 503)
+
+    def test_search_is_newest_first_and_skips_duplicates(self):
+        reader = self.reader()
+
+        self.assertEqual(reader.size, 3)
+        self.assertEqual(reader.job_ids(reader.search(query='dat')), [self.newer.id, self.older.id])
+        self.assertEqual(reader.job_ids(reader.search(query='data eng')), [self.older.id])
+        self.assertEqual(reader.job_ids(reader.search(skill_ids=[self.python.id])), [self.older.id])
+        self.assertEqual(reader.job_ids(reader.search(industry='bank', location='nairobi')), [self.newer.id])
+
+    def test_new_generation_replaces_the_reader_and_prunes_old_files(self):
+        first = self.reader()
+        make_job(title='Data Steward')
+        second = self.reader()
+        self.reader()
+
+        self.assertIsNot(second, first)
+        self.assertEqual(second.generation, first.generation + 1)
+        self.assertEqual(len(list(self.directory.glob('index-*.bin'))), 2)
+        # A reader of a removed generation keeps working from its mapping
+        self.assertEqual(first.size, 3)
+        self.assertEqual(len(IndexReader(second.path).search(query='data')), 3)
+
+    def test_search_endpoint(self):
+        self.reader()
+
+        body = self.client.get('/api/jobs/search/', {'q': 'data', 'skills': 'python'}).json()
+
+        self.assertEqual(body['count'], 1)
+        self.assertEqual([job['id'] for job in body['results']], [self.older.id])
+
+    def test_file_replaced_under_the_same_name_is_mapped_again(self):
+        first = self.reader()
+        # As a second, overlapping build would have done
+        tmp = self.directory / '.index-replacement'
+        write_index(tmp, first.generation, [])
+        os.replace(tmp, first.path)
+
+        second = get_index_reader()
+
+        self.assertIsNot(second, first)
+        self.assertEqual(second.size, 0)
+
+    def test_overlapping_build_is_deferred_to_the_running_one(self):
+        holder = LeaseLock('search_index')
+        self.assertTrue(holder.acquire())
+        self.addCleanup(holder.release)
+
+        with mock.patch('jobs.tasks.build_search_index') as build:
+            refresh_search_index()
+        build.assert_not_called()
+
+        holder.release()
+        with mock.patch('jobs.tasks.refresh_search_index.delay') as follow_up:
+            refresh_search_index()
+        follow_up.assert_called_once_with()
+        self.assertIsNotNone(get_index_reader())
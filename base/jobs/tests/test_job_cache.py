@@ -0,0 +1,55 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from jobs.job_cache import get_serialized_jobs
+from jobs.models import Job
+from jobs.serializers import JobSerializer
+
+from .test_dedup import DESCRIPTION
+from .utils import JobsTestCase, make_job
+
+
+@override_settings(JOB_PRUNE_PAUSE=0)
+class JobCacheTests(JobsTestCase):
+    def get(self, ids):
+        return get_serialized_jobs(ids, Job.objects.filter(canonical__isnull=True), JobSerializer)
+
+    def test_returns_jobs_in_the_order_asked(self):
+        jobs = [make_job() for _ in range(3)]
+        ids = [jobs[2].id, jobs[0].id, jobs[1].id]
+
+        self.assertEqual([job['id'] for job in self.get(ids)], ids)
+        with self.assertNumQueries(0):
+            self.assertEqual([job['id'] for job in self.get(ids)], ids)
+
+    def test_save_invalidates(self):
+        job = make_job(title='Before')
+        self.get([job.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.title = 'After'
+            job.save()
+
+        self.assertEqual(self.get([job.id])[0]['title'], 'After')
+
+    def test_delete_invalidates(self):
+        job = make_job()
+        self.get([job.id])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Job.objects.filter(pk=job.pk).delete()
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.get([job.id]), [])
+
+    def test_dedup_command_invalidates_linked_duplicates(self):
+        canonical = make_job(title='Backend Engineer', company='Acme', description=DESCRIPTION)
+        duplicate = make_job(title='Backend Engineer', company='Acme', description=DESCRIPTION)
+        self.get([canonical.id, duplicate.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('dedup_jobs', stdout=StringIO())
+
+        self.assertEqual([job['id'] for job in self.get([canonical.id, duplicate.id])], [canonical.id])
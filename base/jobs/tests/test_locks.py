@@ -0,0 +1,72 @@
+import time
+
+from jobs.locks import LeaseLock, LockLost
+
+from .utils import JobsTestCase
+
+
+class LeaseLockTests(JobsTestCase):
+    def lock(self, **kwargs):
+        lock = LeaseLock('test', client=self.redis, **kwargs)
+        self.addCleanup(lock.release)
+        return lock
+
+    def test_only_one_holder_at_a_time(self):
+        first, second = self.lock(), self.lock()
+
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+
+        first.release()
+        self.assertTrue(second.acquire())
+
+    def test_heartbeat_extends_the_lease(self):
+        lock = self.lock(ttl=0.3, heartbeat=0.05)
+        lock.acquire()
+
+        time.sleep(0.6)
+
+        self.assertEqual(self.redis.get(lock.key), lock.token.encode())
+        lock.ensure_held()
+
+    def test_expired_lease_can_be_taken_over(self):
+        stalled = self.lock(ttl=0.2, heartbeat=60)
+        stalled.acquire()
+
+        time.sleep(0.3)
+
+        self.assertTrue(self.lock().acquire())
+
+    def test_holder_notices_a_takeover(self):
+        holder = self.lock(ttl=1, heartbeat=0.05)
+        holder.acquire()
+        self.redis.set(holder.key, 'someone-else')
+
+        time.sleep(0.2)
+
+        with self.assertRaises(LockLost):
+            holder.ensure_held()
+
+    def test_release_leaves_another_holders_lease(self):
+        stalled = self.lock(ttl=0.2, heartbeat=60)
+        stalled.acquire()
+        time.sleep(0.3)
+        current = self.lock()
+        current.acquire()
+
+        stalled.release()
+
+        self.assertEqual(self.redis.get(current.key), current.token.encode())
+
+    def test_blocking_acquire_waits_for_release(self):
+        holder = self.lock(ttl=0.2, heartbeat=60)
+        holder.acquire()
+
+        self.assertTrue(self.lock().acquire(blocking=True, timeout=1, poll=0.05))
+
+    def test_pending_mark_is_taken_once(self):
+        lock = self.lock()
+        lock.mark_pending()
+
+        self.assertTrue(lock.take_pending())
+        self.assertFalse(lock.take_pending())
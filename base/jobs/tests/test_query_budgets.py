@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from django_celery_beat.models import IntervalSchedule, PeriodicTask
+
+from jobs.facets import publish_facet_index
+from jobs.models import Skill
+from jobs.skills import get_skill_dictionary
+from monitor.testing import QueryBudgetMixin, query_budget
+
+from .utils import JobsTestCase, make_job
+
+
+class QueryBudgetTests(QueryBudgetMixin, JobsTestCase):
+    """
+    Queries per request once the skill dictionary is loaded, as it is in
+    every process after its first request
+    """
+
+    def setUp(self):
+        super().setUp()
+        python = Skill.objects.create(name='python', kind=Skill.TECH)
+        self.jobs = [make_job(skill_ids=[python.id]) for _ in range(5)]
+        every = IntervalSchedule.objects.create(every=5, period=IntervalSchedule.MINUTES)
+        PeriodicTask.objects.create(name='fetch-jobs-every-5-minutes', task='jobs.tasks.fetch_and_save_jobs',
+                                    interval=every)
+        get_skill_dictionary()
+        publish_facet_index()
+
+    def test_job_api(self):
+        ids = ','.join(str(job.id) for job in self.jobs)
+        self.query_budgets = {
+            '/api/jobs/': 2,  # count and page
+            f'/api/jobs/?ids={ids}': 1,
+            f'/api/jobs/{self.jobs[0].id}/': 1,
+            '/api/jobs/facets/': 0,
+            '/api/async/jobs/': 2,
+            '/api/async/jobs/search/?q=engineer': 2,
+            f'/api/async/jobs/{self.jobs[0].id}/': 1,
+        }
+        self.assertQueryBudgets()
+
+    def test_cached_reads(self):
+        ids = ','.join(str(job.id) for job in self.jobs)
+        self.client.get(f'/api/jobs/?ids={ids}')
+        self.client.get(f'/api/jobs/{self.jobs[0].id}/')
+        self.client.get('/api/jobs/facets/')
+
+        self.assertQueryBudget(f'/api/jobs/?ids={ids}', 0)
+        self.assertQueryBudget(f'/api/jobs/{self.jobs[0].id}/', 0)
+        self.assertQueryBudget('/api/jobs/facets/', 0)
+
+    def test_export_streams_from_one_query(self):
+        with query_budget(1, label='GET /api/jobs/export/'):
+            response = self.client.get('/api/jobs/export/')
+            body = b''.join(response.streaming_content)
+        self.assertEqual(len(body.splitlines()), len(self.jobs))
+
+    def test_monitor(self):
+        self.query_budgets = {
+            '/monitor/': 4,  # two totals, industries, periodic tasks
+            '/monitor/task-status/': 3,
+            '/monitor/metrics': 0,
+        }
+        self.assertQueryBudgets()
+
+        self.client.force_login(User.objects.create(username='staff', is_staff=True))
+        self.assertQueryBudget('/monitor/profiles/', 2)  # session and user
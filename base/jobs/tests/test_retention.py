@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+
+from jobs.models import ArchivedJob, Job
+from jobs.retention import prune_jobs
+from jobs.tasks import save_jobs
+
+from .utils import JobsTestCase, make_job
+
+
+def parsed_job(job_link, **fields):
+    """A job dict as JobFetcher.parse_jobs hands it to save_jobs"""
+    job = {
+        'title': 'Data Analyst',
+        'industry': 'NGO / Non-Profit Associations',
+        'position': None,
+        'company': 'Acme',
+        'location': 'Nairobi',
+        'skill_ids': [],
+        'job_link': job_link,
+        'publication_date': timezone.now(),
+        'description': 'Analyse programme data',
+        'description_text': 'Analyse programme data',
+        'snippet': 'Analyse programme data',
+        'word_count': 3,
+        'fingerprint': None,
+        'fingerprint_bands': [],
+    }
+    job.update(fields)
+    return job
+
+
+@override_settings(JOB_PRUNE_PAUSE=0, JOB_RETENTION_DAYS=90)
+class PruneJobsTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = timezone.now() - timedelta(days=400)
+
+    def test_archives_jobs_past_the_window(self):
+        old = make_job(publication_date=self.old)
+        recent = make_job()
+
+        self.assertEqual(prune_jobs(), 1)
+
+        self.assertEqual(list(Job.objects.values_list('id', flat=True)), [recent.id])
+        self.assertEqual(ArchivedJob.objects.get().id, old.id)
+
+    def test_duplicates_go_with_their_canonical_job(self):
+        canonical = make_job(publication_date=self.old)
+        duplicate = make_job(canonical=canonical)
+
+        self.assertEqual(prune_jobs(), 2)
+
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(ArchivedJob.objects.get(id=duplicate.id).canonical_id, canonical.id)
+
+    def test_zero_retention_days_is_not_the_default(self):
+        make_job(publication_date=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(prune_jobs(retention_days=0), 1)
+
+    def test_archived_links_are_not_ingested_again(self):
+        job = make_job(publication_date=self.old)
+        prune_jobs()
+
+        counts = save_jobs([parsed_job(job.job_link), parsed_job('https://example.com/new')])
+
+        self.assertEqual((counts['created'], counts['archived']), (1, 1))
+        self.assertEqual(list(Job.objects.values_list('job_link', flat=True)), ['https://example.com/new'])
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+
+from jobs.models import Job, JobHourlyRollup
+from jobs.retention import prune_jobs
+from jobs.rollups import get_job_stats, reconcile_rollups, record_new_jobs
+
+from .utils import JobsTestCase, make_job
+
+
+@override_settings(JOB_PRUNE_PAUSE=0)
+class RollupTests(JobsTestCase):
+    def test_counts_only_canonical_jobs(self):
+        canonical = make_job()
+        duplicate = make_job(canonical=canonical)
+
+        record_new_jobs([canonical, duplicate])
+
+        self.assertEqual(get_job_stats(), {'total_jobs': 1, 'last_24h_jobs': 1})
+
+    def test_reconcile_skips_duplicates(self):
+        canonical = make_job()
+        make_job(canonical=canonical)
+        make_job(age=timedelta(days=30))
+
+        reconcile_rollups(hours=None)
+
+        self.assertEqual(get_job_stats()['total_jobs'], Job.objects.filter(canonical__isnull=True).count())
+
+    def test_archived_jobs_leave_the_totals(self):
+        old = timezone.now() - timedelta(days=400)
+        jobs = [
+            make_job(publication_date=old),
+            make_job(publication_date=old),
+            make_job(),
+        ]
+        record_new_jobs(jobs)
+
+        prune_jobs(retention_days=90)
+
+        self.assertEqual(get_job_stats()['total_jobs'], 1)
+        self.assertEqual(get_job_stats()['total_jobs'], Job.objects.count())
+
+    def test_removal_never_goes_negative(self):
+        job = make_job(publication_date=timezone.now() - timedelta(days=400))
+        # The rollup row predates the job, e.g. after a partial reconcile
+        JobHourlyRollup.objects.create(
+            hour=job.created_at.replace(minute=0, second=0, microsecond=0),
+            industry=job.industry,
+            count=0
+        )
+
+        prune_jobs(retention_days=90)
+
+        self.assertEqual(JobHourlyRollup.objects.get().count, 0)
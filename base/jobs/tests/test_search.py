@@ -0,0 +1,94 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, override_settings
+
+from jobs.query_cache import QueryCache, canonical_query, get_query_cache
+from jobs.search import SearchIndex
+from jobs.services import JobFetcher
+
+from .utils import LOCMEM_CACHES, JobsTestCase
+
+
+def feed_job(n, **fields):
+    job = {
+        'title': f'Data Analyst {n}',
+        'position': 'Analyst',
+        'tech_skills': ['python', 'sql'],
+        'industry': 'NGO / Non-Profit Associations',
+        'location': 'Nairobi',
+        'job_link': f'https://example.com/jobs/{n}',
+    }
+    job.update(fields)
+    return job
+
+
+def build_index(jobs):
+    index = SearchIndex()
+    for job in jobs:
+        index.add_job(job)
+    return index
+
+
+class SearchIndexTests(SimpleTestCase):
+    def test_same_feed_gives_the_same_uid(self):
+        jobs = [feed_job(n) for n in range(3)]
+
+        self.assertEqual(build_index(jobs).uid, build_index(jobs).uid)
+
+    def test_uid_changes_with_the_indexed_jobs(self):
+        index = build_index([feed_job(n) for n in range(3)])
+        before = index.uid
+
+        index.add_job(feed_job(3))
+
+        self.assertNotEqual(index.uid, before)
+        self.assertNotEqual(build_index([feed_job(0, location='Mombasa')]).uid,
+                            build_index([feed_job(0)]).uid)
+
+    def test_search_ids_intersects_criteria(self):
+        index = build_index([
+            feed_job(0),
+            feed_job(1, location='Mombasa'),
+            feed_job(2, tech_skills=['excel']),
+        ])
+
+        self.assertEqual(index.search_ids(skills=['pyth'], locations=['nairobi']), [0])
+        self.assertEqual(index.search_ids(), [0, 1, 2])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class QueryCacheTests(SimpleTestCase):
+    def test_canonical_query_ignores_order_case_and_empty_criteria(self):
+        self.assertEqual(
+            canonical_query({'skills': ['SQL', 'python'], 'locations': []}),
+            canonical_query({'skills': ['python', 'sql', 'sql']})
+        )
+
+    def test_processes_with_the_same_index_share_entries(self):
+        jobs = [feed_job(n) for n in range(3)]
+        first, second = build_index(jobs), build_index(jobs)
+        criteria = {'skills': ['python']}
+
+        QueryCache().get_or_search(first.uid, first.generation, criteria,
+                                   lambda: first.search_ids(**criteria))
+        search = mock.Mock(return_value=[])
+        # A fresh QueryCache has an empty local tier, like another process
+        ids = QueryCache().get_or_search(second.uid, second.generation, criteria, search)
+
+        self.assertEqual(ids, [0, 1, 2])
+        search.assert_not_called()
+
+
+class SearchJobsTests(JobsTestCase):
+    def test_queries_sharing_an_entry_search_the_same_values(self):
+        get_query_cache().clear()
+        self.addCleanup(get_query_cache().clear)
+        fetcher = JobFetcher(url='https://example.com/feed')
+        fetcher.search_index = build_index([feed_job(n) for n in range(2)])
+
+        padded = async_to_sync(fetcher.search_jobs)({'skills': [' Python ']})
+        plain = async_to_sync(fetcher.search_jobs)({'skills': ['python']})
+
+        self.assertEqual(len(padded), 2)
+        self.assertEqual(plain, padded)
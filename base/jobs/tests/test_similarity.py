@@ -0,0 +1,123 @@
+import tempfile
+
+import numpy as np
+from django.test import override_settings
+from django.utils import timezone
+
+from jobs.models import Job, JobNeighbours, Skill
+from jobs.similarity import SimilarityModel, _rows, rebuild_similarity, update_similarity
+
+from .utils import JobsTestCase, make_job
+
+DATA = 'Build data pipelines in python and sql for reporting dashboards'
+FIELD = 'Drive a truck between regional warehouses and load deliveries'
+
+
+class SimilarityTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(SIMILARITY_DIR=directory.name, SIMILARITY_TOP_K=3,
+                                      SIMILARITY_MIN_SCORE=0.05)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.python = Skill.objects.create(name='python', kind=Skill.TECH)
+
+    def job(self, title, text, skill_ids=()):
+        return make_job(title=title, description_text=text, skill_ids=list(skill_ids))
+
+    def neighbours(self, job):
+        return JobNeighbours.objects.get(job=job)
+
+    def test_fit_excludes_each_job_from_its_own_neighbours(self):
+        jobs = [self.job('Data Engineer', DATA, [self.python.id]) for _ in range(3)]
+        model = SimilarityModel.fit(_rows())
+
+        results = model.neighbours(model.matrix, exclude=np.arange(len(model.ids)))
+
+        for job, (positions, scores) in zip(jobs, results):
+            ids = model.ids[positions].tolist()
+            self.assertNotIn(job.id, ids)
+            self.assertEqual(sorted(ids), sorted(other.id for other in jobs if other != job))
+            self.assertEqual(list(scores), sorted(scores, reverse=True))
+
+    def test_rebuild_ranks_similar_jobs_first(self):
+        analyst = self.job('Data Analyst', DATA, [self.python.id])
+        engineer = self.job('Data Engineer', DATA + ' with airflow', [self.python.id])
+        self.job('Truck Driver', FIELD)
+        self.job('Delivery Driver', FIELD)
+
+        self.assertEqual(rebuild_similarity(), 4)
+
+        self.assertEqual(self.neighbours(analyst).neighbour_ids[0], engineer.id)
+
+    def test_rebuild_drops_archived_and_duplicate_jobs(self):
+        kept = self.job('Data Analyst', DATA)
+        gone = self.job('Data Engineer', DATA)
+        duplicate = self.job('Data Scientist', DATA)
+        rebuild_similarity()
+        self.assertIn(gone.id, self.neighbours(kept).neighbour_ids)
+
+        Job.objects.filter(pk=duplicate.pk).update(canonical=kept)
+        Job.objects.filter(pk=gone.pk).delete()
+        self.job('Data Engineer', DATA)
+        rebuild_similarity()
+
+        self.assertNotIn(gone.id, self.neighbours(kept).neighbour_ids)
+        self.assertNotIn(duplicate.id, self.neighbours(kept).neighbour_ids)
+        self.assertFalse(JobNeighbours.objects.filter(job_id=duplicate.id).exists())
+
+    def test_update_merges_new_jobs_into_existing_lists(self):
+        existing = [self.job(f'Data Analyst {n}', DATA) for n in range(2)]
+        self.job('Truck Driver', FIELD)
+        self.job('Delivery Driver', FIELD)
+        rebuild_similarity()
+        rebuilt_at = timezone.now()
+
+        new = self.job('Data Analyst', DATA)
+        self.assertEqual(update_similarity([new.id]), 1)
+
+        own = self.neighbours(new)
+        self.assertNotIn(new.id, own.neighbour_ids)
+        self.assertEqual(sorted(own.neighbour_ids[:2]), sorted(job.id for job in existing))
+        for job in existing:
+            neighbours = self.neighbours(job)
+            self.assertIn(new.id, neighbours.neighbour_ids)
+            self.assertEqual(neighbours.scores, sorted(neighbours.scores, reverse=True))
+            self.assertLessEqual(len(neighbours.neighbour_ids), 3)
+            self.assertGreater(neighbours.computed_at, rebuilt_at)
+
+    def test_update_keeps_the_best_k_in_score_order(self):
+        analyst = self.job('Data Analyst', DATA)
+        self.job('Data Engineer', DATA)  # So the data terms make the vocabulary
+        others = [self.job('Truck Driver', FIELD) for _ in range(3)]
+        rebuild_similarity()
+        JobNeighbours.objects.filter(job=analyst).update(
+            neighbour_ids=[job.id for job in others], scores=[0.3, 0.2, 0.1]
+        )
+
+        new = self.job('Data Analyst', DATA)
+        update_similarity([new.id])
+
+        neighbours = self.neighbours(analyst)
+        self.assertEqual(neighbours.neighbour_ids, [new.id, others[0].id, others[1].id])
+        self.assertEqual(neighbours.scores[1:], [0.3, 0.2])
+        self.assertGreater(neighbours.scores[0], 0.3)
+
+    def test_update_without_a_saved_model_rebuilds(self):
+        first, second = self.job('Data Analyst', DATA), self.job('Data Engineer', DATA)
+
+        self.assertEqual(update_similarity([first.id]), 2)
+        self.assertEqual(self.neighbours(second).neighbour_ids, [first.id])
+
+    def test_similar_endpoint(self):
+        analyst = self.job('Data Analyst', DATA)
+        engineer = self.job('Data Engineer', DATA)
+        rebuild_similarity()
+
+        response = self.client.get(f'/api/jobs/{analyst.id}/similar/')
+
+        results = response.json()['results']
+        self.assertEqual([job['id'] for job in results], [engineer.id])
+        self.assertGreater(results[0]['score'], 0)
@@ -0,0 +1,49 @@
+from jobs.models import Skill
+from jobs.skills import get_skill_dictionary, sync_vocabulary
+
+from .utils import JobsTestCase, make_job
+
+
+class SkillDictionaryTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.python = Skill.objects.create(name='python', kind=Skill.TECH, aliases=['py', 'Python3'])
+        self.teamwork = Skill.objects.create(name='teamwork', kind=Skill.SOFT)
+
+    def test_maps_names_and_aliases_to_ids(self):
+        dictionary = get_skill_dictionary()
+
+        self.assertEqual(dictionary.id(' Python '), self.python.id)
+        self.assertEqual(dictionary.id('python3'), self.python.id)
+        self.assertEqual(dictionary.ids(['py', 'teamwork', 'cobol']), sorted([self.python.id, self.teamwork.id]))
+        self.assertEqual(dictionary.names([self.teamwork.id, self.python.id]), ['teamwork', 'python'])
+        self.assertEqual(dictionary.names([self.teamwork.id, self.python.id], kind=Skill.TECH), ['python'])
+
+    def test_skill_changes_reload_the_dictionary(self):
+        version = get_skill_dictionary().version
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Skill.objects.create(name='rust', kind=Skill.TECH)
+            # Not before the commit, or the old rows could be cached as new
+            self.assertEqual(get_skill_dictionary().version, version)
+        for callback in callbacks:
+            callback()
+
+        dictionary = get_skill_dictionary()
+        self.assertGreater(dictionary.version, version)
+        self.assertIsNotNone(dictionary.id('rust'))
+
+    def test_job_skill_properties_split_by_kind(self):
+        job = make_job(skill_ids=[self.python.id, self.teamwork.id])
+
+        self.assertEqual(sorted(job.skills), ['python', 'teamwork'])
+        self.assertEqual(job.tech_skills, ['python'])
+        self.assertEqual(job.soft_skills, ['teamwork'])
+
+    def test_sync_vocabulary_adds_configured_skills(self):
+        with self.settings(TECH_SKILLS=['Python', 'Go'], SOFT_SKILLS=['Teamwork', 'Empathy']):
+            dictionary = sync_vocabulary()
+
+        self.assertEqual(Skill.objects.filter(name__in=['go', 'empathy']).count(), 2)
+        self.assertEqual(dictionary.id('python'), self.python.id)
+        self.assertEqual(Skill.objects.get(name='go').kind, Skill.TECH)
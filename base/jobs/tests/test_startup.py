@@ -0,0 +1,84 @@
+from io import StringIO
+from unittest import mock
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from jobs.benchmarks.startup import deferred_imports, import_chain, parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _frozen_importlib_external
+import time:        50 |         50 |       aiohttp.helpers
+import time:       200 |        250 |     aiohttp
+import time:        30 |        280 |   jobs.services
+import time:        40 |        320 | jobs.tasks
+import time:        10 |         10 | json
+"""
+
+
+class ImportTimeTests(SimpleTestCase):
+    def test_parses_records_and_their_importers(self):
+        records = parse_importtime(IMPORTTIME)
+
+        self.assertEqual([r.module for r in records], [
+            '_frozen_importlib_external', 'aiohttp.helpers', 'aiohttp',
+            'jobs.services', 'jobs.tasks', 'json',
+        ])
+        self.assertEqual([r.depth for r in records], [1, 3, 2, 1, 0, 0])
+        self.assertEqual(import_chain(records, 1), ['aiohttp.helpers', 'aiohttp', 'jobs.services', 'jobs.tasks'])
+        self.assertIsNone(records[5].importer)
+
+    def test_reports_the_outermost_import_of_each_deferred_package(self):
+        found = deferred_imports(parse_importtime(IMPORTTIME), ['aiohttp', 'lxml'])
+
+        self.assertEqual(found, {'aiohttp': ['aiohttp', 'jobs.services', 'jobs.tasks']})
+
+    def test_web_startup_leaves_heavy_modules_unimported(self):
+        code = (
+            'import sys, django; django.setup(); '
+            'from base.wsgi import application; '
+            'from django.urls import get_resolver; get_resolver().url_patterns; '
+            'print(",".join(m for m in ("aiohttp", "lxml", "numpy", "scipy") if m in sys.modules))'
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', code], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'base.settings'},
+        ).stdout
+        self.assertEqual(output.strip(), '')
+
+
+def fake_run(target, repeat, top):
+    return {
+        'target': target, 'repeat': repeat, 'median_seconds': 2.0 if target == 'web' else 0.1,
+        'min_seconds': 0.1, 'max_seconds': 2.0, 'import_seconds': 0.05, 'modules': 10,
+        'slowest_cumulative': [], 'slowest_self': [],
+        'deferred_imported': {'lxml': ['lxml', 'jobs.text']} if target == 'worker' else {},
+    }
+
+
+@override_settings(STARTUP_BUDGETS={'manage': 1.0, 'web': 1.0, 'worker': 1.0})
+class BenchmarkStartupCommandTests(SimpleTestCase):
+    def run_command(self, *args):
+        stdout = StringIO()
+        with mock.patch('jobs.management.commands.benchmark_startup.measure_startup', side_effect=fake_run), \
+                mock.patch('jobs.management.commands.benchmark_startup.save_results', return_value='out.json'):
+            call_command('benchmark_startup', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_reports_without_failing(self):
+        output = self.run_command()
+
+        self.assertIn('web took 2.000s, over its 1.000s budget', output)
+        self.assertIn('worker imports lxml at startup: lxml <- jobs.text', output)
+
+    def test_check_fails_on_regressions(self):
+        with self.assertRaisesMessage(CommandError, 'Startup regressions'):
+            self.run_command('--check')
+
+    def test_check_passes_within_budget(self):
+        self.run_command('--check', '--targets', 'manage')
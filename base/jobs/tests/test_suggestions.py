@@ -0,0 +1,63 @@
+from django.test import SimpleTestCase
+
+from jobs.models import Skill
+from jobs.search import SuggestionTrie
+from jobs.suggestions import publish_suggestions, suggest
+
+from .utils import JobsTestCase, make_job
+
+
+class SuggestionTrieTests(SimpleTestCase):
+    def trie(self, k=10):
+        trie = SuggestionTrie(k)
+        trie.add_term('Data Analyst', 5)
+        trie.add_term('Data Engineer', 8)
+        trie.add_term('Senior Data Scientist', 2)
+        trie.add_term('Driver', 1)
+        return trie.finalize()
+
+    def test_completions_are_ranked_by_weight(self):
+        self.assertEqual(
+            [s['value'] for s in self.trie().suggest('da')],
+            ['Data Engineer', 'Data Analyst', 'Senior Data Scientist']
+        )
+
+    def test_later_words_match_too(self):
+        self.assertEqual([s['value'] for s in self.trie().suggest('scien')], ['Senior Data Scientist'])
+        self.assertEqual([s['value'] for s in self.trie().suggest('data  eng')], ['Data Engineer'])
+
+    def test_top_k_is_kept_per_node(self):
+        self.assertEqual(len(self.trie(k=2).suggest('d', limit=10)), 2)
+        self.assertEqual(self.trie().suggest('zzz'), [])
+
+
+class SuggestEndpointTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        python = Skill.objects.create(name='python', kind=Skill.TECH)
+        canonical = make_job(position='Data Analyst', skill_ids=[python.id])
+        make_job(position='Data Analyst', skill_ids=[python.id])
+        make_job(position='Data Engineer')
+        make_job(position='Data Engineer', canonical=canonical)
+
+    def test_titles_and_skills_weighted_by_canonical_jobs(self):
+        response = self.client.get('/api/jobs/suggest/', {'q': 'Da'})
+
+        self.assertEqual(response.json()['results'], [
+            {'value': 'Data Analyst', 'count': 2, 'type': 'title'},
+            {'value': 'Data Engineer', 'count': 1, 'type': 'title'},
+        ])
+        self.assertIn('max-age', response['Cache-Control'])
+
+    def test_type_and_blank_query(self):
+        skill = self.client.get('/api/jobs/suggest/', {'q': 'py', 'type': 'skill'}).json()
+        self.assertEqual(skill['results'], [{'value': 'python', 'count': 2, 'type': 'skill'}])
+        self.assertEqual(self.client.get('/api/jobs/suggest/', {'q': ' '}).json()['results'], [])
+
+    def test_new_generation_replaces_memoized_results(self):
+        self.assertEqual(len(suggest('data engineer')), 1)
+
+        make_job(position='Data Engineer')
+        publish_suggestions()
+
+        self.assertEqual(suggest('data engineer')[0]['count'], 2)
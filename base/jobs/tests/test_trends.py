@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+
+from jobs.models import Skill, SkillDemand
+
+from .utils import JobsTestCase
+
+INDUSTRY = 'NGO / Non-Profit Associations'
+
+
+@override_settings(SKILL_DEMAND_DAILY_DAYS=180, SKILL_TRENDS_MAX_DAYS=366)
+class SkillTrendsTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.python = Skill.objects.create(name='python', kind=Skill.TECH)
+        self.excel = Skill.objects.create(name='excel', kind=Skill.TECH)
+        self.today = timezone.localdate()
+
+    def demand(self, skill, days_ago, count, granularity=SkillDemand.DAY):
+        SkillDemand.objects.create(
+            period=self.today - timedelta(days=days_ago), granularity=granularity,
+            skill_id=skill.id, industry=INDUSTRY, count=count
+        )
+
+    def test_trends_are_zero_filled_per_day(self):
+        self.demand(self.python, 1, 3)
+
+        response = self.client.get('/api/jobs/trends/', {
+            'skills': 'python',
+            'start': (self.today - timedelta(days=2)).isoformat(),
+            'end': self.today.isoformat(),
+        })
+
+        points = response.json()['series'][0]['points']
+        self.assertEqual([point['count'] for point in points], [0, 3, 0])
+
+    def test_impossible_date_is_a_validation_error(self):
+        for url in ('/api/jobs/trends/', '/api/jobs/trends/movers/'):
+            response = self.client.get(url, {'skills': 'python', 'start': '2024-02-30'})
+            self.assertEqual(response.status_code, 400, url)
+            self.assertIn('start', response.json())
+
+    def test_movers_compare_the_two_windows(self):
+        self.demand(self.python, 2, 5)   # This week
+        self.demand(self.python, 10, 1)  # The week before
+        self.demand(self.excel, 10, 4)
+
+        response = self.client.get('/api/jobs/trends/movers/', {
+            'start': (self.today - timedelta(days=6)).isoformat(),
+            'end': self.today.isoformat(),
+        })
+
+        body = response.json()
+        self.assertEqual([(row['skill'], row['change']) for row in body['rising']], [('python', 4)])
+        self.assertEqual([(row['skill'], row['change']) for row in body['falling']], [('excel', -4)])
+
+    def test_movers_reject_windows_reaching_compacted_months(self):
+        response = self.client.get('/api/jobs/trends/movers/', {
+            'start': (self.today - timedelta(days=120)).isoformat(),
+            'end': self.today.isoformat(),
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('start', response.json())
@@ -0,0 +1,70 @@
+"""Fixtures shared by the jobs and monitor tests"""
+from datetime import timedelta
+from unittest import mock
+import itertools
+
+import fakeredis
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from base.redis_client import get_redis
+from jobs import artifacts, skills, suggestions
+from jobs.models import Job
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+
+_numbers = itertools.count(1)
+
+
+def make_job(age: timedelta = None, **fields) -> Job:
+    """
+    A saved Job with filler values for every required field. `age` backdates
+    created_at, which auto_now_add otherwise pins to now.
+    """
+    n = next(_numbers)
+    values = {
+        'title': f'Software Engineer {n}',
+        'industry': 'NGO / Non-Profit Associations',
+        'company': 'Acme',
+        'location': 'Nairobi',
+        'job_link': f'https://example.com/jobs/{n}',
+        'publication_date': timezone.now(),
+        'description': f'Posting number {n}',
+    }
+    values.update(fields)
+    job = Job.objects.create(**values)
+    if age is not None:
+        Job.objects.filter(pk=job.pk).update(created_at=timezone.now() - age)
+        job.refresh_from_db()
+    return job
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class JobsTestCase(TestCase):
+    """
+    TestCase with the cache in local memory and every get_redis() client on
+    one fakeredis server per test, so the suite needs Postgres only.
+    """
+
+    def setUp(self):
+        super().setUp()
+        server = fakeredis.FakeServer()
+        self.redis = fakeredis.FakeRedis(server=server)
+        patcher = mock.patch(
+            'redis.Redis.from_url',
+            side_effect=lambda *args, **kwargs: fakeredis.FakeRedis(server=server)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        get_redis.cache_clear()
+        self.addCleanup(get_redis.cache_clear)
+
+        cache.clear()
+        skills._dictionary = None
+        # Published artifacts are held per process; start each test without them
+        artifacts._loaded.clear()
+        artifacts._checked_at.clear()
+        suggestions._suggest.cache_clear()
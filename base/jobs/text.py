@@ -0,0 +1,76 @@
+"""
+Plain-text forms of feed descriptions, computed once at ingest.
+
+Descriptions arrive as HTML (often inside CDATA). Ingest stores the
+sanitized text, a short snippet and a word count next to the raw HTML, so
+list responses, alert emails and indexing never parse HTML per request.
+lxml is imported on the first description that needs parsing, not when
+workers load the task modules.
+"""
+from typing import Dict
+import re
+
+from django.conf import settings
+
+# Elements that end a line of text
+_BLOCK_TAGS = {
+    'p', 'div', 'br', 'li', 'ul', 'ol', 'tr', 'table', 'section', 'article',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'hr',
+}
+_DROP_TAGS = ('script', 'style', 'head', 'noscript')
+_SPACES = re.compile(r'[^\S\n]+')
+_BLANK_LINES = re.compile(r'\s*\n\s*')
+_WORDS = re.compile(r'\w+')
+
+
+def strip_cdata(value: str) -> str:
+    if value.startswith('<![CDATA[') and value.endswith(']]>'):
+        return value[9:-3].strip()
+    return value
+
+
+def html_to_text(markup: str) -> str:
+    """Visible text of an HTML fragment, one line per block element"""
+    markup = strip_cdata((markup or '').strip())
+    if not markup:
+        return ''
+    if '<' not in markup and '&' not in markup:
+        return _SPACES.sub(' ', markup).strip()
+
+    from lxml import etree, html
+
+    try:
+        root = html.fragment_fromstring(markup, create_parent='div')
+    except (etree.ParserError, ValueError):
+        return _SPACES.sub(' ', markup).strip()
+
+    etree.strip_elements(root, *_DROP_TAGS, etree.Comment, with_tail=False)
+    for element in root.iter():
+        if isinstance(element.tag, str) and element.tag.lower() in _BLOCK_TAGS:
+            element.tail = '\n' + (element.tail or '')
+
+    text = root.text_content()
+    text = _SPACES.sub(' ', text)
+    return _BLANK_LINES.sub('\n', text).strip()
+
+
+def make_snippet(text: str, length: int = None) -> str:
+    """First `length` characters of text, cut at a word boundary"""
+    length = length or settings.JOB_SNIPPET_LENGTH
+    flat = ' '.join(text.split())
+    if len(flat) <= length:
+        return flat
+    cut = flat[:length - 1]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,.;:-') + '…'
+
+
+def describe(description: str) -> Dict[str, object]:
+    """description_text, snippet and word_count for a raw description"""
+    text = html_to_text(description)
+    return {
+        'description_text': text,
+        'snippet': make_snippet(text),
+        'word_count': len(_WORDS.findall(text)),
+    }
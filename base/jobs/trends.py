@@ -0,0 +1,237 @@
+"""
+Skill demand over time, from per-period skill x industry counters.
+
+Counters are incremented from each ingest batch (record_skill_demand), so
+nothing rescans the Job table on the hot path; reconcile_skill_demand
+corrects the last few days, and compact_skill_demand folds days older than
+SKILL_DEMAND_DAILY_DAYS into monthly rows so long history stays small.
+Trend and mover queries read only the counters: their cost depends on the
+number of skills and periods asked for, not on the number of jobs.
+"""
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import Job, SkillDemand
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[date, str, int, str]
+
+INTERVALS = ('day', 'week', 'month')
+
+
+def _daily_cutoff() -> date:
+    return timezone.localdate() - timedelta(days=settings.SKILL_DEMAND_DAILY_DAYS)
+
+
+def _bucket(day: date, cutoff: date) -> Tuple[date, str]:
+    if day < cutoff:
+        return day.replace(day=1), SkillDemand.MONTH
+    return day, SkillDemand.DAY
+
+
+def increment(counts: Dict[Key, int], batch_size: int = 1000) -> None:
+    """Add counts to (period, granularity, skill_id, industry) counters"""
+    # Sorted so concurrent writers lock rows in the same order and never deadlock
+    rows = sorted((*key, count) for key, count in counts.items() if count)
+    table = SkillDemand._meta.db_table
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        values = ', '.join(['(%s, %s, %s, %s, %s)'] * len(batch))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (period, granularity, skill_id, industry, count) '
+                f'VALUES {values} '
+                f'ON CONFLICT (period, granularity, skill_id, industry) '
+                f'DO UPDATE SET count = {table}.count + EXCLUDED.count',
+                [value for row in batch for value in row]
+            )
+
+
+def record_skill_demand(jobs: Iterable[Job]) -> None:
+    """Count newly created canonical jobs by publication day, skill and industry"""
+    cutoff = _daily_cutoff()
+    counts = Counter()
+    for job in jobs:
+        if job.canonical_id is not None:
+            continue
+        period, granularity = _bucket(timezone.localdate(job.publication_date), cutoff)
+        for skill_id in set(job.skill_ids or ()):
+            counts[(period, granularity, skill_id, job.industry)] += 1
+    increment(counts)
+
+
+def aggregate_demand(model, where: str = 'TRUE', params: Iterable[Any] = ()) -> Dict[Key, int]:
+    """
+    Counts for canonical rows of Job or ArchivedJob matching a SQL
+    condition, grouped into the buckets record_skill_demand would use.
+    Grouping runs in Postgres, so only one row per day/skill/industry
+    comes back.
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT day, skill_id, industry, COUNT(*) FROM ('
+            f'  SELECT (publication_date AT TIME ZONE %s)::date AS day,'
+            f'         unnest(skill_ids) AS skill_id, industry'
+            f'  FROM {table}'
+            f'  WHERE canonical_id IS NULL AND ({where})'
+            f') demand GROUP BY day, skill_id, industry',
+            [settings.TIME_ZONE, *params]
+        )
+        rows = cursor.fetchall()
+
+    cutoff = _daily_cutoff()
+    counts = Counter()
+    for day, skill_id, industry, count in rows:
+        counts[(*_bucket(day, cutoff), skill_id, industry)] += count
+    return counts
+
+
+def reconcile_skill_demand(days: int = 2) -> int:
+    """
+    Rebuild the daily counters for the last `days` days from the Job table,
+    picking up skill changes on updated jobs and jobs linked as duplicates
+    after they were counted. Returns the number of counter rows written.
+    """
+    since = timezone.localdate() - timedelta(days=days)
+    with transaction.atomic():
+        SkillDemand.objects.filter(granularity=SkillDemand.DAY, period__gte=since).delete()
+        counts = aggregate_demand(
+            Job,
+            '(publication_date AT TIME ZONE %s)::date >= %s',
+            [settings.TIME_ZONE, since]
+        )
+        increment(counts)
+    logger.info(f"Reconciled {len(counts)} skill demand rows since {since}")
+    return len(counts)
+
+
+def compact_skill_demand() -> int:
+    """Fold daily counters older than SKILL_DEMAND_DAILY_DAYS into months"""
+    cutoff = _daily_cutoff()
+    old_days = SkillDemand.objects.filter(granularity=SkillDemand.DAY, period__lt=cutoff)
+
+    with transaction.atomic():
+        rows = (
+            old_days.annotate(month=TruncMonth('period'))
+            .values('month', 'skill_id', 'industry')
+            .annotate(total=Sum('count'))
+            .order_by()
+        )
+        counts = {
+            (row['month'], SkillDemand.MONTH, row['skill_id'], row['industry']): row['total']
+            for row in rows
+        }
+        increment(counts)
+        deleted, _ = old_days.delete()
+
+    logger.info(f"Compacted {deleted} daily skill demand rows into {len(counts)} monthly rows")
+    return deleted
+
+
+def _periods(start: date, end: date, interval: str) -> List[date]:
+    if interval == 'month':
+        period = start.replace(day=1)
+    elif interval == 'week':
+        period = start - timedelta(days=start.weekday())
+    else:
+        period = start
+
+    periods = []
+    while period <= end:
+        periods.append(period)
+        if interval == 'month':
+            period = (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            period += timedelta(days=7 if interval == 'week' else 1)
+    return periods
+
+
+def _bucketed(rows, interval: str):
+    if interval == 'month':
+        return rows.annotate(bucket=TruncMonth('period'))
+    if interval == 'week':
+        return rows.annotate(bucket=TruncWeek('period'))
+    return rows.annotate(bucket=F('period'))
+
+
+def _demand(start: date, end: date, industry: Optional[str]):
+    rows = SkillDemand.objects.filter(period__gte=start, period__lte=end)
+    if industry:
+        rows = rows.filter(industry__icontains=industry)
+    return rows
+
+
+def get_skill_trends(skill_ids: List[int], start: date, end: date,
+                     interval: str = 'day', industry: Optional[str] = None) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Job counts per period for each skill between start and end, zero-filled.
+    Compacted days count towards the first of their month, so ranges older
+    than SKILL_DEMAND_DAILY_DAYS are best read with interval='month'.
+    """
+    periods = _periods(start, end, interval)
+    rows = _bucketed(_demand(periods[0], end, industry).filter(skill_id__in=skill_ids), interval)
+
+    totals = {}
+    for row in rows.values('bucket', 'skill_id').annotate(total=Sum('count')).order_by():
+        totals[(row['skill_id'], row['bucket'])] = row['total']
+
+    return {
+        skill_id: [
+            {'period': period.isoformat(), 'count': totals.get((skill_id, period), 0)}
+            for period in periods
+        ]
+        for skill_id in skill_ids
+    }
+
+
+def _totals(start: date, end: date, industry: Optional[str]) -> Dict[int, int]:
+    rows = _demand(start, end, industry).values('skill_id').annotate(total=Sum('count')).order_by()
+    return {row['skill_id']: row['total'] for row in rows}
+
+
+def get_top_movers(start: date, end: date, limit: int = 10,
+                   industry: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Skills whose job count changed most between [start, end] and the
+    window of the same length just before it, by absolute change.
+
+    Raises ValueError if the earlier window reaches back past
+    SKILL_DEMAND_DAILY_DAYS: compacted months count towards their first
+    day only, so the two windows would not be comparable.
+    """
+    length = (end - start).days + 1
+    cutoff = _daily_cutoff()
+    if start - timedelta(days=length) < cutoff:
+        raise ValueError(
+            f"Movers need daily counts for both windows; with this range start "
+            f"must be on or after {cutoff + timedelta(days=length)}"
+        )
+    current = _totals(start, end, industry)
+    previous = _totals(start - timedelta(days=length), start - timedelta(days=1), industry)
+
+    changes = [
+        {
+            'skill_id': skill_id,
+            'count': current.get(skill_id, 0),
+            'previous_count': previous.get(skill_id, 0),
+            'change': current.get(skill_id, 0) - previous.get(skill_id, 0),
+            # Smoothed so skills new to the window do not divide by zero
+            'ratio': (current.get(skill_id, 0) + 1) / (previous.get(skill_id, 0) + 1),
+        }
+        for skill_id in current.keys() | previous.keys()
+    ]
+    changes.sort(key=lambda row: (row['change'], row['ratio']))
+    return {
+        'rising': [row for row in reversed(changes[-limit:]) if row['change'] > 0],
+        'falling': [row for row in changes[:limit] if row['change'] < 0],
+    }
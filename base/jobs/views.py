@@ -1,9 +1,27 @@
 from django.shortcuts import render
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from django_filters import rest_framework as django_filters
-from .models import Job
-from .serializers import JobSerializer
+from django.db.models import Q
+from .models import Job, JobNeighbours
+from .serializers import JobListSerializer, JobSerializer
+from .skills import aget_skill_dictionary, get_skill_dictionary
+from .facets import get_facet_index
+from .suggestions import KINDS, suggest
+from .export import FORMATS, aexport_lines, export_lines
+from .job_cache import get_serialized_jobs
+from .index_file import get_index_reader
+from .trends import INTERVALS, get_skill_trends, get_top_movers
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils import timezone
+from datetime import timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,10 +38,11 @@ class JobFilter(django_filters.FilterSet):
 
     def filter_skills(self, queryset, name, value):
         skills = [s.strip() for s in value.split(',')]
-        return queryset.filter(skills__overlap=skills)
+        return queryset.filter(skill_ids__overlap=get_skill_dictionary().ids(skills))
 
 class JobViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Job.objects.all()
+    # Cross-posted copies are hidden behind their canonical job
+    queryset = Job.objects.filter(canonical__isnull=True)
     serializer_class = JobSerializer
     permission_classes = [AllowAny]
     filter_backends = [django_filters.DjangoFilterBackend, filters.OrderingFilter]
@@ -31,6 +50,358 @@ class JobViewSet(viewsets.ReadOnlyModelViewSet):
     ordering_fields = ['publication_date']
     ordering = ['-publication_date']
 
+    def get_serializer_class(self):
+        if self.action in ('list', 'search', 'similar'):
+            return JobListSerializer
+        return JobSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.get_serializer_class() is JobListSerializer:
+            # The list form shows the snippet; leave the full text unread
+            queryset = queryset.defer('description', 'description_text')
+        return queryset
+
     def list(self, request, *args, **kwargs):
-        logger.info(f"Total jobs in database: {Job.objects.count()}")
+        if 'ids' in request.query_params:
+            return self._multi_get(request.query_params['ids'])
         return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            pk = int(kwargs[self.lookup_field])
+        except ValueError:
+            raise Http404("Job not found")
+        results = get_serialized_jobs([pk], self.get_queryset(), self.get_serializer_class())
+        if not results:
+            raise Http404("Job not found")
+        return Response(results[0])
+
+    def _multi_get(self, value):
+        """
+        ?ids=3,1,2 returns those jobs in the order given, unpaginated, from
+        one query for whichever are not already cached
+        """
+        try:
+            ids = [int(part) for part in value.split(',') if part.strip()]
+        except ValueError:
+            raise ValidationError({'ids': 'Must be a comma-separated list of job ids'})
+        if len(ids) > settings.JOB_MULTI_GET_MAX:
+            raise ValidationError({'ids': f'At most {settings.JOB_MULTI_GET_MAX} ids per request'})
+
+        results = get_serialized_jobs(ids, self.get_queryset(), self.get_serializer_class())
+        found = {job['id'] for job in results}
+        return Response({
+            'results': results,
+            'missing': [job_id for job_id in dict.fromkeys(ids) if job_id not in found],
+        })
+
+    @action(detail=True)
+    def similar(self, request, pk=None):
+        """
+        Jobs most like this one, best first, with their cosine similarity,
+        from the neighbour lists precomputed by jobs/similarity.py
+        """
+        try:
+            job_id = int(pk)
+        except ValueError:
+            raise Http404("Job not found")
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), settings.SIMILARITY_TOP_K)
+        except ValueError:
+            limit = 10
+
+        neighbours = (
+            JobNeighbours.objects.filter(job_id=job_id, job__canonical__isnull=True)
+            .values_list('neighbour_ids', 'scores')
+            .first()
+        )
+        if neighbours is None:
+            if not self.get_queryset().filter(id=job_id).exists():
+                raise Http404("Job not found")
+            # Not yet in the model; the next refresh or rebuild adds it
+            neighbours = ([], [])
+
+        scores = dict(zip(*neighbours))
+        # Archived or merged neighbours drop out here until the next rebuild
+        results = get_serialized_jobs(list(scores), self.get_queryset(), self.get_serializer_class())
+        return Response({
+            'job_id': job_id,
+            'results': [{**job, 'score': scores[job['id']]} for job in results[:limit]],
+        })
+
+    @action(detail=False)
+    def facets(self, request):
+        """
+        Counts per industry, location and skill for the jobs matching the
+        same industry/skills filters as the list, from the facet index
+        """
+        generation, index = get_facet_index()
+        if index is None:
+            return Response({'detail': 'Facet index is not built yet'}, status=503)
+
+        skill_ids = None
+        if skills := request.query_params.get('skills'):
+            skill_ids = get_skill_dictionary().ids(s.strip() for s in skills.split(','))
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), 500)
+        except ValueError:
+            limit = 50
+
+        mask = index.filter(
+            industry=request.query_params.get('industry'),
+            skill_ids=skill_ids
+        )
+        return Response({
+            'generation': generation,
+            **index.counts(mask, limit=limit),
+        })
+
+    @action(detail=False)
+    def suggest(self, request):
+        """Typeahead completions for ?q= over job titles and skills"""
+        prefix = request.query_params.get('q', '')
+        kind = request.query_params.get('type', 'all')
+        if kind not in KINDS:
+            kind = 'all'
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), settings.SUGGEST_TOP_K)
+        except ValueError:
+            limit = 10
+
+        results = suggest(prefix, kind=kind, limit=limit) if prefix.strip() else []
+        response = Response({'query': prefix, 'results': results})
+        # Let the browser (and any proxy) reuse answers for repeated keystrokes
+        patch_cache_control(response, public=True, max_age=settings.SUGGEST_CACHE_SECONDS)
+        return response
+
+    @action(detail=False)
+    def search(self, request):
+        """
+        Search the shared index: every word of ?q= must start a title or
+        position word; ?skills=, ?industry= and ?location= narrow further.
+        Results are newest first, paged with ?page= and ?page_size=.
+        """
+        reader = get_index_reader()
+        if reader is None:
+            return Response({'detail': 'Search index is not built yet'}, status=503)
+
+        skill_ids = ()
+        if skills := request.query_params.get('skills'):
+            skill_ids = get_skill_dictionary().ids(s.strip() for s in skills.split(','))
+            if not skill_ids:
+                return Response({'generation': reader.generation, 'count': 0, 'results': []})
+
+        page, page_size = _async_page_params(request)
+        ordinals = reader.search(
+            query=request.query_params.get('q', ''),
+            skill_ids=skill_ids,
+            industry=request.query_params.get('industry', ''),
+            location=request.query_params.get('location', ''),
+        )
+        offset = (page - 1) * page_size
+        ids = reader.job_ids(ordinals[offset:offset + page_size])
+        return Response({
+            'generation': reader.generation,
+            'count': len(ordinals),
+            'results': get_serialized_jobs(ids, self.get_queryset(), self.get_serializer_class()),
+        })
+
+    def _trend_range(self, request):
+        end = timezone.localdate()
+        start = end - timedelta(days=29)
+        for name in ('start', 'end'):
+            if value := request.query_params.get(name):
+                try:
+                    parsed = parse_date(value)
+                except ValueError:  # Well formed but not a date, e.g. 2024-02-30
+                    parsed = None
+                if parsed is None:
+                    raise ValidationError({name: 'Must be a YYYY-MM-DD date'})
+                if name == 'start':
+                    start = parsed
+                else:
+                    end = parsed
+        if start > end:
+            raise ValidationError({'start': 'Must not be after end'})
+        if (end - start).days > settings.SKILL_TRENDS_MAX_DAYS:
+            raise ValidationError({'start': f'Range is limited to {settings.SKILL_TRENDS_MAX_DAYS} days'})
+        return start, end
+
+    @action(detail=False)
+    def trends(self, request):
+        """
+        Jobs per ?interval= (day, week or month) for each of ?skills=
+        between ?start= and ?end= (default: the last 30 days), optionally
+        within ?industry=
+        """
+        start, end = self._trend_range(request)
+        interval = request.query_params.get('interval', 'day')
+        if interval not in INTERVALS:
+            raise ValidationError({'interval': f"Must be one of {', '.join(INTERVALS)}"})
+
+        dictionary = get_skill_dictionary()
+        names = [s.strip() for s in request.query_params.get('skills', '').split(',') if s.strip()]
+        if not names:
+            raise ValidationError({'skills': 'Give at least one skill'})
+        skill_ids = dictionary.ids(names)
+
+        series = get_skill_trends(
+            skill_ids, start, end, interval=interval,
+            industry=request.query_params.get('industry')
+        )
+        return Response({
+            'start': start,
+            'end': end,
+            'interval': interval,
+            'series': [
+                {'skill': dictionary.names_by_id[skill_id], 'points': points}
+                for skill_id, points in series.items()
+            ],
+        })
+
+    @action(detail=False, url_path='trends/movers')
+    def movers(self, request):
+        """
+        Skills whose job count rose or fell most between ?start= and ?end=
+        (default: the last 30 days) and the same length of time before.
+        Both windows must lie within the SKILL_DEMAND_DAILY_DAYS of daily
+        counts.
+        """
+        start, end = self._trend_range(request)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+        except ValueError:
+            limit = 10
+
+        names = get_skill_dictionary().names_by_id
+        try:
+            movers = get_top_movers(start, end, limit=limit, industry=request.query_params.get('industry'))
+        except ValueError as e:
+            raise ValidationError({'start': str(e)})
+        return Response({
+            'start': start,
+            'end': end,
+            **{
+                direction: [
+                    {'skill': names[row['skill_id']], **row}
+                    for row in rows
+                    if row['skill_id'] in names
+                ]
+                for direction, rows in movers.items()
+            },
+        })
+
+    @action(detail=False)
+    def export(self, request):
+        """
+        Stream every job matching the list filters as NDJSON (default) or
+        CSV with ?output=csv. ?since=<ISO datetime with UTC offset> limits
+        the export to jobs updated since then, for incremental sync.
+        """
+        fmt = request.query_params.get('output', 'ndjson')
+        if fmt not in FORMATS:
+            raise ValidationError({'output': f"Must be one of {', '.join(FORMATS)}"})
+
+        since = None
+        if value := request.query_params.get('since'):
+            since = parse_datetime(value)
+            if since is None:
+                raise ValidationError({'since': 'Must be an ISO 8601 datetime'})
+            if timezone.is_naive(since):
+                raise ValidationError({'since': 'Must include a UTC offset, e.g. 2024-01-31T00:00:00Z'})
+
+        queryset = JobFilter(request.query_params, queryset=self.get_queryset()).qs
+        # A sync iterator under ASGI would be read into memory in full
+        lines = aexport_lines if isinstance(request._request, ASGIRequest) else export_lines
+        response = StreamingHttpResponse(
+            lines(queryset, fmt, since=since),
+            content_type=FORMATS[fmt]
+        )
+        response['Content-Disposition'] = f'attachment; filename="jobs.{fmt}"'
+        return response
+
+
+# Async endpoints
+#
+# Served natively when the project runs under an ASGI server
+# (uvicorn base.asgi:application); the DB round trips do not hold a thread.
+
+ASYNC_PAGE_SIZE = 10
+ASYNC_MAX_PAGE_SIZE = 100
+
+
+def _async_page_params(request):
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+        page_size = min(
+            max(int(request.GET.get('page_size', ASYNC_PAGE_SIZE)), 1),
+            ASYNC_MAX_PAGE_SIZE
+        )
+    except ValueError:
+        page, page_size = 1, ASYNC_PAGE_SIZE
+    return page, page_size
+
+
+async def _async_paginated_response(request, queryset, serializer_class=JobListSerializer):
+    page, page_size = _async_page_params(request)
+    offset = (page - 1) * page_size
+
+    count = await queryset.acount()
+    jobs = [job async for job in queryset[offset:offset + page_size].aiterator()]
+
+    def page_url(number):
+        if number < 1 or (number - 1) * page_size >= count:
+            return None
+        params = request.GET.copy()
+        params['page'] = number
+        return request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+
+    return JsonResponse({
+        'count': count,
+        'next': page_url(page + 1),
+        'previous': page_url(page - 1),
+        'results': serializer_class(jobs, many=True).data,
+    })
+
+
+async def async_job_list(request):
+    """Async counterpart of JobViewSet.list, accepting the same filters"""
+    await aget_skill_dictionary()
+    queryset = JobFilter(request.GET, queryset=Job.objects.filter(canonical__isnull=True)).qs
+    queryset = queryset.defer('description', 'description_text')
+    return await _async_paginated_response(
+        request,
+        queryset.order_by('-publication_date')
+    )
+
+
+async def async_job_detail(request, pk):
+    await aget_skill_dictionary()
+    try:
+        job = await Job.objects.aget(pk=pk, canonical__isnull=True)
+    except Job.DoesNotExist:
+        raise Http404("Job not found")
+    return JsonResponse(JobSerializer(job).data)
+
+
+async def async_job_search(request):
+    """Search titles, companies and positions for ?q=, combined with JobFilter"""
+    await aget_skill_dictionary()
+    query = request.GET.get('q', '').strip()
+    queryset = JobFilter(request.GET, queryset=Job.objects.filter(canonical__isnull=True)).qs
+    queryset = queryset.defer('description', 'description_text')
+
+    if query:
+        queryset = queryset.filter(
+            Q(title__icontains=query)
+            | Q(position__icontains=query)
+            | Q(company__icontains=query)
+        )
+
+    return await _async_paginated_response(
+        request,
+        queryset.order_by('-publication_date')
+    )
@@ -0,0 +1,211 @@
+"""
+Lightweight counters and histograms shared by web and Celery processes.
+
+Values are accumulated in Redis hashes so every worker process adds to the
+same series, and rendered in the Prometheus text exposition format by the
+/monitor/metrics endpoint. Recording never raises: if Redis is unavailable
+the observation is dropped and logged at debug level.
+"""
+from collections import defaultdict
+from contextlib import ContextDecorator
+from typing import Dict, Iterable, List, Tuple
+import logging
+import time
+
+from django.conf import settings
+from base.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'metrics'
+NAMES_KEY = f'{KEY_PREFIX}:names'
+
+# Upper bounds in seconds; an implicit +Inf bucket is always added
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+
+def _label_string(labels: Dict[str, str]) -> str:
+    return ','.join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+
+
+def _client():
+    return get_redis(settings.METRICS_REDIS_URL)
+
+
+def _queue_counter(pipe, name: str, value: float, labels: Dict[str, str]) -> None:
+    pipe.sadd(NAMES_KEY, f'counter:{name}')
+    pipe.hincrbyfloat(f'{KEY_PREFIX}:counter:{name}', _label_string(labels), value)
+
+
+def _queue_observation(pipe, name: str, value: float, labels: Dict[str, str]) -> None:
+    label_string = _label_string(labels)
+    bucket = next((str(b) for b in DEFAULT_BUCKETS if value <= b), '+Inf')
+    key = f'{KEY_PREFIX}:histogram:{name}'
+    pipe.sadd(NAMES_KEY, f'histogram:{name}')
+    pipe.hincrby(key, f'{label_string}|bucket|{bucket}', 1)
+    pipe.hincrby(key, f'{label_string}|count', 1)
+    pipe.hincrbyfloat(key, f'{label_string}|sum', value)
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    """Increment a counter"""
+    try:
+        pipe = _client().pipeline(transaction=False)
+        _queue_counter(pipe, name, value, labels)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"Dropped counter {name}: {str(e)}")
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """Record one observation (usually seconds) in a histogram"""
+    try:
+        pipe = _client().pipeline(transaction=False)
+        _queue_observation(pipe, name, value, labels)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"Dropped observation {name}: {str(e)}")
+
+
+def record(counters: Iterable[Tuple[str, float, Dict[str, str]]] = (),
+           observations: Iterable[Tuple[str, float, Dict[str, str]]] = ()) -> None:
+    """
+    Several inc() and observe() calls in one Redis round trip. Each entry
+    is (name, value, labels).
+    """
+    try:
+        pipe = _client().pipeline(transaction=False)
+        for name, value, labels in counters:
+            _queue_counter(pipe, name, value, labels)
+        for name, value, labels in observations:
+            _queue_observation(pipe, name, value, labels)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"Dropped metrics batch: {str(e)}")
+
+
+class timer(ContextDecorator):
+    """
+    Time a block or function into a histogram:
+
+        with timer('ingest_stage_seconds', stage='download'):
+            ...
+
+        @timer('task_duration_seconds', task='send_job_alerts')
+        def send_job_alerts(): ...
+    """
+
+    def __init__(self, name: str, **labels):
+        self.name = name
+        self.labels = labels
+
+    def _recreate_cm(self):
+        # As a decorator one instance wraps every call; give each call its
+        # own, so concurrent calls (threads pool) keep separate start times
+        return type(self)(self.name, **self.labels)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self._started, **self.labels)
+        return False
+
+
+class Stopwatch:
+    """
+    Accumulate time per stage across a loop and record each stage once,
+    so per-item work does not cost a Redis round trip per item.
+    """
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+
+    def __call__(self, stage: str):
+        return _StopwatchLap(self, stage)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.totals[stage] += seconds
+
+    def total(self, stages: Iterable[str]) -> float:
+        return sum(self.totals[stage] for stage in stages)
+
+    def observe(self, name: str, **labels) -> None:
+        for stage, seconds in self.totals.items():
+            observe(name, seconds, stage=stage, **labels)
+
+
+class _StopwatchLap:
+    def __init__(self, stopwatch: Stopwatch, stage: str):
+        self.stopwatch = stopwatch
+        self.stage = stage
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.stopwatch.add(self.stage, time.perf_counter() - self._started)
+        return False
+
+
+def _format_value(value: float) -> str:
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _series(name: str, labels: str, value, extra: str = '') -> str:
+    all_labels = ','.join(part for part in (labels, extra) if part)
+    return f'{name}{{{all_labels}}} {_format_value(value)}' if all_labels else f'{name} {_format_value(value)}'
+
+
+def render_metrics() -> str:
+    """All recorded metrics in the Prometheus text exposition format"""
+    client = _client()
+    lines = []
+
+    for entry in sorted(n.decode() for n in client.smembers(NAMES_KEY)):
+        kind, name = entry.split(':', 1)
+        values = {
+            field.decode(): float(value)
+            for field, value in client.hgetall(f'{KEY_PREFIX}:{kind}:{name}').items()
+        }
+        lines.append(f'# TYPE {name} {kind}')
+
+        if kind == 'counter':
+            for labels, value in sorted(values.items()):
+                lines.append(_series(name, labels, value))
+            continue
+
+        label_sets = sorted({field.split('|', 1)[0] for field in values})
+        for labels in label_sets:
+            cumulative = 0
+            for bound in [str(b) for b in DEFAULT_BUCKETS] + ['+Inf']:
+                cumulative += values.get(f'{labels}|bucket|{bound}', 0)
+                lines.append(_series(f'{name}_bucket', labels, cumulative, f'le="{bound}"'))
+            lines.append(_series(f'{name}_sum', labels, values.get(f'{labels}|sum', 0)))
+            lines.append(_series(f'{name}_count', labels, values.get(f'{labels}|count', 0)))
+
+    return '\n'.join(lines) + '\n'
+
+
+def _parse_labels(labels: str) -> Dict[str, str]:
+    return dict(
+        (part.split('=', 1)[0], part.split('=', 1)[1].strip('"'))
+        for part in labels.split(',') if part
+    )
+
+
+def counter_values(name: str) -> List[Tuple[Dict[str, str], float]]:
+    """(labels, value) for every series of a counter"""
+    raw = _client().hgetall(f'{KEY_PREFIX}:counter:{name}')
+    return [(_parse_labels(labels.decode()), float(value)) for labels, value in raw.items()]
+
+
+def reset_metrics() -> None:
+    """Delete every recorded series"""
+    client = _client()
+    names = [n.decode() for n in client.smembers(NAMES_KEY)]
+    client.delete(NAMES_KEY, *(f'{KEY_PREFIX}:{name}' for name in names))
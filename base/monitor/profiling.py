@@ -0,0 +1,191 @@
+"""
+Per-view request accounting and sampled profiling.
+
+RequestProfileMiddleware counts SQL queries and database time for every
+request and records them, with the total time, as counters labelled by
+view, so /monitor/profiles can show averages per endpoint. A fraction
+(PROFILE_SAMPLE_RATE) of requests also runs under cProfile; each sample is
+written to PROFILE_DIR as a pstats dump plus a JSON summary, and only the
+newest PROFILE_MAX_FILES are kept.
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+import cProfile
+import io
+import json
+import logging
+import pstats
+import random
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+
+from .metrics import record
+
+logger = logging.getLogger(__name__)
+
+
+class QueryTimer:
+    """connection.execute_wrapper that counts queries and their time"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def _view_name(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+class RequestProfileMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        queries = QueryTimer()
+        profiler = cProfile.Profile() if _sampled() else None
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            if profiler:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler:
+                    profiler.disable()
+        self._record(request, response, time.perf_counter() - started, queries, profiler)
+        return response
+
+    async def __acall__(self, request):
+        # Async ORM calls run in a worker thread with its own connection,
+        # so the wrapper has to be installed from that thread
+        queries = QueryTimer()
+        await sync_to_async(lambda: connection.execute_wrappers.append(queries))()
+        profiler = cProfile.Profile() if _sampled() else None
+        started = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if profiler:
+                profiler.disable()
+            await sync_to_async(lambda: connection.execute_wrappers.remove(queries))()
+        # Redis and the profile files are blocking I/O; keep them off the
+        # event loop, and off the thread the async ORM calls run in
+        await sync_to_async(self._record, thread_sensitive=False)(
+            request, response, time.perf_counter() - started, queries, profiler
+        )
+        return response
+
+    def _record(self, request, response, seconds: float, queries: QueryTimer,
+                profiler: Optional[cProfile.Profile]) -> None:
+        view = _view_name(request)
+        # One Redis round trip per request
+        record(
+            counters=[
+                ('http_requests_total', 1, {'view': view, 'status': response.status_code}),
+                ('http_request_seconds_total', seconds, {'view': view}),
+                ('http_queries_total', queries.count, {'view': view}),
+                ('http_db_seconds_total', queries.seconds, {'view': view}),
+            ],
+            observations=[('http_request_seconds', seconds, {'view': view})],
+        )
+
+        if profiler:
+            try:
+                save_profile(profiler, {
+                    'view': view,
+                    'method': request.method,
+                    'path': request.get_full_path(),
+                    'status': response.status_code,
+                    'total_ms': seconds * 1000,
+                    'db_ms': queries.seconds * 1000,
+                    'queries': queries.count,
+                })
+            except OSError as e:
+                logger.warning(f"Could not save profile: {str(e)}")
+
+
+def _sampled() -> bool:
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def _profile_dir() -> Path:
+    return Path(settings.PROFILE_DIR)
+
+
+def save_profile(profiler: cProfile.Profile, summary: Dict) -> str:
+    now = datetime.now(timezone.utc)
+    profile_id = f'{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}'
+    directory = _profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+
+    profiler.dump_stats(directory / f'{profile_id}.prof')
+    (directory / f'{profile_id}.json').write_text(json.dumps({
+        'id': profile_id,
+        'recorded_at': now.isoformat(),
+        **summary,
+    }))
+
+    # Keep only the newest samples
+    summaries = sorted(directory.glob('*.json'), reverse=True)
+    for stale in summaries[settings.PROFILE_MAX_FILES:]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix('.prof').unlink(missing_ok=True)
+    return profile_id
+
+
+def list_profiles() -> List[Dict]:
+    """Summaries of the stored samples, newest first"""
+    directory = _profile_dir()
+    if not directory.exists():
+        return []
+    profiles = []
+    for path in sorted(directory.glob('*.json'), reverse=True):
+        try:
+            profiles.append(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def load_profile(profile_id: str, sort: str = 'cumulative', limit: int = 60) -> Optional[Dict]:
+    """Summary and pstats report for one sample, or None if it is gone"""
+    # Ids are generated above; refuse anything that could leave the directory
+    if not profile_id.replace('-', '').isalnum():
+        return None
+    directory = _profile_dir()
+    summary_path = directory / f'{profile_id}.json'
+    stats_path = directory / f'{profile_id}.prof'
+    if not summary_path.exists() or not stats_path.exists():
+        return None
+
+    report = io.StringIO()
+    stats = pstats.Stats(str(stats_path), stream=report)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return {**json.loads(summary_path.read_text()), 'report': report.getvalue()}
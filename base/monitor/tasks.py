@@ -0,0 +1,8 @@
+from celery import shared_task
+from .workers import collect_worker_snapshot
+
+
+@shared_task
+def snapshot_workers():
+    snapshot = collect_worker_snapshot()
+    return f"Worker snapshot collected at {snapshot['collected_at']}"
@@ -0,0 +1,60 @@
+"""
+Query budget assertions for tests.
+
+    from monitor.testing import QueryBudgetMixin
+
+    class JobApiTests(QueryBudgetMixin, TestCase):
+        query_budgets = {
+            '/api/jobs/': 2,
+            '/api/jobs/?ids=1,2,3': 1,
+            '/api/jobs/facets/': 0,
+        }
+
+        def test_query_budgets(self):
+            self.assertQueryBudgets()
+
+A failure lists every query the request ran, so the regression (a stray
+count(), an N+1 in a serializer) is visible in the test output.
+"""
+from contextlib import contextmanager
+from typing import Dict
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = '', using: str = DEFAULT_DB_ALIAS):
+    """Fail if the block runs more than max_queries queries"""
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+
+    if len(context) > max_queries:
+        queries = '\n'.join(
+            f"{number}. {query['sql']}"
+            for number, query in enumerate(context.captured_queries, start=1)
+        )
+        raise QueryBudgetExceeded(
+            f"{label or 'Block'} ran {len(context)} queries, budget is {max_queries}:\n{queries}"
+        )
+
+
+class QueryBudgetMixin:
+    """TestCase mixin checking `query_budgets` ({url: max queries}) with self.client"""
+
+    query_budgets: Dict[str, int] = {}
+
+    def assertQueryBudget(self, url: str, max_queries: int, status: int = 200, **extra):
+        with query_budget(max_queries, label=f'GET {url}'):
+            response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, status, f'GET {url}')
+        return response
+
+    def assertQueryBudgets(self):
+        for url, max_queries in self.query_budgets.items():
+            with self.subTest(url=url):
+                self.assertQueryBudget(url, max_queries)
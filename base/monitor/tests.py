@@ -0,0 +1,127 @@
+from unittest import mock
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+
+from jobs.tests.utils import JobsTestCase, make_job
+from monitor.metrics import counter_values, inc, observe, record, render_metrics, reset_metrics, timer
+from monitor.workers import aget_worker_snapshot, collect_worker_snapshot, get_worker_snapshot
+
+
+class MetricsTests(JobsTestCase):
+    def test_counters_and_histograms_render_as_prometheus_text(self):
+        inc('ingest_jobs_total', 3, result='created')
+        inc('ingest_jobs_total', 1, result='created')
+        observe('ingest_stage_seconds', 0.02, stage='parse')
+
+        text = render_metrics()
+
+        self.assertIn('# TYPE ingest_jobs_total counter', text)
+        self.assertIn('ingest_jobs_total{result="created"} 4', text)
+        self.assertIn('ingest_stage_seconds_bucket{stage="parse",le="0.025"} 1', text)
+        self.assertIn('ingest_stage_seconds_bucket{stage="parse",le="0.01"} 0', text)
+        self.assertIn('ingest_stage_seconds_count{stage="parse"} 1', text)
+        self.assertEqual(counter_values('ingest_jobs_total'), [({'result': 'created'}, 4.0)])
+
+    def test_reset_clears_every_series(self):
+        inc('ingest_jobs_total')
+        reset_metrics()
+        self.assertEqual(render_metrics(), '\n')
+
+    def test_recording_never_raises_without_redis(self):
+        with mock.patch('monitor.metrics._client', side_effect=ConnectionError('down')):
+            inc('ingest_jobs_total')
+            observe('ingest_stage_seconds', 1.0)
+
+    def test_timer_decorator_times_concurrent_calls_separately(self):
+        @timer('work_seconds')
+        def work(seconds):
+            time.sleep(seconds)
+
+        slow = threading.Thread(target=work, args=(0.3,))
+        slow.start()
+        time.sleep(0.1)
+        fast = threading.Thread(target=work, args=(0.05,))
+        fast.start()
+        slow.join()
+        fast.join()
+
+        total = float(self.redis.hget('metrics:histogram:work_seconds', '|sum'))
+        # A shared start time would report about 0.25s in total
+        self.assertGreaterEqual(total, 0.34)
+
+    def test_metrics_endpoint(self):
+        inc('ingest_jobs_total')
+        response = self.client.get(reverse('monitor:metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(b'ingest_jobs_total 1', response.content)
+
+
+class RequestProfileTests(JobsTestCase):
+    def test_request_metrics_go_out_in_one_pipeline(self):
+        with mock.patch.object(self.redis, 'pipeline', wraps=self.redis.pipeline) as pipeline:
+            with mock.patch('monitor.metrics._client', return_value=self.redis):
+                self.client.get(reverse('monitor:metrics'))
+
+        self.assertEqual(pipeline.call_count, 1)
+        requests = dict((labels['view'], value) for labels, value in counter_values('http_requests_total'))
+        self.assertEqual(requests['monitor:metrics'], 1)
+        self.assertIn('http_request_seconds_count{view="monitor:metrics"} 1', render_metrics())
+
+    def test_async_views_are_recorded(self):
+        make_job()
+
+        response = async_to_sync(self.async_client.get)('/api/async/jobs/')
+
+        self.assertEqual(response.status_code, 200)
+        queries = dict((labels['view'], value) for labels, value in counter_values('http_queries_total'))
+        self.assertGreaterEqual(queries['async-job-list'], 2)
+
+    def test_record_batches_counters_and_observations(self):
+        record(
+            counters=[('a_total', 2, {'kind': 'x'}), ('a_total', 1, {'kind': 'x'})],
+            observations=[('b_seconds', 0.02, {})],
+        )
+
+        self.assertEqual(counter_values('a_total'), [({'kind': 'x'}, 3.0)])
+        self.assertIn('b_seconds_count 1', render_metrics())
+
+
+class WorkerSnapshotTests(JobsTestCase):
+    def test_views_read_the_cached_snapshot(self):
+        inspect = mock.Mock()
+        inspect.active.return_value = {'worker@a': [{'name': 'jobs.tasks.fetch_and_save_jobs'}]}
+        inspect.scheduled.return_value = None
+        inspect.reserved.return_value = {}
+        with mock.patch('monitor.workers.app.control.inspect', return_value=inspect):
+            collect_worker_snapshot()
+
+        with mock.patch('monitor.workers.app.control.inspect') as live:
+            snapshot = get_worker_snapshot()
+            response = self.client.get(reverse('monitor:dashboard'))
+
+        live.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(snapshot['active'], inspect.active.return_value)
+        self.assertEqual(snapshot['scheduled'], {})
+        self.assertIsNone(snapshot['error'])
+        self.assertGreaterEqual(snapshot['age_seconds'], 0)
+
+    def test_missing_snapshot_is_reported_not_collected(self):
+        with mock.patch('monitor.workers.app.control.inspect') as live:
+            snapshot = get_worker_snapshot()
+
+        live.assert_not_called()
+        self.assertEqual(snapshot['error'], 'No worker snapshot collected yet')
+        self.assertIsNone(snapshot['age_seconds'])
+
+    def test_inspect_failure_is_stored_as_the_error(self):
+        with mock.patch('monitor.workers.app.control.inspect', side_effect=OSError('broker down')):
+            collect_worker_snapshot()
+
+        snapshot = async_to_sync(aget_worker_snapshot)()
+        self.assertEqual(snapshot['error'], 'broker down')
+        self.assertEqual(snapshot['active'], {})
@@ -6,4 +6,7 @@ app_name = 'monitor'
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('task-status/', views.task_status, name='task-status'),
+    path('metrics', views.metrics, name='metrics'),
+    path('profiles/', views.profiles, name='profiles'),
+    path('profiles/<str:profile_id>/', views.profile_detail, name='profile-detail'),
 ] 
\ No newline at end of file
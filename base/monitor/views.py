@@ -1,67 +1,62 @@
 from django.shortcuts import render
 from django.utils import timezone
-from jobs.models import Job
-from datetime import timedelta
-from django.db.models import Count
+from jobs.rollups import aget_job_stats, get_jobs_by_industry
 from django_celery_beat.models import PeriodicTask
-from celery.app.control import Inspect
-from base.celery import app
+from .workers import aget_worker_snapshot
+from .metrics import counter_values, render_metrics
+from .profiling import list_profiles, load_profile
 import json
-from django.http import JsonResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse, JsonResponse
+from collections import defaultdict
 
-def dashboard(request):
-    # Get job statistics
-    total_jobs = Job.objects.count()
-    last_24h_jobs = Job.objects.filter(
-        created_at__gte=timezone.now() - timedelta(hours=24)
-    ).count()
+async def dashboard(request):
+    # Get job statistics from the hourly rollups
+    stats = await aget_job_stats()
     
     # Get jobs by industry
-    jobs_by_industry = Job.objects.values('industry').annotate(
-        count=Count('id')
-    ).order_by('-count')
+    jobs_by_industry = [row async for row in get_jobs_by_industry()]
     
-    # Get Celery task information
-    try:
-        i = Inspect(app=app)
-        active_tasks = i.active() or {}
-        scheduled_tasks = i.scheduled() or {}
-    except Exception as e:
-        active_tasks = {'error': str(e)}
-        scheduled_tasks = {'error': str(e)}
+    # Get Celery task information from the latest worker snapshot
+    snapshot = await aget_worker_snapshot()
+    active_tasks = snapshot['active']
+    scheduled_tasks = snapshot['scheduled']
+    if snapshot['error']:
+        active_tasks = {'error': snapshot['error']}
+        scheduled_tasks = {'error': snapshot['error']}
     
     # Get scheduled tasks from database
-    periodic_tasks = PeriodicTask.objects.filter(enabled=True).select_related('interval', 'crontab')
+    periodic_tasks = [
+        task async for task in
+        PeriodicTask.objects.filter(enabled=True).select_related('interval', 'crontab')
+    ]
     
     context = {
-        'total_jobs': total_jobs,
-        'last_24h_jobs': last_24h_jobs,
+        'total_jobs': stats['total_jobs'],
+        'last_24h_jobs': stats['last_24h_jobs'],
         'jobs_by_industry': jobs_by_industry,
         'active_tasks': json.dumps(active_tasks, indent=2),
         'scheduled_tasks': json.dumps(scheduled_tasks, indent=2),
         'periodic_tasks': periodic_tasks,
+        'snapshot_age': snapshot['age_seconds'],
         'last_update': timezone.now(),
     }
     
     return render(request, 'monitor/dashboard.html', context)
 
-def task_status(request):
+async def task_status(request):
     try:
         # Get the periodic task
-        task = PeriodicTask.objects.get(name='fetch-jobs-every-5-minutes')
+        task = await PeriodicTask.objects.aget(name='fetch-jobs-every-5-minutes')
         
         # Get active tasks
-        i = app.control.inspect()
-        active = i.active() or {}
-        scheduled = i.scheduled() or {}
-        reserved = i.reserved() or {}
+        snapshot = await aget_worker_snapshot()
         
         # Get task statistics
+        job_stats = await aget_job_stats()
         stats = {
-            'total_jobs': Job.objects.count(),
-            'recent_jobs': Job.objects.filter(
-                created_at__gte=timezone.now() - timedelta(hours=24)
-            ).count()
+            'total_jobs': job_stats['total_jobs'],
+            'recent_jobs': job_stats['last_24h_jobs'],
         }
         
         return JsonResponse({
@@ -74,9 +69,12 @@ def task_status(request):
                 'total_run_count': task.total_run_count,
             },
             'celery_info': {
-                'active_tasks': active,
-                'scheduled_tasks': scheduled,
-                'reserved_tasks': reserved,
+                'active_tasks': snapshot['active'],
+                'scheduled_tasks': snapshot['scheduled'],
+                'reserved_tasks': snapshot['reserved'],
+                'snapshot_error': snapshot['error'],
+                'snapshot_collected_at': snapshot['collected_at'],
+                'snapshot_age': snapshot['age_seconds'],
             },
             'stats': stats,
             'last_check': timezone.now().isoformat(),
@@ -86,4 +84,48 @@ def task_status(request):
             'status': 'error',
             'error': str(e),
             'last_check': timezone.now().isoformat(),
-        }, status=500) 
\ No newline at end of file
+        }, status=500) 
+
+def metrics(request):
+    """Pipeline metrics in the Prometheus text exposition format"""
+    return HttpResponse(
+        render_metrics(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+@staff_member_required
+def profiles(request):
+    """Per-view request averages and the stored profiler samples"""
+    totals = defaultdict(lambda: defaultdict(float))
+    for name in ('http_requests_total', 'http_queries_total',
+                 'http_db_seconds_total', 'http_request_seconds_total'):
+        for labels, value in counter_values(name):
+            totals[labels.get('view', '')][name] += value
+
+    views = []
+    for view, values in sorted(totals.items()):
+        requests = values['http_requests_total'] or 1
+        views.append({
+            'view': view,
+            'requests': int(values['http_requests_total']),
+            'avg_queries': values['http_queries_total'] / requests,
+            'avg_db_ms': values['http_db_seconds_total'] * 1000 / requests,
+            'avg_total_ms': values['http_request_seconds_total'] * 1000 / requests,
+        })
+    views.sort(key=lambda row: row['avg_total_ms'], reverse=True)
+
+    return render(request, 'monitor/profiles.html', {
+        'views': views,
+        'profiles': list_profiles(),
+    })
+
+@staff_member_required
+def profile_detail(request, profile_id):
+    sort = request.GET.get('sort', 'cumulative')
+    if sort not in ('cumulative', 'tottime', 'calls'):
+        sort = 'cumulative'
+    profile = load_profile(profile_id, sort=sort)
+    if profile is None:
+        raise Http404("Profile not found")
+    return render(request, 'monitor/profile_detail.html', {'profile': profile, 'sort': sort})
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from base.celery import app
+import logging
+
+logger = logging.getLogger(__name__)
+
+WORKER_SNAPSHOT_KEY = 'monitor:worker_snapshot'
+
+
+def collect_worker_snapshot():
+    """
+    Broadcast the inspect calls once and store the replies in the cache so
+    monitor views never have to wait on workers themselves.
+    """
+    snapshot = {
+        'active': {},
+        'scheduled': {},
+        'reserved': {},
+        'error': None,
+    }
+
+    try:
+        i = app.control.inspect(timeout=settings.MONITOR_INSPECT_TIMEOUT)
+        snapshot['active'] = i.active() or {}
+        snapshot['scheduled'] = i.scheduled() or {}
+        snapshot['reserved'] = i.reserved() or {}
+    except Exception as e:
+        logger.error(f"Error inspecting Celery workers: {str(e)}")
+        snapshot['error'] = str(e)
+
+    snapshot['collected_at'] = timezone.now().isoformat()
+    cache.set(WORKER_SNAPSHOT_KEY, snapshot, timeout=settings.MONITOR_SNAPSHOT_TTL)
+    return snapshot
+
+
+def _with_age(snapshot):
+    if snapshot is None:
+        return {
+            'active': {},
+            'scheduled': {},
+            'reserved': {},
+            'error': 'No worker snapshot collected yet',
+            'collected_at': None,
+            'age_seconds': None,
+        }
+
+    collected_at = parse_datetime(snapshot['collected_at'])
+    snapshot['age_seconds'] = round((timezone.now() - collected_at).total_seconds(), 1)
+    return snapshot
+
+
+def get_worker_snapshot():
+    """Latest worker snapshot from the cache, with its age in seconds"""
+    return _with_age(cache.get(WORKER_SNAPSHOT_KEY))
+
+
+async def aget_worker_snapshot():
+    """Async variant of get_worker_snapshot for async views"""
+    return _with_age(await cache.aget(WORKER_SNAPSHOT_KEY))
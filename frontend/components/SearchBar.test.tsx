@@ -0,0 +1,38 @@
+import { cleanup, fireEvent, render, screen, waitFor } from "@testing-library/react";
+import { afterEach, describe, expect, it, vi } from "vitest";
+import axiosInstance from "@/utils/axios";
+import { SearchBar } from "./SearchBar";
+
+vi.mock("@/utils/axios", () => ({
+  default: { get: vi.fn() },
+}));
+
+const get = vi.mocked(axiosInstance.get);
+
+describe("SearchBar", () => {
+  afterEach(() => {
+    cleanup();
+    vi.clearAllMocks();
+  });
+
+  it("does not reopen the suggestions after one is picked", async () => {
+    get.mockResolvedValue({
+      data: { results: [{ value: "Python Developer", count: 12, type: "title" }] },
+    });
+    render(<SearchBar />);
+    const input = screen.getByPlaceholderText<HTMLInputElement>("Search for jobs...");
+
+    fireEvent.change(input, { target: { value: "pyth" } });
+    fireEvent.mouseDown(await screen.findByText("Python Developer"));
+
+    expect(input.value).toBe("Python Developer");
+    expect(screen.queryByRole("listitem")).toBeNull();
+    // Past the typing debounce: still no request for the picked value
+    await new Promise((resolve) => setTimeout(resolve, 300));
+    expect(get).toHaveBeenCalledTimes(1);
+    expect(screen.queryByRole("listitem")).toBeNull();
+
+    fireEvent.change(input, { target: { value: "Python Developer " } });
+    await waitFor(() => expect(get).toHaveBeenCalledTimes(2));
+  });
+});
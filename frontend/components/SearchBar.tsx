@@ -1,15 +1,60 @@
 import { motion } from "framer-motion";
-import { useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import { FiSearch } from "react-icons/fi";
+import axiosInstance from "@/utils/axios";
+
+interface Suggestion {
+  value: string;
+  count: number;
+  type: "title" | "skill";
+}
 
 export const SearchBar = () => {
   const [query, setQuery] = useState("");
+  const [suggestions, setSuggestions] = useState<Suggestion[]>([]);
+  // The value just picked from the list; no need to suggest it again
+  const selected = useRef<string | null>(null);
+
+  useEffect(() => {
+    if (!query.trim() || query === selected.current) {
+      setSuggestions([]);
+      return;
+    }
+
+    // Wait for a pause in typing before asking the server
+    const controller = new AbortController();
+    const timeout = setTimeout(async () => {
+      try {
+        const response = await axiosInstance.get("/api/jobs/suggest/", {
+          params: { q: query, limit: 8 },
+          signal: controller.signal,
+        });
+        setSuggestions(response.data.results);
+      } catch (error) {
+        if (!controller.signal.aborted) {
+          console.error("Error fetching suggestions:", error);
+        }
+      }
+    }, 150);
+
+    return () => {
+      clearTimeout(timeout);
+      controller.abort();
+    };
+  }, [query]);
 
   const handleSearch = (e: React.FormEvent) => {
     e.preventDefault();
+    setSuggestions([]);
     // Implement search functionality
   };
 
+  const handleSelect = (suggestion: Suggestion) => {
+    selected.current = suggestion.value;
+    setQuery(suggestion.value);
+    setSuggestions([]);
+  };
+
   return (
     <motion.form
       initial={{ opacity: 0, y: 20 }}
@@ -22,10 +67,29 @@ export const SearchBar = () => {
         <input
           type="text"
           value={query}
-          onChange={(e) => setQuery(e.target.value)}
+          onChange={(e) => {
+            selected.current = null;
+            setQuery(e.target.value);
+          }}
           placeholder="Search for jobs..."
           className="w-full px-6 py-4 rounded-l-full bg-white/10 backdrop-blur-md border border-white/20 text-white placeholder-gray-400 focus:outline-none focus:ring-2 focus:ring-green-400"
         />
+        {suggestions.length > 0 && (
+          <ul className="absolute left-0 right-0 mt-2 z-20 rounded-xl bg-gray-800 border border-gray-700 overflow-hidden text-left">
+            {suggestions.map((suggestion) => (
+              <li
+                key={`${suggestion.type}-${suggestion.value}`}
+                onMouseDown={() => handleSelect(suggestion)}
+                className="flex justify-between px-6 py-2 cursor-pointer hover:bg-gray-700"
+              >
+                <span>{suggestion.value}</span>
+                <span className="text-sm text-gray-400">
+                  {suggestion.type} · {suggestion.count}
+                </span>
+              </li>
+            ))}
+          </ul>
+        )}
       </div>
       <button
         type="submit"